@@ -0,0 +1,164 @@
+"""Conditional GET (ETag / Last-Modified) derived from the cache versions.
+
+Validators are computed from version keys in the shared cache only, so a
+revalidation that matches is answered 304 before any query or rendering.
+Versions are microsecond timestamps (store.catalog_cache), which also makes
+them the Last-Modified time of whatever they cover.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from store.catalog_cache import (
+    get_catalog_version, get_product_version, get_version, version_datetime,
+    wishlist_version_key,
+)
+from store.serviceability import SERVICEABILITY_VERSION_KEY
+from store.singletons import SINGLETONS_VERSION_KEY
+
+
+def _etag(*parts):
+    return '"%s"' % hashlib.md5(':'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _query(request):
+    return sorted(request.GET.lists())
+
+
+def _session_user_id(request):
+    """Signed-in user id straight from the session, without loading the
+    User row (None for anonymous visitors)."""
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return None
+    return request.session.get(SESSION_KEY)
+
+
+def revalidate(response):
+    """Let browsers keep the body but check the validators on every use."""
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+# ── Catalog pages (used by PageCacheMiddleware) ──────────────────
+
+def page_versions(request):
+    """The versions a catalog page depends on: the catalog's, the
+    singletons' and, on a product page, the product's (reviews and their
+    verified-purchase badges move only that one)."""
+    versions = [get_catalog_version(), cache.get(SINGLETONS_VERSION_KEY) or 0]
+    match = request.resolver_match
+    if match is not None and match.url_name == 'product_detail':
+        versions.append(get_product_version(match.kwargs.get('slug')))
+    return versions
+
+
+def page_validators(request, url):
+    """(etag, last_modified) for a catalog page, or None for signed-in
+    visitors — their account, review and wishlist fragments are not
+    covered by the catalog versions."""
+    if _session_user_id(request) is not None:
+        return None
+    versions = page_versions(request)
+    # The CSRF cookie is part of the tag: pages embed a token derived from it
+    csrf_cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+    return (
+        _etag(*versions, url, csrf_cookie),
+        version_datetime(max(versions)),
+    )
+
+
+# ── JSON endpoints ───────────────────────────────────────────────
+
+def _catalog_versions(request):
+    # ?deliver_to= results also depend on the serviceability map
+    if 'deliver_to' in request.GET:
+        return get_catalog_version(), get_version(SERVICEABILITY_VERSION_KEY)
+    return (get_catalog_version(),)
+
+
+def _catalog_etag(request, *args, **kwargs):
+    return _etag(*_catalog_versions(request), request.path, _query(request))
+
+
+def _catalog_last_modified(request, *args, **kwargs):
+    return version_datetime(max(_catalog_versions(request)))
+
+
+def _product_version(request):
+    product_id = request.GET.get('product_id', '')
+    return get_product_version(pk=product_id) if product_id.isdigit() else None
+
+
+def _product_etag(request, *args, **kwargs):
+    version = _product_version(request)
+    return _etag(version, request.path, _query(request)) if version else None
+
+
+def _product_last_modified(request, *args, **kwargs):
+    version = _product_version(request)
+    return version_datetime(version) if version else None
+
+
+def _pincode_versions(request):
+    version = _product_version(request)
+    return (version, get_version(SERVICEABILITY_VERSION_KEY)) if version else None
+
+
+def _pincode_etag(request, *args, **kwargs):
+    versions = _pincode_versions(request)
+    return _etag(*versions, request.path, _query(request)) if versions else None
+
+
+def _pincode_last_modified(request, *args, **kwargs):
+    versions = _pincode_versions(request)
+    return version_datetime(max(versions)) if versions else None
+
+
+def _cart_pincode_versions(request):
+    return get_catalog_version(), get_version(SERVICEABILITY_VERSION_KEY)
+
+
+def _cart_pincode_etag(request, *args, **kwargs):
+    return _etag(*_cart_pincode_versions(request), request.path, _query(request))
+
+
+def _cart_pincode_last_modified(request, *args, **kwargs):
+    return version_datetime(max(_cart_pincode_versions(request)))
+
+
+def _wishlist_etag(request, *args, **kwargs):
+    user_id = _session_user_id(request)
+    if user_id is None:
+        return _etag('anonymous', request.path)
+    return _etag(user_id, get_version(wishlist_version_key(user_id)), request.path)
+
+
+def _conditional(etag_func, last_modified_func=None, **cache_control):
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True, **cache_control)
+            return response
+        return wrapper
+    return decorator
+
+
+# Catalog-wide data: search results, shop grid pages
+catalog_condition = _conditional(_catalog_etag, _catalog_last_modified)
+# One product's data, identified by ?product_id=: reviews
+product_condition = _conditional(_product_etag, _product_last_modified)
+# One product's serviceability in a pincode (see store.serviceability)
+pincode_condition = _conditional(_pincode_etag, _pincode_last_modified)
+# A whole cart's serviceability in a pincode
+cart_pincode_condition = _conditional(_cart_pincode_etag, _cart_pincode_last_modified)
+# One customer's wishlist — never stored by shared caches
+wishlist_condition = _conditional(_wishlist_etag, private=True)
@@ -0,0 +1,179 @@
+"""Full-page response cache for the public catalog pages.
+
+Catalog pages are rendered once per normalized URL and stored with
+placeholders where user-specific fragments go (profile dropdown, cart
+checkout button, review form, wishlist button, CSRF token). On a hit the placeholders are
+filled for the current visitor: anonymous visitors get pre-rendered
+fragments by plain string replacement, so the ORM and template engine are
+never touched; signed-in visitors get the small fragment templates only.
+
+Anonymous visitors also get ETag / Last-Modified validators (see
+mysite.conditional); a matching revalidation is answered 304 before the
+cache lookup.
+"""
+
+import hashlib
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.html import format_html
+from django.utils.http import http_date
+from django.utils.safestring import mark_safe
+
+from mysite.conditional import page_validators, page_versions, revalidate
+from store.pagination import cursor_key
+
+# URL names from mysite.urls and store.urls whose responses are cacheable
+CACHEABLE_URL_NAMES = {
+    'home', 'about', 'shop', 'product_detail',
+    'privacy_policy', 'terms_conditions', 'refund_policy', 'shipping_policy',
+}
+
+# Query parameters the cacheable views read. Any other parameter (utm_*,
+# click ids, cache busters) is left out of the cache key and the ETag, so
+# it cannot add cache entries
+PAGE_QUERY_PARAMS = {'category', 'size', 'fabric', 'price', 'in_stock', 'cursor', 'page', 'deliver_to'}
+
+# Query parameters whose pages depend on more than the catalog version
+UNCACHED_QUERY_PARAMS = {'deliver_to'}
+
+_PAGE_CACHE_TTL = 60 * 60
+
+# Fragments that differ per visitor. None = built in code, no template.
+USER_FRAGMENTS = {
+    'account_menu': 'partials/account_menu.html',
+    'cart_checkout': 'partials/cart_checkout.html',
+    'review_form': 'partials/review_form.html',
+    'wishlist_button': 'partials/wishlist_button.html',
+    'csrf_token': None,
+}
+
+
+# ── Fragments ────────────────────────────────────────────────────
+
+def fragment_marker(name, kwargs):
+    """Placeholder comment written into a cached page for one fragment."""
+    query = urlencode(sorted(kwargs.items()))
+    return mark_safe(f'<!--user-fragment:{name}{"?" + query if query else ""}-->')
+
+
+def render_fragment(name, request, kwargs, user=None):
+    """Render a user fragment for ``request`` (or for ``user`` if given)."""
+    if name == 'csrf_token':
+        return format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request))
+    if user is not None:
+        # No context processors: used to pre-render the anonymous variant
+        return render_to_string(USER_FRAGMENTS[name], {'user': user, 'request': request, **kwargs})
+    return render_to_string(USER_FRAGMENTS[name], kwargs, request=request)
+
+
+def _fill(content, holes, request, anonymous_fills=None):
+    for marker, (name, kwargs) in holes.items():
+        if anonymous_fills is not None and marker in anonymous_fills:
+            html = anonymous_fills[marker]
+        else:
+            html = render_fragment(name, request, kwargs)
+        content = content.replace(marker, html)
+    return content
+
+
+# ── Cache key ────────────────────────────────────────────────────
+
+def normalized_url(request):
+    """Path plus the sorted PAGE_QUERY_PARAMS of the query string. A cursor
+    counts by its decoded position, so undecodable ones all key the first
+    page (store.pagination.cursor_key)."""
+    params = sorted(
+        (key, cursor_key(value) if key == 'cursor' else value)
+        for key, values in request.GET.lists()
+        if key in PAGE_QUERY_PARAMS
+        for value in values
+    )
+    query = urlencode([(key, value) for key, value in params if value != ''])
+    return f'{request.path}?{query}' if query else request.path
+
+
+def page_cache_key(request):
+    digest = hashlib.md5(normalized_url(request).encode()).hexdigest()
+    return f'page:{":".join(map(str, page_versions(request)))}:{digest}'
+
+
+# ── Validators ───────────────────────────────────────────────────
+
+def _add_validators(request, response):
+    validators = getattr(request, '_page_validators', None)
+    if validators and response.status_code == 200:
+        etag, last_modified = validators
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified.timestamp()))
+        revalidate(response)
+    return response
+
+
+# ── Middleware ───────────────────────────────────────────────────
+
+class PageCacheMiddleware:
+    """Serve catalog pages from the cache, hole-punching user fragments.
+    Must be the last entry in MIDDLEWARE so hits still pass back out
+    through CSRF, messages, gzip and security headers."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        holes = getattr(request, '_page_cache_holes', None)
+        if holes is None or response.streaming:
+            return _add_validators(request, response)
+
+        content = response.content.decode(response.charset)
+        if response.status_code == 200 and not response.cookies:
+            anonymous = AnonymousUser()
+            cache.set(request._page_cache_key, {
+                'content': content,
+                'content_type': response['Content-Type'],
+                'holes': holes,
+                'anonymous_fills': {
+                    marker: render_fragment(name, request, kwargs, user=anonymous)
+                    for marker, (name, kwargs) in holes.items()
+                    if name != 'csrf_token'
+                },
+            }, _PAGE_CACHE_TTL)
+
+        if holes:
+            response.content = _fill(content, holes, request)
+        return _add_validators(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.resolver_match.url_name not in CACHEABLE_URL_NAMES:
+            return None
+        if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return None
+        if UNCACHED_QUERY_PARAMS.intersection(request.GET):
+            return None
+
+        request._page_validators = page_validators(request, normalized_url(request))
+        if request._page_validators:
+            etag, last_modified = request._page_validators
+            not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if not_modified is not None:
+                return revalidate(not_modified)
+
+        request._page_cache_key = page_cache_key(request)
+        entry = cache.get(request._page_cache_key)
+        if entry is None:
+            # Rendering templates will emit placeholders into this dict
+            request._page_cache_holes = {}
+            return None
+
+        anonymous_fills = None if request.user.is_authenticated else entry['anonymous_fills']
+        content = _fill(entry['content'], entry['holes'], request, anonymous_fills)
+        return HttpResponse(content, content_type=entry['content_type'])
@@ -64,6 +64,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Keep last: cache hits still pass out through the middleware above
+    'mysite.middleware.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'mysite.urls'
@@ -151,9 +153,27 @@ CACHES = {
         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
         'LOCATION': BASE_DIR / 'cache',
         'TIMEOUT': 300,
+        # Room for versioned page/grid/bundle entries (default is 300)
+        'OPTIONS': {'MAX_ENTRIES': 5000},
     }
 }
 
+# ────────────────────────────────────────────────────────────────
+# Search ('memory': per-worker index, 'database': full-text backend
+# for the connection's vendor — see store.search)
+# ────────────────────────────────────────────────────────────────
+SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'memory')
+# Seconds between bulk writes of buffered search analytics (0 = no flush thread)
+SEARCH_ANALYTICS_FLUSH_SECONDS = int(os.environ.get('SEARCH_ANALYTICS_FLUSH_SECONDS', 60))
+
+# Minutes a pending online payment holds its stock (see store.stock)
+STOCK_RESERVATION_MINUTES = int(os.environ.get('STOCK_RESERVATION_MINUTES', 30))
+
+# Offline pincode directory (see store.pincodes; build_pincode_directory)
+PINCODE_DIRECTORY_PATH = os.environ.get(
+    'PINCODE_DIRECTORY_PATH', str(BASE_DIR / 'store' / 'data' / 'pincodes.bin'),
+)
+
 # ────────────────────────────────────────────────────────────────
 # Logging
 # ────────────────────────────────────────────────────────────────
@@ -168,7 +168,10 @@
         results.innerHTML = '<div class="search-loading"><i class="fas fa-spinner fa-spin"></i> Searching...</div>';
 
         abortController = new AbortController();
-        fetch(`/api/search/?q=${encodeURIComponent(query)}`, { signal: abortController.signal })
+        // "Deliverable to my pincode" (shop sidebar) narrows search results too
+        const deliverTo = localStorage.getItem('ambava_deliver_only') === '1' ? localStorage.getItem('ambava_pincode') : '';
+        const deliverParam = deliverTo ? `&deliver_to=${encodeURIComponent(deliverTo)}` : '';
+        fetch(`/api/search/?q=${encodeURIComponent(query)}${deliverParam}`, { signal: abortController.signal })
             .then(r => r.json())
             .then(data => {
                 if (!data.results || data.results.length === 0) {
@@ -639,7 +642,7 @@ const _isHomePage = !!document.querySelector('.hero, #home');
 
 // Cache ALL DOM lookups once at startup — only meaningful on home page
 const _sections       = _isHomePage ? document.querySelectorAll('section') : [];
-const _showcaseItems  = document.querySelectorAll('.showcase-item');
+let _showcaseItems    = document.querySelectorAll('.showcase-item');   // refreshed on showcase:appended
 const _featuredCards  = document.querySelectorAll('.featured-card');
 const _flipCards      = document.querySelectorAll('.flip-card');
 const _statCards      = document.querySelectorAll('.stat-card');
@@ -901,6 +904,12 @@ function tick(now) {
 function startTick() { if (_isHomePage && !_running) { _running = true; _prevTime = 0; requestAnimationFrame(tick); } }
 window.addEventListener('scroll', startTick, { passive: true });
 
+// Cards streamed in by the home showcase loader join the scroll animation
+document.addEventListener('showcase:appended', () => {
+    _showcaseItems = document.querySelectorAll('.showcase-item');
+    startTick();
+});
+
 // Unified rAF loop — drives both Lenis smooth scroll and our 3D animations
 function globalRAF(time) {
     if (lenis) lenis.raf(time);        // advance Lenis interpolation
@@ -1073,13 +1082,15 @@ if (mobileMenuToggle) {
     // ── Add to cart (exposed globally for shop page) ──
     window.addToCart = addToCart;
     window.showCartToast = showToast;
-    function addToCart(name, price, image, size) {
+    function addToCart(name, price, image, size, productId) {
         size = size || '';
+        productId = parseInt(productId) || null;
         const existing = cart.find(i => i.name === name && i.size === size);
         if (existing) {
             existing.quantity += 1;
+            if (productId) existing.productId = productId;
         } else {
-            cart.push({ name, price: parseInt(price), image: image || '', size, quantity: 1 });
+            cart.push({ name, price: parseInt(price), image: image || '', size, quantity: 1, productId });
         }
         saveCart();
         updateBadge();
@@ -1177,7 +1188,7 @@ if (mobileMenuToggle) {
             const sizeHTML = item.size ? `<span class="cart-item-size">Size: ${item.size}</span>` : '';
             const cartKey = item.name + '||' + (item.size || '');
             return `
-                <div class="cart-item" style="animation-delay:${idx * 0.09}s" data-name="${item.name}" data-size="${item.size || ''}" data-cart-key="${cartKey}">
+                <div class="cart-item" style="animation-delay:${idx * 0.09}s" data-name="${item.name}" data-size="${item.size || ''}" data-cart-key="${cartKey}" data-product-id="${item.productId || ''}">
                     ${imgHTML}
                     <div class="cart-item-details">
                         <p class="cart-item-name">${item.name}</p>
@@ -1201,6 +1212,58 @@ if (mobileMenuToggle) {
             el.querySelector('[data-action="plus"]').addEventListener('click', () => updateQty(name, size, 1));
             el.querySelector('.cart-item-remove').addEventListener('click', () => removeItem(name, size, el));
         });
+        checkDelivery();
+    }
+
+    // ── Delivery check: the whole bag in one request ──
+    const deliveryRow = document.createElement('div');
+    deliveryRow.className = 'cart-delivery';
+    deliveryRow.innerHTML = `
+        <i class="fas fa-map-marker-alt"></i>
+        <input type="text" class="cart-delivery-input" inputmode="numeric" maxlength="6" placeholder="Delivery pincode">
+        <span class="cart-delivery-result"></span>`;
+    footer.insertBefore(deliveryRow, footer.firstChild);
+    const deliveryInput = deliveryRow.querySelector('.cart-delivery-input');
+    const deliveryResult = deliveryRow.querySelector('.cart-delivery-result');
+    deliveryInput.value = localStorage.getItem('ambava_pincode') || '';
+    deliveryInput.addEventListener('input', () => {
+        deliveryInput.value = deliveryInput.value.replace(/\D/g, '');
+        if (deliveryInput.value.length === 6) {
+            localStorage.setItem('ambava_pincode', deliveryInput.value);
+            checkDelivery();
+        } else {
+            deliveryResult.textContent = '';
+        }
+    });
+
+    function checkDelivery() {
+        const pincode = deliveryInput.value;
+        const ids = [...new Set(cart.map(i => i.productId).filter(Boolean))];
+        body.querySelectorAll('.cart-item.undeliverable').forEach(el => {
+            el.classList.remove('undeliverable');
+            el.querySelector('.cart-item-undeliverable')?.remove();
+        });
+        if (pincode.length !== 6 || ids.length === 0) {
+            deliveryResult.textContent = '';
+            return;
+        }
+        const params = new URLSearchParams({ pincode });
+        ids.forEach(id => params.append('product_id', id));
+        fetch(`/api/check-pincode/cart/?${params}`)
+            .then(r => r.json())
+            .then(data => {
+                if (!data.ok || deliveryInput.value !== pincode) return;
+                deliveryResult.textContent = data.message;
+                deliveryResult.classList.toggle('is-error', !data.available);
+                data.unavailable.forEach(id => {
+                    body.querySelectorAll(`.cart-item[data-product-id="${id}"]`).forEach(el => {
+                        el.classList.add('undeliverable');
+                        el.querySelector('.cart-item-details').insertAdjacentHTML(
+                            'beforeend', '<p class="cart-item-undeliverable">Not deliverable here</p>');
+                    });
+                });
+            })
+            .catch(() => { deliveryResult.textContent = ''; });
     }
 
     // ── Wire up all add-to-cart buttons ──
@@ -1219,7 +1282,7 @@ if (mobileMenuToggle) {
                     if (img) image = img.src;
                 }
             }
-            addToCart(name, price, image);
+            addToCart(name, price, image, '', this.dataset.productId);
         });
     });
 
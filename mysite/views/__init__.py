@@ -5,7 +5,10 @@ config (``from . import views; views.home``) keeps working.
 
 from .errors import custom_404, custom_500                          # noqa: F401
 from .pages import home, about, shop, product_detail                # noqa: F401
-from .api import search_api, check_pincode_availability, send_otp   # noqa: F401
+from .api import (                                                  # noqa: F401
+    search_api, showcase_api, check_pincode_availability, check_cart_pincode,
+    pincode_lookup, send_otp,
+)
 from .auth import (                                                 # noqa: F401
     customer_login, customer_logout,
     google_login, google_callback,
@@ -5,6 +5,7 @@ from django.shortcuts import redirect, render
 from django.http import JsonResponse
 from django.contrib.auth.models import User
 from django.utils import timezone
+from store import pincodes
 from store.models import (
     Address, Order, OrderItem, ReturnExchange, UserProfile,
 )
@@ -101,6 +102,12 @@ def address_save(request):
     label = request.POST.get('label', 'home').strip()
     is_default = request.POST.get('is_default') == 'on'
 
+    # City and state default to the offline pincode directory's
+    pincode_info = pincodes.lookup(pincode)
+    if pincode_info is not None:
+        city = city or pincode_info.district
+        state = state or pincode_info.state
+
     if not full_name:
         errors['full_name'] = 'Full name is required.'
     if not line1:
@@ -111,6 +118,8 @@ def address_save(request):
         errors['state'] = 'State is required.'
     if not pincode or len(pincode) < 5:
         errors['pincode'] = 'Valid pincode is required.'
+    elif pincode_info is None:
+        errors['pincode'] = 'This pincode does not exist.'
     if errors:
         return JsonResponse({'ok': False, 'errors': errors})
 
@@ -1,76 +1,65 @@
-"""AJAX API endpoints — search, pincode check, OTP."""
+"""AJAX API endpoints — search, showcase, pincode checks, OTP."""
 
 import json
 import random
 from django.http import JsonResponse
-from django.db.models import Q
+from django.template.loader import render_to_string
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
-from store.models import (
-    FeaturedCollection, ShowcaseProduct, CollectionCard, PincodeAvailability,
-)
+from mysite.conditional import cart_pincode_condition, catalog_condition, pincode_condition
+from store.models import ShowcaseProduct, PincodeAvailability
+from store import pincodes
+from store.pagination import get_showcase_page
+from store.catalog_cache import keep_product_version
+from store.product_bundle import get_product_bundle
+from store.search import analytics, cached_search, peek_cached_search
+from store.serviceability import bitmap_of, clean_pincode, deliverable, resolve_cart
 from .helpers import normalize_phone, store_otp, is_rate_limited
 
 
 def search_api(request):
-    """AJAX search endpoint — searches featured collections, showcase products, and collection cards."""
+    """AJAX search endpoint — searches featured collections, showcase products, and collection cards.
+    ``?deliver_to=`` keeps only products that ship to that pincode. Repeats
+    answered 304 run no search but are still counted, as revalidated."""
+    response = _search_response(request)
+    if response.status_code == 304:
+        query = request.GET.get('q', '').strip()
+        if len(query) >= 2:
+            cached = peek_cached_search(query)
+            analytics.record(query, None if cached is None else len(cached), revalidated=True)
+    return response
+
+
+@catalog_condition
+def _search_response(request):
     query = request.GET.get('q', '').strip()
     if len(query) < 2:
         return JsonResponse({'results': []})
-
-    results = []
-
-    # Search Featured Collections
-    for item in FeaturedCollection.objects.filter(
-        Q(name__icontains=query) | Q(description__icontains=query),
-        is_active=True
-    )[:6]:
-        results.append({
-            'name': item.name,
-            'description': item.description,
-            'price': item.formatted_price,
-            'discounted_price': item.formatted_discounted_price if item.has_discount else '',
-            'discount': item.discount_percent if item.has_discount else 0,
-            'image': item.image.url if item.image else '',
-            'category': 'Featured Collection',
-            'section': '#collection',
-        })
-
-    # Search Showcase Products
-    for item in ShowcaseProduct.objects.filter(
-        Q(name__icontains=query) | Q(description__icontains=query),
-        is_active=True
-    )[:6]:
-        results.append({
-            'name': item.name,
-            'price': item.formatted_price,
-            'discounted_price': item.formatted_discounted_price if item.has_discount else '',
-            'discount': item.discount_percent if item.has_discount else 0,
-            'image': item.image.url if item.image else '',
-            'category': item.get_category_display(),
-            'section': '#showcase',
-            'url': f'/shop/{item.slug}/',
-        })
-
-    # Search Collection Cards
-    for item in CollectionCard.objects.filter(
-        Q(name__icontains=query) | Q(description__icontains=query),
-        is_active=True
-    )[:4]:
-        results.append({
-            'name': item.name,
-            'description': item.description,
-            'image': item.image.url if item.image else '',
-            'category': 'Collection',
-            'section': '#collection',
-        })
-
-    return JsonResponse({'results': results[:12]})
-
-
+    results = cached_search(query)
+    analytics.record(query, len(results))
+    deliver_to = clean_pincode(request.GET.get('deliver_to'))
+    if deliver_to:
+        # Products that do not ship to the saved pincode drop out; other
+        # results (collections) have no id and stay
+        matches = deliverable(bitmap_of(r['id'] for r in results if 'id' in r), deliver_to)
+        results = [r for r in results if 'id' not in r or matches >> r['id'] & 1]
+    return JsonResponse({'results': results})
+
+
+@catalog_condition
+def showcase_api(request):
+    """Next page of home showcase cards after ``?cursor=``, as HTML."""
+    products, next_cursor = get_showcase_page(request.GET.get('cursor') or None)
+    html = render_to_string('partials/showcase_items.html', {'products': products}, request=request)
+    return JsonResponse({'ok': True, 'html': html, 'next_cursor': next_cursor})
+
+
+@pincode_condition
 def check_pincode_availability(request):
     """AJAX endpoint to check product availability in a pincode."""
     pincode = request.GET.get('pincode', '').strip()
     product_id = request.GET.get('product_id', '')
+    slug = request.GET.get('slug', '')
 
     if not pincode or len(pincode) != 6 or not pincode.isdigit():
         return JsonResponse({
@@ -78,19 +67,31 @@ def check_pincode_availability(request):
             'message': 'Please enter a valid 6-digit pincode'
         }, status=400)
 
-    if not product_id:
+    # Offline directory (store.pincodes): no query for pincodes that do not exist
+    if not pincodes.is_valid(pincode):
         return JsonResponse({
             'available': False,
-            'message': 'Product not found'
+            'message': 'This pincode does not exist'
         }, status=400)
 
-    try:
-        ShowcaseProduct.objects.get(id=product_id)
-    except ShowcaseProduct.DoesNotExist:
+    if not product_id:
         return JsonResponse({
             'available': False,
             'message': 'Product not found'
-        }, status=404)
+        }, status=400)
+
+    # The PDP sends its slug: the cached product bundle proves the product
+    # exists, and the compiled serviceability map needs no query either
+    bundle = get_product_bundle(slug) if slug else None
+    if bundle is None or str(bundle['product'].pk) != product_id:
+        try:
+            ShowcaseProduct.objects.get(id=product_id)
+        except (ShowcaseProduct.DoesNotExist, ValueError):
+            return JsonResponse({
+                'available': False,
+                'message': 'Product not found'
+            }, status=404)
+    keep_product_version(pk=product_id)
 
     is_available, delivery_days, extra_charge = PincodeAvailability.is_product_available_in_pincode(
         product_id, pincode
@@ -113,6 +114,58 @@ def check_pincode_availability(request):
         })
 
 
+MAX_CART_PRODUCTS = 50
+
+
+@cart_pincode_condition
+def check_cart_pincode(request):
+    """Serviceability of every cart product in one pincode, from one lookup
+    in the compiled map: ``?pincode=&product_id=1&product_id=2…``."""
+    pincode = request.GET.get('pincode', '').strip()
+    if len(pincode) != 6 or not pincode.isdigit():
+        return JsonResponse({'ok': False, 'error': 'Please enter a valid 6-digit pincode'}, status=400)
+    if not pincodes.is_valid(pincode):
+        return JsonResponse({'ok': False, 'error': 'This pincode does not exist'}, status=400)
+    product_ids = list(dict.fromkeys(
+        int(pk) for pk in request.GET.getlist('product_id') if pk.isdigit()
+    ))[:MAX_CART_PRODUCTS]
+    if not product_ids:
+        return JsonResponse({'ok': False, 'error': 'No products to check'}, status=400)
+
+    cart = resolve_cart(product_ids, pincode)
+    if not cart['configured']:
+        # No serviceability data yet: the shop delivers everywhere
+        return JsonResponse({
+            'ok': True, 'available': True, 'unavailable': [],
+            'delivery_days': None, 'extra_charge': 0, 'message': '',
+        })
+    if cart['unavailable']:
+        count = len(cart['unavailable'])
+        message = f'{count} item{"s" if count > 1 else ""} cannot be delivered to {pincode}'
+    else:
+        message = f'Delivery in {cart["delivery_days"]} days'
+        if cart['extra_charge'] > 0:
+            message += f' • Shipping: ₹{cart["extra_charge"]:.0f}'
+    return JsonResponse({
+        'ok': True,
+        'available': not cart['unavailable'],
+        'unavailable': cart['unavailable'],
+        'delivery_days': cart['delivery_days'],
+        'extra_charge': float(cart['extra_charge']),
+        'message': message,
+    })
+
+
+@cache_control(public=True, max_age=60 * 60 * 24)
+def pincode_lookup(request):
+    """District, state and zone for ``?pincode=`` from the offline
+    directory (store.pincodes) — used to autofill address forms."""
+    info = pincodes.lookup(request.GET.get('pincode', '').strip())
+    if info is None:
+        return JsonResponse({'ok': False, 'error': 'This pincode does not exist'}, status=404)
+    return JsonResponse({'ok': True, **info._asdict()})
+
+
 @csrf_exempt
 def send_otp(request):
     """Generate a 6-digit OTP for a phone number.
@@ -3,16 +3,21 @@
 import json
 import re
 import logging
+from collections import Counter
 from django.shortcuts import redirect, render
 from django.http import JsonResponse
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.models import User
 from django.contrib import messages
+from django.db import transaction
+from django.db.models import F
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_POST
 from store.models import (
-    Address, Order, OrderItem, ShowcaseProduct, UserProfile,
+    Address, Coupon, Order, OrderItem, ShowcaseProduct, UserProfile,
 )
+from store import pincodes, stock
+from store.serviceability import resolve_cart
 from .helpers import normalize_phone, get_otp, clear_otp
 
 logger = logging.getLogger(__name__)
@@ -261,6 +266,85 @@ def checkout_login(request):
 
 # ── Place order ──
 
+def _resolve_products(items):
+    """The active product for each cart line, or None. Lines carry
+    ``product_id`` and are resolved with one in_bulk query; lines without
+    one (carts saved before ids were sent) or whose id is gone fall back
+    to a single query by name."""
+    ids = [it.get('product_id') for it in items]
+    ids = [int(pk) if str(pk or '').isdigit() else None for pk in ids]
+    wanted = {pk for pk in ids if pk is not None}
+    by_id = ShowcaseProduct.objects.filter(is_active=True).in_bulk(wanted) if wanted else {}
+    products = [by_id.get(pk) for pk in ids]
+
+    names = {it.get('name') for it, product in zip(items, products) if product is None and it.get('name')}
+    if names:
+        by_name = {}
+        # Model ordering, first match wins — as the old per-line .first() did
+        for product in ShowcaseProduct.objects.filter(name__in=names, is_active=True):
+            by_name.setdefault(product.name, product)
+        products = [product or by_name.get(it.get('name')) for it, product in zip(items, products)]
+    return products
+
+
+def _create_order(request, user, shipping, order_items_data, quantities,
+                  subtotal, shipping_charge, is_online, coupon_code):
+    """Create the order and its items, apply the coupon and take the stock —
+    reserved until payment for online orders — in the same few statements
+    however long the cart. Run inside transaction.atomic; raises
+    stock.OutOfStock."""
+    discount_amount = 0
+    if coupon_code:
+        try:
+            coupon = Coupon.objects.get(code__iexact=coupon_code)
+            if coupon.is_valid(order_total=subtotal, user=request.user)[0]:
+                discount_amount = coupon.calculate_discount(subtotal)
+                Coupon.objects.filter(pk=coupon.pk).update(used_count=F('used_count') + 1)
+        except Coupon.DoesNotExist:
+            pass
+
+    total = max(0, subtotal + shipping_charge - discount_amount)
+
+    order = Order.objects.create(
+        user=user,
+        status='pending' if is_online else 'confirmed',
+        payment_status='pending' if is_online else 'paid',
+        payment_method='razorpay' if is_online else 'cod',
+        shipping_full_name=shipping['full_name'],
+        shipping_phone=shipping.get('phone', ''),
+        shipping_address=f"{shipping['address_line1']}, {shipping.get('address_line2', '')}".rstrip(', '),
+        shipping_city=shipping['city'],
+        shipping_state=shipping['state'],
+        shipping_pincode=shipping['pincode'],
+        subtotal=subtotal,
+        shipping_charge=shipping_charge,
+        total=total,
+        coupon_code=coupon_code if discount_amount else '',
+        discount_amount=discount_amount,
+    )
+
+    # bulk_create skips OrderItem.save(), so each line carries its total
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product=oi['product'],
+            product_name=oi['product_name'],
+            price=oi['price'],
+            quantity=oi['quantity'],
+            total=oi['total'],
+            size=oi.get('size', ''),
+        )
+        for oi in order_items_data
+    ])
+
+    # One conditional UPDATE for the whole cart (store.stock)
+    if is_online:
+        stock.reserve(order, quantities)
+    else:
+        stock.take(quantities)
+    return order
+
+
 @require_POST
 def place_order(request):
     """AJAX: create an order from cart JSON payload.
@@ -283,6 +367,13 @@ def place_order(request):
     save_address = body.get('save_address', False)
     payment_method = body.get('payment_method', 'cod').strip()
 
+    # City and state default to the offline pincode directory's
+    pincode_info = pincodes.lookup(str(shipping.get('pincode', '')).strip())
+    if pincode_info is not None:
+        for field, value in (('city', pincode_info.district), ('state', pincode_info.state)):
+            if not str(shipping.get(field) or '').strip() and value:
+                shipping[field] = value
+
     errors = {}
     if not items:
         errors['items'] = 'Cart is empty.'
@@ -298,6 +389,8 @@ def place_order(request):
         errors['state'] = 'State is required.'
     if not shipping.get('pincode') or len(shipping.get('pincode', '')) < 5:
         errors['pincode'] = 'Valid pincode is required.'
+    elif pincode_info is None:
+        errors['pincode'] = 'This pincode does not exist.'
     if not email:
         errors['email'] = 'Email is required.'
     if errors:
@@ -348,28 +441,25 @@ def place_order(request):
     subtotal = 0
     order_items_data = []
     out_of_stock = []
-    for it in items:
-        product_name = it.get('name', 'Unknown')
+    for it, product in zip(items, _resolve_products(items)):
         qty = max(1, int(it.get('quantity', 1)))
         size = it.get('size', '')
 
-        # Lookup product from DB to validate price
-        product = ShowcaseProduct.objects.filter(name=product_name, is_active=True).first()
         if product:
             # Use server-side price (discounted if available)
             price = int(product.discounted_price if product.discounted_price else product.price)
             # Check stock
             if product.stock_quantity < qty:
-                out_of_stock.append(f'{product_name} (only {product.stock_quantity} left)')
+                out_of_stock.append(f'{product.name} (only {product.stock_quantity} left)')
                 continue
         else:
             # Product not found — reject
-            return JsonResponse({'ok': False, 'error': f'Product "{product_name}" not found or unavailable.'})
+            return JsonResponse({'ok': False, 'error': f'Product "{it.get("name", "Unknown")}" not found or unavailable.'})
 
         subtotal += price * qty
         order_items_data.append({
             'product': product,
-            'product_name': product_name,
+            'product_name': product.name,
             'price': price,
             'quantity': qty,
             'total': price * qty,
@@ -382,62 +472,39 @@ def place_order(request):
     if not order_items_data:
         return JsonResponse({'ok': False, 'error': 'No valid items in cart.'})
 
-    shipping_charge = 0 if subtotal >= 5000 else 199
+    # Whole-cart serviceability in one in-memory lookup (store.serviceability)
+    delivery = resolve_cart([d['product'].pk for d in order_items_data], shipping['pincode'].strip())
+    if delivery['configured'] and delivery['unavailable']:
+        names = [d['product_name'] for d in order_items_data if d['product'].pk in delivery['unavailable']]
+        return JsonResponse({
+            'ok': False,
+            'error': f'Not deliverable to {shipping["pincode"]}: {", ".join(dict.fromkeys(names))}',
+        })
+
+    shipping_charge = (0 if subtotal >= 5000 else 199) + delivery['extra_charge']
 
-    # ── Apply coupon if provided ──
-    coupon_code = body.get('coupon_code', '').strip()
-    discount_amount = 0
-    applied_coupon = None
-    if coupon_code:
-        from store.models import Coupon
-        try:
-            coupon = Coupon.objects.get(code__iexact=coupon_code)
-            if coupon.is_valid(order_total=subtotal, user=request.user)[0]:
-                discount_amount = coupon.calculate_discount(subtotal)
-                coupon.used_count += 1
-                coupon.save(update_fields=['used_count'])
-                applied_coupon = coupon
-        except Coupon.DoesNotExist:
-            pass
+    # Abandoned online checkouts give their reserved stock back
+    stock.release_expired_now_and_then()
 
-    total = max(0, subtotal + shipping_charge - discount_amount)
+    quantities = Counter()
+    for oi in order_items_data:
+        quantities[oi['product'].pk] += oi['quantity']
 
     # Determine payment status based on method
     is_online = payment_method in ('razorpay', 'upi', 'card', 'netbanking')
 
-    order = Order.objects.create(
-        user=user,
-        status='pending' if is_online else 'confirmed',
-        payment_status='pending' if is_online else 'paid',
-        payment_method='razorpay' if is_online else 'cod',
-        shipping_full_name=shipping['full_name'],
-        shipping_phone=shipping.get('phone', ''),
-        shipping_address=f"{shipping['address_line1']}, {shipping.get('address_line2', '')}".rstrip(', '),
-        shipping_city=shipping['city'],
-        shipping_state=shipping['state'],
-        shipping_pincode=shipping['pincode'],
-        subtotal=subtotal,
-        shipping_charge=shipping_charge,
-        total=total,
-        coupon_code=coupon_code if discount_amount else '',
-        discount_amount=discount_amount,
-    )
-
-    for oi in order_items_data:
-        product = oi.get('product')
-        OrderItem.objects.create(
-            order=order,
-            product=product,
-            product_name=oi['product_name'],
-            price=oi['price'],
-            quantity=oi['quantity'],
-            total=oi['total'],
-            size=oi.get('size', ''),
-        )
-        # Decrement stock
-        if product and product.stock_quantity >= oi['quantity']:
-            product.stock_quantity -= oi['quantity']
-            product.save(update_fields=['stock_quantity'])
+    # Coupon, order, items and stock commit together or not at all
+    try:
+        with transaction.atomic():
+            order = _create_order(
+                request, user, shipping, order_items_data, quantities,
+                subtotal, shipping_charge, is_online, body.get('coupon_code', '').strip(),
+            )
+    except stock.OutOfStock as e:
+        names = {d['product'].pk: d['product_name'] for d in order_items_data}
+        short = [f'{names[pk]} (only {left} left)' for pk, left in e.shortages.items()]
+        return JsonResponse({'ok': False, 'error': f'Insufficient stock: {", ".join(short)}'})
+    total = order.total
 
     # For online payment methods — create a Razorpay order
     if is_online:
@@ -454,6 +521,7 @@ def place_order(request):
             order.status = 'confirmed'
             order.payment_status = 'paid'
             order.save(update_fields=['payment_method', 'status', 'payment_status'])
+            stock.commit(order)
             return JsonResponse({
                 'ok': True,
                 'order_number': order.order_number,
@@ -499,17 +567,7 @@ def place_order(request):
         except Exception as e:
             logger.error(f'Razorpay order creation failed: {e}')
 
-            # Roll back inventory + coupon usage for a failed online checkout attempt.
-            for oi in order_items_data:
-                product = oi.get('product')
-                if product:
-                    product.stock_quantity += oi['quantity']
-                    product.save(update_fields=['stock_quantity'])
-
-            if applied_coupon and applied_coupon.used_count > 0:
-                applied_coupon.used_count -= 1
-                applied_coupon.save(update_fields=['used_count'])
-
+            # Deleting the pending order releases its reserved stock and coupon use
             order.delete()
             return JsonResponse({
                 'ok': False,
@@ -537,6 +595,17 @@ def _send_order_email_safe(order):
         logger.error(f'Order email error: {e}')
 
 
+def _retake_stock(order):
+    """Take the stock of an order whose reservation was released, and its
+    coupon use. Raises stock.OutOfStock."""
+    quantities = Counter()
+    for product_id, quantity in order.items.exclude(product=None).values_list('product_id', 'quantity'):
+        quantities[product_id] += quantity
+    stock.take(quantities)
+    if order.coupon_code and order.discount_amount:
+        Coupon.objects.filter(code__iexact=order.coupon_code).update(used_count=F('used_count') + 1)
+
+
 @require_POST
 def verify_razorpay_payment(request):
     """AJAX: verify Razorpay payment signature after successful checkout."""
@@ -589,12 +658,27 @@ def verify_razorpay_payment(request):
         logger.error(f'Razorpay verification error: {e}')
         return JsonResponse({'ok': False, 'error': 'Payment verification error. Please contact support.'})
 
-    # Signature verified — mark order as paid
-    order.razorpay_payment_id = razorpay_payment_id
-    order.razorpay_signature = razorpay_signature
-    order.payment_status = 'paid'
-    order.status = 'confirmed'
-    order.save(update_fields=['razorpay_payment_id', 'razorpay_signature', 'payment_status', 'status'])
+    # Signature verified — the reserved stock is sold; mark order as paid
+    with transaction.atomic():
+        order = Order.objects.select_for_update().get(pk=order.pk)
+        order.razorpay_payment_id = razorpay_payment_id
+        order.razorpay_signature = razorpay_signature
+        if order.payment_status == 'failed':
+            # Paid after the reservation expired and the stock went back on sale
+            try:
+                _retake_stock(order)
+            except stock.OutOfStock:
+                order.notes = 'Paid after the stock reservation expired; items sold out, refund due.'
+                order.save(update_fields=['razorpay_payment_id', 'razorpay_signature', 'notes'])
+                return JsonResponse({
+                    'ok': False,
+                    'error': 'Payment received, but the items sold out while it was pending. '
+                             'A refund will be issued — please contact support.',
+                })
+        stock.commit(order)
+        order.payment_status = 'paid'
+        order.status = 'confirmed'
+        order.save(update_fields=['razorpay_payment_id', 'razorpay_signature', 'payment_status', 'status'])
 
     _send_order_email_safe(order)
 
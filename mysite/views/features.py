@@ -13,9 +13,12 @@ from django.core.mail import send_mail
 from django.conf import settings as django_settings
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
+from mysite.conditional import product_condition, wishlist_condition
 from store.models import (
     ContactMessage, Wishlist, ShowcaseProduct, Review, Coupon, Order,
 )
+from store.catalog_cache import keep_product_version
+from store.product_bundle import review_payload
 
 logger = logging.getLogger(__name__)
 
@@ -111,6 +114,7 @@ def wishlist_toggle(request):
     return JsonResponse({'ok': True, 'added': True, 'message': 'Added to wishlist!'})
 
 
+@wishlist_condition
 def wishlist_list(request):
     """AJAX: get the current user's wishlist product IDs."""
     if not request.user.is_authenticated:
@@ -202,35 +206,19 @@ def review_submit(request):
     })
 
 
+@product_condition
 def review_list(request):
     """AJAX: get reviews for a product."""
     product_id = request.GET.get('product_id')
     if not product_id:
         return JsonResponse({'ok': False, 'error': 'Product ID required.'}, status=400)
 
-    reviews = Review.objects.filter(
-        product_id=product_id, is_approved=True
-    ).select_related('user').order_by('-created_at')[:20]
+    product = ShowcaseProduct.objects.filter(pk=product_id).first() if product_id.isdigit() else None
+    if product is None:
+        return JsonResponse({'ok': False, 'error': 'Product not found.'}, status=404)
 
-    # Check which reviewers are verified purchasers
-    verified_users = set(Order.objects.filter(
-        items__product_id=product_id,
-        status='delivered',
-    ).values_list('user_id', flat=True))
-
-    data = []
-    for r in reviews:
-        data.append({
-            'id': r.pk,
-            'rating': r.rating,
-            'title': r.title,
-            'comment': r.comment,
-            'user': r.user.first_name or r.user.username,
-            'created_at': r.created_at.strftime('%b %d, %Y'),
-            'verified_purchase': r.user_id in verified_users,
-        })
-
-    return JsonResponse({'ok': True, 'reviews': data})
+    keep_product_version(pk=product.pk)
+    return JsonResponse({'ok': True, **review_payload(product)})
 
 
 # ── Coupon ──
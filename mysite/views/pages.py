@@ -1,94 +1,220 @@
 """Public page views — home, about, shop, product detail."""
 
-from django.shortcuts import render, get_object_or_404
+from itertools import islice
+
+from django.core.cache import cache
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from store.models import (
-    HeroSection, FeaturedCollection, ShowcaseProduct, CollectionCard,
-    ParallaxSection, ShopBanner, StatItem, ContactInfo, AboutPage,
+from mysite.conditional import catalog_condition
+from store.models import ShowcaseProduct, ShopBanner, ContactInfo, AboutPage
+from store.catalog_cache import get_catalog_version, get_home_snapshot
+from store.facets import (
+    apply_filters, filters_key, get_facet_counts, get_product_set, has_filters, parse_filters,
+)
+from store.pagination import (
+    KEYSET_ORDERING, cursor_key, decode_cursor, encode_cursor, get_category_counts, get_showcase_page,
+    keyset_page,
 )
+from store.product_bundle import get_product_bundle, get_related_products
+from store.serviceability import clean_pincode, deliverable
+from store.singletons import get_active
 
 
 def home(request):
-    featured_collections = list(FeaturedCollection.objects.filter(is_active=True))
-    collection_cards = list(CollectionCard.objects.filter(is_active=True))
-
-    # Batch-fetch product slugs in one query instead of N+1
-    all_names = [fc.name for fc in featured_collections] + [cc.name for cc in collection_cards]
-    slug_map = dict(
-        ShowcaseProduct.objects.filter(name__in=all_names, is_active=True)
-        .values_list('name', 'slug')
-    )
-    for fc in featured_collections:
-        fc.product_slug = slug_map.get(fc.name)
-    for cc in collection_cards:
-        cc.product_slug = slug_map.get(cc.name)
-
-    context = {
-        'hero': HeroSection.objects.filter(is_active=True).first(),
-        'featured_collections': featured_collections,
-        'showcase_products': ShowcaseProduct.objects.filter(is_active=True).only(
-            'name', 'slug', 'image', 'price', 'discount_percent', 'discounted_price', 'category',
-        ),
-        'collection_cards': collection_cards,
-        'parallax': ParallaxSection.objects.filter(is_active=True).first(),
-        'stats': StatItem.objects.filter(is_active=True),
-        'contact': ContactInfo.objects.filter(is_active=True).first(),
-    }
+    # Hero, collections, stats and contact come from the versioned snapshot
+    context = dict(get_home_snapshot())
+    # Showcase renders its first page only; /api/showcase/ streams the rest
+    context['showcase_products'], context['showcase_next_cursor'] = get_showcase_page()
     return render(request, 'home.html', context)
 
 
 def about(request):
     """About page — founder story and brand mission."""
     context = {
-        'about': AboutPage.objects.filter(is_active=True).first(),
-        'contact': ContactInfo.objects.filter(is_active=True).first(),
+        'about': get_active(AboutPage),
+        'contact': get_active(ContactInfo),
     }
     return render(request, 'about.html', context)
 
 
-def shop(request):
-    """Shop page — all products with category sidebar filtering."""
-    category = request.GET.get('category', 'all')
+SHOP_PAGE_SIZE = 12
+
+
+def shop_products(category, filters=None):
+    """Active products for the shop grid, optionally filtered by category
+    and facets (see store.facets)."""
     products = ShowcaseProduct.objects.filter(is_active=True).only(
         'name', 'slug', 'image', 'price', 'discount_percent', 'discounted_price', 'category',
+        'available_sizes', 'display_order', 'created_at', 'rating_sum', 'rating_count',
     )
     if category and category != 'all':
         products = products.filter(category=category)
+    if filters:
+        products = apply_filters(products, filters)
+    return products
+
+
+SHOP_CATEGORIES = {value for value, _ in ShowcaseProduct.CATEGORY_CHOICES} | {'all'}
+_SHOP_GRID_TTL = 60 * 60 * 24
+
+
+def deliverable_page(category, cursor, filters, pincode):
+    """(products, next_cursor, total) for the shop products that ship to
+    ``pincode``. The category and facet matches come from the cache as a
+    bitmap, the pincode narrows them in memory (store.serviceability), and
+    the only query fetches the page's own products."""
+    ids, bitmap = get_product_set(category, filters)
+    matches = deliverable(bitmap, pincode)
+    bits = matches.to_bytes(bitmap.bit_length() // 8 + 1, 'little')
+    start = 0
+    key = decode_cursor(cursor) if cursor else None
+    if key:
+        try:
+            start = ids.index(key[2]) + 1
+        except ValueError:
+            pass    # product gone since the cursor was issued: start over
+    page_ids = []
+    for pk in islice(ids, start, None):
+        if bits[pk >> 3] >> (pk & 7) & 1:
+            page_ids.append(pk)
+            if len(page_ids) > SHOP_PAGE_SIZE:
+                break
+    products = list(
+        shop_products('all').filter(pk__in=page_ids[:SHOP_PAGE_SIZE]).order_by(*KEYSET_ORDERING)
+    )
+    next_cursor = encode_cursor(products[-1]) if products and len(page_ids) > SHOP_PAGE_SIZE else None
+    return products, next_cursor, matches.bit_count()
+
+
+def shop_grid(category, cursor=None, filters=None, deliver_to=None):
+    """Rendered cards for one shop page plus the next cursor and the
+    matching total. Cached per catalog version, category, facet filters
+    and cursor; with ``deliver_to`` only the product ids are cached."""
+    if deliver_to and category in SHOP_CATEGORIES:
+        products, next_cursor, count = deliverable_page(category, cursor, filters, deliver_to)
+        return {
+            'html': render_to_string('partials/product_grid.html', {
+                'products': products,
+                'cursor': cursor,
+            }),
+            'next_cursor': next_cursor,
+            'count': count,
+        }
+    filtered = filters is not None and has_filters(filters)
+    filter_part = filters_key(filters) if filtered else ''
+    position = cursor_key(cursor)
+    cursor = cursor if position else None    # a bad cursor is the first page
+    key = f'shop:grid:{get_catalog_version()}:{category}:{filter_part}:{position}'
+    grid = cache.get(key) if category in SHOP_CATEGORIES else None
+    if grid is None:
+        products, next_cursor = keyset_page(
+            shop_products(category, filters if filtered else None), cursor, SHOP_PAGE_SIZE,
+        )
+        grid = {
+            'html': render_to_string('partials/product_grid.html', {
+                'products': products,
+                'cursor': cursor,
+            }),
+            'next_cursor': next_cursor,
+            'count': (
+                get_facet_counts(category, filters)['total'] if filtered
+                else get_category_counts().get(category, 0)
+            ),
+        }
+        if category in SHOP_CATEGORIES:
+            cache.set(key, grid, _SHOP_GRID_TTL)
+    return grid
+
+
+@catalog_condition
+def _shop_fragment(request, category):
+    filters = parse_filters(request.GET)
+    deliver_to = clean_pincode(request.GET.get('deliver_to'))
+    data = {'ok': True, **shop_grid(category, request.GET.get('cursor'), filters, deliver_to)}
+    if category in SHOP_CATEGORIES:
+        data['facets'] = get_facet_counts(category, filters)
+    response = JsonResponse(data)
+    patch_vary_headers(response, ['X-Requested-With'])
+    return response
+
+
+def shop(request):
+    """Shop page — all products with category sidebar filtering.
+    Pages are cursor-based (see store.pagination); ``?page=N`` links from
+    before the switch still resolve, with the total taken from the cached
+    counts instead of a COUNT(*). Filter clicks and infinite scroll send
+    X-Requested-With and get just the grid as JSON (see shop_grid), with
+    the facet counts for the sidebar filters (store.facets).
+    ``?deliver_to=`` keeps only products that ship to that pincode."""
+    category = request.GET.get('category', 'all')
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return _shop_fragment(request, category)
+
+    counts = get_category_counts()
+    filters = parse_filters(request.GET)
+    filtered = has_filters(filters)
+    deliver_to = clean_pincode(request.GET.get('deliver_to'))
+    if category not in SHOP_CATEGORIES:
+        deliver_to = None
+    facets = get_facet_counts(category, filters) if category in SHOP_CATEGORIES else None
+    total = facets['total'] if filtered and facets else counts.get(category, 0)
+    products = shop_products(category, filters if filtered else None)
 
-    # Paginate — 12 products per page
-    paginator = Paginator(products, 12)
-    page_num = request.GET.get('page', 1)
-    try:
-        page_obj = paginator.page(page_num)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    page_num = request.GET.get('page')
+    if deliver_to:
+        page_products, next_cursor, total = deliverable_page(
+            category, request.GET.get('cursor'), filters, deliver_to,
+        )
+    elif page_num:
+        paginator = Paginator(products.order_by(*KEYSET_ORDERING), SHOP_PAGE_SIZE)
+        paginator.count = total
+        try:
+            page_obj = paginator.page(page_num)
+        except PageNotAnInteger:
+            page_obj = paginator.page(1)
+        except EmptyPage:
+            page_obj = paginator.page(paginator.num_pages)
+        page_products = list(page_obj)
+        next_cursor = encode_cursor(page_products[-1]) if page_obj.has_next() else None
+    else:
+        page_products, next_cursor = keyset_page(
+            products, request.GET.get('cursor'), SHOP_PAGE_SIZE,
+        )
 
     context = {
-        'products': page_obj,
-        'page_obj': page_obj,
-        'categories': ShowcaseProduct.CATEGORY_CHOICES,
+        'products': page_products,
+        'next_cursor': next_cursor,
+        'cursor': request.GET.get('cursor'),
+        'category_counts': counts,
+        'total_count': total,
+        'categories': [
+            (value, label, counts.get(value, 0))
+            for value, label in ShowcaseProduct.CATEGORY_CHOICES
+        ],
         'active_category': category,
-        'shop_banner': ShopBanner.objects.filter(is_active=True).first(),
-        'contact': ContactInfo.objects.filter(is_active=True).first(),
+        'facets': facets,
+        'filters': filters,
+        'deliver_to': deliver_to,
+        'shop_banner': get_active(ShopBanner),
+        'contact': get_active(ContactInfo),
     }
-    return render(request, 'shop.html', context)
+    response = render(request, 'shop.html', context)
+    patch_vary_headers(response, ['X-Requested-With'])
+    return response
 
 
 def product_detail(request, slug):
-    """Individual product detail page."""
-    product = get_object_or_404(ShowcaseProduct, slug=slug, is_active=True)
-    gallery_images = product.images.only('image', 'alt_text', 'display_order')
-    related_products = ShowcaseProduct.objects.filter(
-        category=product.category, is_active=True
-    ).exclude(pk=product.pk).only(
-        'name', 'slug', 'image', 'price', 'discount_percent', 'discounted_price',
-    )[:4]
+    """Individual product detail page — product, gallery, reviews and
+    pincodes come from the cached bundle (see store.product_bundle)."""
+    bundle = get_product_bundle(slug)
+    if bundle is None:
+        raise Http404('No product matches the given query.')
     context = {
-        'product': product,
-        'gallery_images': gallery_images,
-        'related_products': related_products,
-        'contact': ContactInfo.objects.filter(is_active=True).first(),
+        **bundle,
+        'related_products': get_related_products(bundle['product']),
+        'contact': get_active(ContactInfo),
     }
     return render(request, 'product_detail.html', context)
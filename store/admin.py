@@ -1,4 +1,11 @@
-from django.contrib import admin
+import io
+from datetime import timedelta
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 from django.utils.html import format_html
 from django.db.models import Sum, Count, Avg
 from django.utils import timezone
@@ -6,8 +13,10 @@ from .models import (
     HeroSection, FeaturedCollection, ShowcaseProduct, ProductImage,
     CollectionCard, ParallaxSection, ShopBanner, StatItem, ContactInfo, AboutPage,
     PincodeAvailability, Address, Order, OrderItem, ReturnExchange, UserProfile,
-    ContactMessage, Wishlist, Review, Coupon,
+    ContactMessage, Wishlist, Review, Coupon, SearchQueryStat, ServiceabilityRule,
+    StockReservation,
 )
+from . import pincode_csv
 
 
 @admin.register(HeroSection)
@@ -77,6 +86,13 @@ class PincodeAvailabilityInline(admin.TabularInline):
     ordering = ('pincode',)
 
 
+class ServiceabilityRuleInline(admin.TabularInline):
+    model = ServiceabilityRule
+    extra = 0
+    fields = ('region', 'pincode_from', 'pincode_to', 'is_available', 'delivery_days', 'extra_charge')
+    verbose_name_plural = 'Serviceability overrides (pincode ranges for this product only)'
+
+
 @admin.register(ShowcaseProduct)
 class ShowcaseProductAdmin(admin.ModelAdmin):
     list_display = ('name', 'category', 'formatted_price', 'discount_percent', 'formatted_discounted_price', 'stock_quantity', 'image_preview', 'display_order', 'is_active')
@@ -92,7 +108,7 @@ class ShowcaseProductAdmin(admin.ModelAdmin):
         ('Stock', {'fields': ('stock_quantity',), 'description': 'Set to 0 when out of stock.'}),
         ('Display', {'fields': ('display_order', 'is_active')}),
     )
-    inlines = [ProductImageInline, PincodeAvailabilityInline]
+    inlines = [ProductImageInline, ServiceabilityRuleInline, PincodeAvailabilityInline]
 
     def image_preview(self, obj):
         if obj.image:
@@ -213,6 +229,9 @@ class PincodeAvailabilityAdmin(admin.ModelAdmin):
     list_editable = ('is_available', 'delivery_days', 'extra_charge')
     search_fields = ('product__name', 'pincode')
     readonly_fields = ('created_at', 'updated_at')
+    actions = ['export_csv']
+    change_list_template = 'admin/store/pincodeavailability/change_list.html'
+    DIFF_LINES = 50
     fieldsets = (
         ('Product & Pincode', {'fields': ('product', 'pincode')}),
         ('Availability', {
@@ -231,6 +250,75 @@ class PincodeAvailabilityAdmin(admin.ModelAdmin):
         return format_html('<span style="color: red; font-weight: bold;">✗ Unavailable</span>')
     availability_status.short_description = 'Status'
 
+    @admin.action(description='Export selected to CSV')
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(pincode_csv.export_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="pincode-availability.csv"'
+        return response
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='store_pincodeavailability_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Upload a courier CSV; a dry run lists the first DIFF_LINES changes."""
+        if not self.has_change_permission(request) or not self.has_add_permission(request):
+            raise PermissionDenied
+        context = {**self.admin_site.each_context(request), 'opts': self.model._meta, 'title': 'Import pincode availability CSV'}
+        upload = request.FILES.get('csv_file') if request.method == 'POST' else None
+        if upload is not None:
+            dry_run = bool(request.POST.get('dry_run'))
+            diff = []
+
+            def on_diff(line):
+                if len(diff) < self.DIFF_LINES:
+                    diff.append(line)
+            try:
+                stats = pincode_csv.import_csv(
+                    io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''), dry_run, on_diff,
+                )
+            except (ValueError, UnicodeDecodeError) as exc:
+                self.message_user(request, f'Could not import {upload.name}: {exc}', messages.ERROR)
+            else:
+                context.update(stats=stats, diff=diff, dry_run=dry_run)
+                if not dry_run:
+                    self.message_user(
+                        request,
+                        f'Imported {upload.name}: {stats["created"]} created, {stats["updated"]} updated, '
+                        f'{stats["unchanged"]} unchanged, {stats["skipped"]} skipped.',
+                        messages.SUCCESS,
+                    )
+        return TemplateResponse(request, 'admin/store/pincodeavailability/import.html', context)
+
+
+@admin.register(ServiceabilityRule)
+class ServiceabilityRuleAdmin(admin.ModelAdmin):
+    list_display = ('region', 'pincode_from', 'pincode_to', 'product', 'availability_status', 'delivery_days', 'extra_charge', 'updated_at')
+    list_filter = ('is_available', ('product', admin.EmptyFieldListFilter))
+    search_fields = ('region', 'pincode_from', 'product__name')
+    raw_id_fields = ('product',)
+    readonly_fields = ('created_at', 'updated_at')
+    fieldsets = (
+        ('Range', {
+            'fields': ('region', 'pincode_from', 'pincode_to', 'product'),
+            'description': 'Pincodes or prefixes: 11 to 11 covers every pincode from 110000 to 119999. '
+                           'Leave the product blank for a default that applies to every product; '
+                           'narrower ranges and product overrides take precedence.'
+        }),
+        ('Availability', {'fields': ('is_available', 'delivery_days', 'extra_charge')}),
+        ('Timestamps', {
+            'fields': ('created_at', 'updated_at'),
+            'classes': ('collapse',),
+        }),
+    )
+
+    def availability_status(self, obj):
+        if obj.is_available:
+            return format_html('<span style="color: green; font-weight: bold;">✓ Available</span>')
+        return format_html('<span style="color: red; font-weight: bold;">✗ Unavailable</span>')
+    availability_status.short_description = 'Status'
+
 
 @admin.register(Address)
 class AddressAdmin(admin.ModelAdmin):
@@ -253,6 +341,17 @@ class OrderItemInline(admin.TabularInline):
     readonly_fields = ('total',)
 
 
+class StockReservationInline(admin.TabularInline):
+    model = StockReservation
+    extra = 0
+    fields = ('product', 'quantity', 'expires_at')
+    readonly_fields = ('product', 'quantity', 'expires_at')
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = ('order_number', 'user', 'status', 'status_badge', 'payment_status', 'formatted_total', 'tracking_number', 'created_at')
@@ -260,7 +359,7 @@ class OrderAdmin(admin.ModelAdmin):
     list_editable = ('status', 'payment_status')
     search_fields = ('order_number', 'user__username', 'user__email', 'tracking_number', 'shipping_full_name')
     readonly_fields = ('order_number', 'created_at', 'updated_at', 'cancelled_at')
-    inlines = [OrderItemInline]
+    inlines = [OrderItemInline, StockReservationInline]
     fieldsets = (
         ('Order Info', {'fields': ('order_number', 'user', 'status', 'payment_status', 'payment_method')}),
         ('Shipping Address', {'fields': ('shipping_full_name', 'shipping_phone', 'shipping_address', 'shipping_city', 'shipping_state', 'shipping_pincode')}),
@@ -391,6 +490,40 @@ class WishlistAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'product__name')
 
 
+@admin.register(SearchQueryStat)
+class SearchQueryStatAdmin(admin.ModelAdmin):
+    """Read-only daily search counts, with a report of the top and
+    zero-result queries over the last REPORT_DAYS days."""
+    REPORT_DAYS = 30
+    REPORT_ROWS = 25
+
+    list_display = ('query', 'day', 'searches', 'zero_results', 'revalidated')
+    list_filter = ('day',)
+    search_fields = ('query',)
+    date_hierarchy = 'day'
+    change_list_template = 'admin/store/searchquerystat/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        since = timezone.localdate() - timedelta(days=self.REPORT_DAYS - 1)
+        totals = (
+            SearchQueryStat.objects.filter(day__gte=since).values('query')
+            .annotate(total=Sum('searches'), empty=Sum('zero_results'))
+        )
+        extra_context = {
+            **(extra_context or {}),
+            'report_days': self.REPORT_DAYS,
+            'top_queries': totals.order_by('-total', 'query')[:self.REPORT_ROWS],
+            'zero_result_queries': totals.filter(empty__gt=0).order_by('-empty', 'query')[:self.REPORT_ROWS],
+        }
+        return super().changelist_view(request, extra_context=extra_context)
+
+
 # ── Admin site customisation ──
 admin.site.site_header = 'House of Ambava — Admin'
 admin.site.site_title = 'HOA Admin'
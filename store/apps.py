@@ -22,3 +22,9 @@ class StoreConfig(AppConfig):
         # Register signals (email notifications + payment rollback safety)
         import store.signals  # noqa: F401
         import store.payment_rollback_signals  # noqa: F401
+        # Catalog cache invalidation (homepage snapshot)
+        import store.catalog_signals  # noqa: F401
+        # Denormalized review aggregates on ShowcaseProduct
+        import store.rating_signals  # noqa: F401
+        # Per-worker search index, updated as searchable rows change
+        import store.search.signals  # noqa: F401
@@ -0,0 +1,255 @@
+"""Synthetic catalogs and latency measurements for the catalog benchmark.
+
+``generate_catalog`` fills the catalog tables with a deterministic
+synthetic shop of any size — products with descriptions, gallery rows,
+reviews and pincodes — and ``run_benchmarks`` times the hot catalog views
+and APIs through the Django test client; ``run_checkout_benchmarks`` times
+place_order over carts of growing length. Driven by
+``python manage.py benchmark_catalog``; nothing here runs in production.
+Runs go inside ``isolated_state()``: a private in-process cache and empty
+per-worker registries, so the configured cache is never read or cleared.
+"""
+
+import json
+import math
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .catalog_cache import bump_catalog_version, bump_version
+from .models import (
+    Order, OrderItem, PincodeAvailability, ProductImage, ProductRecommendation, ReturnExchange, Review,
+    ServiceabilityRule, ShowcaseProduct, StockReservation, Wishlist,
+)
+from . import serviceability, singletons, stock
+from .ratings import rebuild_ratings
+from .search import index as search_index
+from .search.backends import get_backend
+from .serviceability import bump_serviceability_version
+
+_BATCH = 2000
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',    # its own store, apart from any other locmem cache
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+}
+
+_COLOURS = ('Ivory', 'Crimson', 'Emerald', 'Mustard', 'Blush', 'Midnight', 'Wine', 'Mint', 'Peach', 'Gold')
+_FABRICS = ('Pure Silk', 'Velvet', 'Georgette', 'Chiffon', 'Organza', 'Banarasi Silk', 'Net', 'Cotton')
+_GARMENTS = ('Lehenga', 'Saree', 'Anarkali', 'Sharara', 'Kurta Set', 'Gown', 'Choli', 'Dupatta')
+_WORK = ('zardozi', 'gota patti', 'mirror work', 'chikankari', 'bandhani', 'sequin', 'thread embroidery')
+_SIZES = ('XS,S,M', 'S,M,L', 'M,L,XL', 'S,M,L,XL,XXL', 'L,XL,XXL')
+_PINCODES = [f'{n:06d}' for n in range(110001, 110001 + 500)]
+_REVIEWERS = 200
+
+# Typeahead queries: prefixes, whole words, multi-word, typos, misses
+CART_SIZES = (1, 10, 50)
+_CHECKOUT_PINCODE = '400001'    # outside _PINCODES: delivery comes from one default rule
+SEARCH_QUERIES = ('le', 'leh', 'lehenga', 'silk sar', 'zardozi', 'lehnga', 'emrald', 'velvet gown', 'xyzzy')
+
+
+@contextmanager
+def isolated_state():
+    """Swap in a private cache for the run and start and end it with empty
+    per-worker registries, so nothing benchmarked reads or clears the
+    configured cache."""
+    _clear_registries()
+    try:
+        with override_settings(CACHES=BENCHMARK_CACHES):
+            yield
+    finally:
+        _clear_registries()
+
+
+def _clear_registries():
+    for registry in (search_index, serviceability, singletons, stock):
+        registry.clear()
+
+
+def generate_catalog(size, seed=0):
+    """Replace the catalog with ``size`` synthetic products. The same size
+    and seed always produce the same rows. Orders, reservations and
+    delivery rules left by an earlier run go too: they point at the old
+    products."""
+    rng = random.Random(seed)
+    # Plain DELETEs: the ORM's cascade would send a signal per row
+    with connection.cursor() as cursor:
+        for model in (
+            StockReservation, ReturnExchange, OrderItem, Order, ServiceabilityRule, Wishlist,
+            Review, PincodeAvailability, ProductImage, ProductRecommendation, ShowcaseProduct,
+        ):
+            cursor.execute(f'DELETE FROM {model._meta.db_table}')
+    categories = [value for value, _label in ShowcaseProduct.CATEGORY_CHOICES]
+
+    products = []
+    for n in range(size):
+        colour, fabric, garment = rng.choice(_COLOURS), rng.choice(_FABRICS), rng.choice(_GARMENTS)
+        name = f'{colour} {fabric} {garment} {n}'
+        price = Decimal(rng.randrange(2000, 60000, 500))
+        discount = rng.choice((0, 0, 0, 10, 20, 30))
+        product = ShowcaseProduct(
+            name=name,
+            slug=f'bench-{n}',
+            description=' '.join(
+                f'{rng.choice(_COLOURS)} {fabric.lower()} with {rng.choice(_WORK)} on the {part}.'
+                for part in ('bodice', 'border', 'dupatta', 'sleeves')[:rng.randint(1, 4)]
+            ),
+            category=rng.choice(categories),
+            price=price,
+            discount_percent=discount,
+            discounted_price=(price * (100 - discount) / 100).quantize(Decimal('0.01')) if discount else None,
+            image=f'showcase/bench-{n % 50}.jpg',
+            available_sizes=rng.choice(_SIZES),
+            fabric=fabric,
+            stock_quantity=rng.choice((0, 2, 5, 10, 50)),
+            display_order=rng.randrange(10),
+        )
+        # bulk_create skips save(): fill what it would have derived
+        product.size_mask = ShowcaseProduct.sizes_to_mask(product.size_list)
+        product.fabric_key = fabric.lower().replace(' ', '-')
+        products.append(product)
+    ShowcaseProduct.objects.bulk_create(products, batch_size=_BATCH)
+    product_ids = list(ShowcaseProduct.objects.order_by('pk').values_list('pk', flat=True))
+
+    ProductImage.objects.bulk_create((
+        ProductImage(product_id=pk, image=f'showcase/gallery/bench-{pk % 50}-{i}.jpg', alt_text=view, display_order=i)
+        for pk in product_ids for i, view in enumerate(('Front', 'Back', 'Detail')[:rng.randint(1, 3)])
+    ), batch_size=_BATCH)
+
+    PincodeAvailability.objects.bulk_create((
+        PincodeAvailability(product_id=pk, pincode=pincode, delivery_days=rng.randint(2, 9))
+        for pk in product_ids for pincode in rng.sample(_PINCODES, 3)
+    ), batch_size=_BATCH)
+
+    reviewers = list(User.objects.filter(username__startswith='bench-reviewer-').values_list('pk', flat=True))
+    if len(reviewers) < _REVIEWERS:
+        User.objects.bulk_create(
+            User(username=f'bench-reviewer-{n}') for n in range(len(reviewers), _REVIEWERS)
+        )
+        reviewers = list(User.objects.filter(username__startswith='bench-reviewer-').values_list('pk', flat=True))
+    Review.objects.bulk_create((
+        Review(product_id=pk, user_id=user_id, rating=rng.randint(1, 5), title='Lovely', comment='Beautiful work.')
+        for pk in product_ids for user_id in rng.sample(reviewers, rng.randint(0, 4))
+    ), batch_size=_BATCH)
+
+    # Signals did not fire for the bulk writes
+    rebuild_ratings()
+    get_backend().rebuild()
+    bump_version(search_index.SEARCH_VERSION_KEY)
+    bump_serviceability_version()
+    bump_catalog_version()
+    return product_ids
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of ``samples``."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _endpoints(slugs):
+    shop = reverse('shop')
+    xhr = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+    return {
+        'home': lambda n: (reverse('home'), {}, {}),
+        'shop': lambda n: (shop, {}, {}),
+        'shop_fragment': lambda n: (shop, {'category': 'bridal'}, xhr),
+        'shop_facets': lambda n: (shop, {'size': 'M', 'price': '5000-10000', 'in_stock': '1'}, xhr),
+        'product_detail': lambda n: (reverse('product_detail', args=[slugs[n % len(slugs)]]), {}, {}),
+        'search_api': lambda n: (reverse('search_api'), {'q': SEARCH_QUERIES[n % len(SEARCH_QUERIES)]}, {}),
+        'showcase_api': lambda n: (reverse('showcase_api'), {}, {}),
+    }
+
+
+def run_benchmarks(requests=50, endpoints=None):
+    """Time each endpoint: one cold request on an empty cache, then
+    ``requests`` warm ones. Returns {endpoint: stats}, times in ms.
+    Clears the default cache per endpoint — run it inside isolated_state()."""
+    # A few product pages in rotation: the first visit of each is a miss
+    slugs = list(ShowcaseProduct.objects.order_by('pk').values_list('slug', flat=True)[:5])
+    client = Client()
+    results = {}
+    for name, make_request in _endpoints(slugs).items():
+        if endpoints and name not in endpoints:
+            continue
+        cache.clear()
+        search_index.clear()
+        timings, queries = [], []
+        for n in range(requests + 1):
+            path, params, headers = make_request(n)
+            connection.queries_log.clear()   # the log is capped; counts need room
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.get(path, params, **headers)
+                elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise RuntimeError(f'{name}: {path} returned {response.status_code}')
+            timings.append(elapsed)
+            queries.append(len(captured))
+        results[name] = _stats(timings, queries)
+    return results
+
+
+def run_checkout_benchmarks(requests=20, cart_sizes=CART_SIZES):
+    """Time cash-on-delivery place_order for carts of each length in
+    ``cart_sizes``: one cold order, then ``requests`` warm ones. Returns
+    {'place_order_<lines>': stats}; the query counts should not grow with
+    the cart."""
+    ServiceabilityRule.objects.get_or_create(region='Benchmark', product=None, pincode_from=_CHECKOUT_PINCODE[:2])
+    bump_serviceability_version()
+    buyer, _ = User.objects.get_or_create(
+        username='bench-buyer', defaults={'email': 'bench-buyer@example.com', 'first_name': 'Bench'},
+    )
+    client = Client()
+    client.force_login(buyer)
+    product_ids = list(ShowcaseProduct.objects.order_by('pk').values_list('pk', flat=True)[:max(cart_sizes)])
+    ShowcaseProduct.objects.filter(pk__in=product_ids).update(is_active=True, stock_quantity=10 ** 6)
+
+    results = {}
+    for lines in cart_sizes:
+        body = json.dumps({
+            'items': [{'product_id': pk, 'quantity': 1, 'size': 'M'} for pk in product_ids[:lines]],
+            'shipping': {
+                'full_name': 'Bench Buyer', 'phone': '9999999999', 'address_line1': '1 Marine Drive',
+                'city': 'Mumbai', 'state': 'Maharashtra', 'pincode': _CHECKOUT_PINCODE,
+            },
+            'email': buyer.email,
+            'payment_method': 'cod',
+        })
+        timings, queries = [], []
+        for _n in range(requests + 1):
+            connection.queries_log.clear()
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = client.post(reverse('place_order'), body, content_type='application/json')
+                elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200 or not response.json().get('ok'):
+                raise RuntimeError(f'place_order ({lines} lines) failed: {response.content[:200]!r}')
+            timings.append(elapsed)
+            queries.append(len(captured))
+        results[f'place_order_{lines}'] = _stats(timings, queries)
+    return results
+
+
+def _stats(timings, queries):
+    cold, warm = timings[0], timings[1:] or timings
+    return {
+        'cold_ms': round(cold, 3),
+        'p50_ms': round(percentile(warm, 50), 3),
+        'p95_ms': round(percentile(warm, 95), 3),
+        'p99_ms': round(percentile(warm, 99), 3),
+        'mean_ms': round(statistics.fmean(warm), 3),
+        'cold_queries': queries[0],
+        'max_warm_queries': max(queries[1:] or queries),
+    }
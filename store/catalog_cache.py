@@ -0,0 +1,174 @@
+"""Versioned catalog caches — shared across workers via the default cache.
+
+Every catalog write bumps a single version key; cached snapshots are stored
+under that version, so stale entries simply stop being read and expire.
+"""
+
+import time
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+CATALOG_VERSION_KEY = 'catalog:version'
+_HOME_SNAPSHOT_TTL = 60 * 60 * 24   # content changes a few times a day
+
+
+# ── Version counters ─────────────────────────────────────────────
+
+def _new_version():
+    # Microsecond timestamp: unique per bump and never reused after a
+    # cache eviction, unlike an incrementing counter that restarts at 1.
+    # Doubles as a modification time for Last-Modified headers.
+    return time.time_ns() // 1000
+
+
+def get_version(key, timeout=None):
+    """Return the version stored under ``key``, creating it on first use
+    (kept for ``timeout`` seconds, forever by default)."""
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, timeout):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(*keys):
+    """Give every key in ``keys`` one new version."""
+    version = _new_version()
+    cache.set_many({key: version for key in keys}, None)
+    return version
+
+
+def version_datetime(version):
+    """The UTC time a version was created."""
+    return datetime.fromtimestamp(version / 1_000_000, tz=timezone.utc)
+
+
+def get_catalog_version():
+    """Return the current catalog version, creating it on first use."""
+    return get_version(CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalidate every snapshot keyed on the catalog version."""
+    return bump_version(CATALOG_VERSION_KEY)
+
+
+# ── Single-flight fills ──────────────────────────────────────────
+
+_MISSING = object()
+_FILL_WAIT = 2.0        # seconds a caller waits for another's fill
+_FILL_POLL = 0.01
+
+
+def single_flight(key, compute, timeout):
+    """Return the cached value for ``key``, computing it on a miss.
+
+    Concurrent misses on the same key, in any worker, elect one caller
+    through a short-lived lock entry; the others wait for its result
+    instead of repeating the work. If the fill takes longer than
+    ``_FILL_WAIT`` they give up waiting and compute it themselves.
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    lock_key = f'{key}:filling'
+    if cache.add(lock_key, 1, int(_FILL_WAIT) + 1):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+    deadline = time.monotonic() + _FILL_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(_FILL_POLL)
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+    return compute()
+
+
+# ── Per-product version ──────────────────────────────────────────
+# One version per product, reachable by slug (PDP bundle) and by id
+# (JSON endpoints that take product_id). Slugs never contain '#'.
+# Any slug or id can be asked for, so a version is created with a short
+# TTL and kept for good only once the product is known to exist — 404
+# probes must not fill the cache with permanent keys. A version that
+# expires is recreated newer, which only costs a miss.
+
+UNKNOWN_PRODUCT_TTL = 60 * 5
+
+def _product_version_key(slug=None, pk=None):
+    return f'product:version:{slug}' if slug else f'product:version:#{pk}'
+
+
+def get_product_version(slug=None, pk=None):
+    """Version of one product's page data (row, gallery, reviews)."""
+    return get_version(_product_version_key(slug, pk), UNKNOWN_PRODUCT_TTL)
+
+
+def keep_product_version(slug=None, pk=None):
+    """The product exists: stop its version from expiring."""
+    cache.touch(_product_version_key(slug, pk), None)
+
+
+def bump_product_version(pk, *slugs):
+    keys = [_product_version_key(pk=pk)] if pk else []
+    keys += [_product_version_key(slug) for slug in slugs if slug]
+    if keys:
+        bump_version(*keys)
+
+
+def wishlist_version_key(user_id):
+    """Per-customer version, bumped on every wishlist add/remove."""
+    return f'wishlist:version:{user_id}'
+
+
+# ── Homepage snapshot ────────────────────────────────────────────
+
+def _home_snapshot_key(version):
+    return f'home:snapshot:{version}'
+
+
+def build_home_context():
+    """Run the homepage queries and return a picklable context dict."""
+    from .models import (
+        HeroSection, FeaturedCollection, ShowcaseProduct, CollectionCard,
+        ParallaxSection, StatItem, ContactInfo,
+    )
+
+    featured_collections = list(FeaturedCollection.objects.filter(is_active=True))
+    collection_cards = list(CollectionCard.objects.filter(is_active=True))
+
+    # Batch-fetch product slugs in one query instead of N+1
+    all_names = [fc.name for fc in featured_collections] + [cc.name for cc in collection_cards]
+    slug_map = dict(
+        ShowcaseProduct.objects.filter(name__in=all_names, is_active=True)
+        .values_list('name', 'slug')
+    )
+    for fc in featured_collections:
+        fc.product_slug = slug_map.get(fc.name)
+    for cc in collection_cards:
+        cc.product_slug = slug_map.get(cc.name)
+
+    return {
+        'hero': HeroSection.objects.filter(is_active=True).first(),
+        'featured_collections': featured_collections,
+        'collection_cards': collection_cards,
+        'parallax': ParallaxSection.objects.filter(is_active=True).first(),
+        'stats': list(StatItem.objects.filter(is_active=True)),
+        'contact': ContactInfo.objects.filter(is_active=True).first(),
+    }
+
+
+def get_home_snapshot():
+    """Return the homepage context for the current catalog version.
+    Builds and stores it on a miss; a hit costs no database queries."""
+    key = _home_snapshot_key(get_catalog_version())
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_home_context()
+        cache.set(key, snapshot, _HOME_SNAPSHOT_TTL)
+    return snapshot
@@ -0,0 +1,149 @@
+"""Signals that invalidate and rebuild the versioned catalog caches."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from .catalog_cache import (
+    bump_catalog_version, bump_product_version, bump_version, get_home_snapshot,
+    wishlist_version_key,
+)
+from .models import (
+    HeroSection, FeaturedCollection, CollectionCard, ShowcaseProduct,
+    ParallaxSection, StatItem, ContactInfo, ShopBanner, AboutPage, ProductImage,
+    PincodeAvailability, ServiceabilityRule, Wishlist, Order, OrderItem,
+)
+from .serviceability import bump_serviceability_version
+from .singletons import bump_singletons_version
+
+# Models whose rows appear on the home page
+HOME_MODELS = (
+    HeroSection, FeaturedCollection, CollectionCard, ShowcaseProduct,
+    ParallaxSection, StatItem, ContactInfo,
+)
+
+# Everything rendered into cached catalog pages (see mysite.middleware)
+CATALOG_MODELS = HOME_MODELS + (ProductImage,)
+
+# Site-chrome singletons held in each worker's registry. Their save()
+# overrides bump the registry version; deletes are caught here.
+SINGLETON_MODELS = (HeroSection, ParallaxSection, ShopBanner, ContactInfo, AboutPage)
+
+# Child rows that are part of a product's PDP bundle (see store.product_bundle).
+# Reviews are handled in store.rating_signals, after their aggregates move.
+PRODUCT_CHILD_MODELS = (ProductImage,)
+
+# Rows compiled into the serviceability map (see store.serviceability)
+SERVICEABILITY_MODELS = (PincodeAvailability, ServiceabilityRule)
+
+
+def catalog_changed(sender, **kwargs):
+    """Bump the catalog version and rebuild the homepage snapshot once the
+    write is committed. Several writes in one transaction rebuild only once,
+    because the snapshot for the newest version is cached by the first run.
+    Bumping earlier would let another worker cache the old rows under the
+    new version."""
+    transaction.on_commit(bump_catalog_version)
+    transaction.on_commit(get_home_snapshot)
+
+
+for _model in CATALOG_MODELS:
+    post_save.connect(catalog_changed, sender=_model, dispatch_uid=f'catalog_save_{_model.__name__}')
+    post_delete.connect(catalog_changed, sender=_model, dispatch_uid=f'catalog_delete_{_model.__name__}')
+
+
+def singleton_deleted(sender, **kwargs):
+    transaction.on_commit(bump_singletons_version)
+
+
+for _model in SINGLETON_MODELS:
+    post_delete.connect(singleton_deleted, sender=_model, dispatch_uid=f'singleton_delete_{_model.__name__}')
+
+
+def product_slug_before(sender, instance, **kwargs):
+    """Remember the stored slug so a rename also drops the old URL's bundle."""
+    instance._slug_before = None
+    if instance.pk:
+        instance._slug_before = (
+            ShowcaseProduct.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+        )
+
+
+def product_changed(sender, instance, **kwargs):
+    # After commit, like catalog_changed
+    pk, slugs = instance.pk, (instance.slug, getattr(instance, '_slug_before', None))
+    transaction.on_commit(lambda: bump_product_version(pk, *slugs))
+
+
+def bump_product_version_for(product_id):
+    # By id: the parent may already be gone when a cascade deletes children
+    slug = ShowcaseProduct.objects.filter(pk=product_id).values_list('slug', flat=True).first()
+    transaction.on_commit(lambda: bump_product_version(product_id, slug))
+
+
+def product_child_changed(sender, instance, **kwargs):
+    bump_product_version_for(instance.product_id)
+
+
+pre_save.connect(product_slug_before, sender=ShowcaseProduct, dispatch_uid='product_slug_before')
+post_save.connect(product_changed, sender=ShowcaseProduct, dispatch_uid='product_version_save')
+post_delete.connect(product_changed, sender=ShowcaseProduct, dispatch_uid='product_version_delete')
+
+for _model in PRODUCT_CHILD_MODELS:
+    post_save.connect(product_child_changed, sender=_model, dispatch_uid=f'product_child_save_{_model.__name__}')
+    post_delete.connect(product_child_changed, sender=_model, dispatch_uid=f'product_child_delete_{_model.__name__}')
+
+
+def _order_products_changed(order_id):
+    products = list(
+        OrderItem.objects.filter(order_id=order_id, product__isnull=False)
+        .values_list('product_id', 'product__slug').distinct()
+    )
+
+    def bump():
+        for pk, slug in products:
+            bump_product_version(pk, slug)
+    transaction.on_commit(bump)
+
+
+def order_delivered_before(sender, instance, **kwargs):
+    instance._delivered_before = bool(instance.pk) and Order.objects.filter(
+        pk=instance.pk, status='delivered',
+    ).exists()
+
+
+def order_delivery_changed(sender, instance, **kwargs):
+    """Bundled reviews mark verified purchases from delivered orders, so
+    an order becoming or ceasing to be delivered moves its products'
+    versions."""
+    if (instance.status == 'delivered') != getattr(instance, '_delivered_before', False):
+        _order_products_changed(instance.pk)
+
+
+def delivered_order_deleted(sender, instance, **kwargs):
+    # Before the cascade takes the items
+    if instance.status == 'delivered':
+        _order_products_changed(instance.pk)
+
+
+pre_save.connect(order_delivered_before, sender=Order, dispatch_uid='order_delivered_before')
+post_save.connect(order_delivery_changed, sender=Order, dispatch_uid='order_delivery_save')
+pre_delete.connect(delivered_order_deleted, sender=Order, dispatch_uid='order_delivery_delete')
+
+
+def wishlist_changed(sender, instance, **kwargs):
+    bump_version(wishlist_version_key(instance.user_id))
+
+
+post_save.connect(wishlist_changed, sender=Wishlist, dispatch_uid='wishlist_version_save')
+post_delete.connect(wishlist_changed, sender=Wishlist, dispatch_uid='wishlist_version_delete')
+
+
+def serviceability_changed(sender, **kwargs):
+    # After commit: a worker recompiling earlier would cache the old rows
+    # under the new version
+    transaction.on_commit(bump_serviceability_version)
+
+
+for _model in SERVICEABILITY_MODELS:
+    post_save.connect(serviceability_changed, sender=_model, dispatch_uid=f'serviceability_save_{_model.__name__}')
+    post_delete.connect(serviceability_changed, sender=_model, dispatch_uid=f'serviceability_delete_{_model.__name__}')
@@ -0,0 +1,167 @@
+"""Shop facets — size, fabric, price band and stock filters with counts.
+
+Filters read the normalised columns on ShowcaseProduct (size_mask,
+fabric_key, effective_price, is_in_stock) instead of parsing the free-text
+fields row by row. Counts are disjunctive: each facet is counted with
+every *other* active filter applied, so ticking "M" still shows how many
+products come in "L". That is one aggregate query per facet, four in all,
+cached per catalog version, category and filter set.
+
+``get_product_set`` keeps the matching ids too, in shop order and as a
+bitmap, for filters answered in memory (store.serviceability.deliverable).
+"""
+
+import hashlib
+from array import array
+
+from django.core.cache import cache
+from django.db.models import Count, F, Min, Q
+
+from .catalog_cache import get_catalog_version
+from .models import ShowcaseProduct
+from .pagination import KEYSET_ORDERING
+from .serviceability import bitmap_of
+
+_FACETS_TTL = 60 * 60 * 24
+MAX_FABRICS = 20
+
+SIZES = [code for code, _label in ShowcaseProduct.SIZE_CHOICES]
+SIZE_BITS = {code: 1 << n for n, code in enumerate(SIZES)}
+
+# (key, label, lower bound inclusive, upper bound exclusive) on effective_price
+PRICE_BANDS = (
+    ('under-5000', 'Under ₹5,000', None, 5000),
+    ('5000-10000', '₹5,000 – ₹10,000', 5000, 10000),
+    ('10000-25000', '₹10,000 – ₹25,000', 10000, 25000),
+    ('25000-plus', '₹25,000 & above', 25000, None),
+)
+_BAND_BY_KEY = {key: (low, high) for key, _label, low, high in PRICE_BANDS}
+
+
+def get_fabric_choices():
+    """[(fabric_key, label)] for active products, cached per catalog version."""
+    key = f'shop:fabrics:{get_catalog_version()}'
+    fabrics = cache.get(key)
+    if fabrics is None:
+        fabrics = list(
+            ShowcaseProduct.objects.filter(is_active=True).exclude(fabric_key='')
+            .values('fabric_key').annotate(label=Min('fabric')).order_by('fabric_key')
+            .values_list('fabric_key', 'label')
+        )
+        cache.set(key, fabrics, _FACETS_TTL)
+    return fabrics
+
+
+def parse_filters(params):
+    """Canonical filters from query parameters. Unknown values are dropped,
+    so every filter set maps to one bounded cache key."""
+    fabrics = dict(get_fabric_choices())
+    return {
+        'size': tuple(s for s in SIZES if s in params.getlist('size')),
+        'fabric': tuple(sorted(set(params.getlist('fabric')) & fabrics.keys())),
+        'price': tuple(b for b in _BAND_BY_KEY if b in params.getlist('price')),
+        'in_stock': params.get('in_stock') == '1',
+    }
+
+
+def filters_key(filters):
+    """Short stable digest of a parsed filter set, for cache keys."""
+    raw = '|'.join(','.join(filters[name]) for name in ('size', 'fabric', 'price'))
+    return hashlib.md5(f'{raw}|{int(filters["in_stock"])}'.encode()).hexdigest()[:12]
+
+
+def has_filters(filters):
+    return any(filters.values())
+
+
+def _price_q(band):
+    low, high = _BAND_BY_KEY[band]
+    q = Q()
+    if low is not None:
+        q &= Q(effective_price__gte=low)
+    if high is not None:
+        q &= Q(effective_price__lt=high)
+    return q
+
+
+def _bands_q(bands):
+    q = Q()
+    for band in bands:
+        q |= _price_q(band)
+    return q
+
+
+def apply_filters(products, filters, skip=None):
+    """Narrow ``products`` by every active filter except ``skip``."""
+    if filters['size'] and skip != 'size':
+        mask = sum(SIZE_BITS[size] for size in filters['size'])
+        products = products.alias(size_hits=F('size_mask').bitand(mask)).filter(size_hits__gt=0)
+    if filters['fabric'] and skip != 'fabric':
+        products = products.filter(fabric_key__in=filters['fabric'])
+    if filters['price'] and skip != 'price':
+        products = products.filter(_bands_q(filters['price']))
+    if filters['in_stock'] and skip != 'in_stock':
+        products = products.filter(is_in_stock=True)
+    return products
+
+
+def _count_facets(category, filters):
+    base = ShowcaseProduct.objects.filter(is_active=True)
+    if category and category != 'all':
+        base = base.filter(category=category)
+
+    sizes = apply_filters(base, filters, skip='size').annotate(**{
+        f'size_{n}': F('size_mask').bitand(bit) for n, bit in enumerate(SIZE_BITS.values())
+    }).aggregate(**{
+        code: Count('pk', filter=Q(**{f'size_{n}__gt': 0})) for n, code in enumerate(SIZES)
+    })
+
+    fabric_counts = dict(
+        apply_filters(base, filters, skip='fabric').exclude(fabric_key='')
+        .values('fabric_key').annotate(n=Count('pk')).values_list('fabric_key', 'n')
+    )
+    labels = dict(get_fabric_choices())
+    fabrics = sorted(fabric_counts.items(), key=lambda item: (-item[1], item[0]))[:MAX_FABRICS]
+
+    # Price bands, plus the total under every filter (the price filter is
+    # the only one this query leaves out)
+    price_filter = _bands_q(filters['price'])
+    prices = apply_filters(base, filters, skip='price').aggregate(
+        total=Count('pk', filter=price_filter) if filters['price'] else Count('pk'),
+        **{band: Count('pk', filter=_price_q(band)) for band in _BAND_BY_KEY},
+    )
+
+    in_stock = apply_filters(base, filters, skip='in_stock').filter(is_in_stock=True).count()
+
+    return {
+        'total': prices.pop('total'),
+        'size': [(code, sizes[code]) for code in SIZES],
+        'fabric': [(key, labels.get(key, key), n) for key, n in fabrics],
+        'price': [(key, label, prices[key]) for key, label, _low, _high in PRICE_BANDS],
+        'in_stock': in_stock,
+    }
+
+
+def get_facet_counts(category, filters):
+    """Matching total and per-facet counts, cached per catalog version."""
+    key = f'shop:facets:{get_catalog_version()}:{category}:{filters_key(filters)}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = _count_facets(category, filters)
+        cache.set(key, counts, _FACETS_TTL)
+    return counts
+
+
+def get_product_set(category, filters):
+    """(ids in shop order, bitmap of the same ids) for the active products
+    matching ``category`` and ``filters``, cached per catalog version."""
+    key = f'shop:ids:{get_catalog_version()}:{category}:{filters_key(filters)}'
+    product_set = cache.get(key)
+    if product_set is None:
+        products = ShowcaseProduct.objects.filter(is_active=True)
+        if category and category != 'all':
+            products = products.filter(category=category)
+        ids = array('l', apply_filters(products, filters).order_by(*KEYSET_ORDERING).values_list('pk', flat=True))
+        product_set = (ids, bitmap_of(ids))
+        cache.set(key, product_set, _FACETS_TTL)
+    return product_set
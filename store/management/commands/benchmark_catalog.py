@@ -0,0 +1,90 @@
+"""
+Benchmark the catalog views and APIs over synthetic catalogs of growing size.
+Builds a throwaway test database, fills it with a deterministic catalog per
+size (products, gallery rows, reviews, pincodes), times each endpoint through
+the test client — and place_order for carts of each --cart-sizes length —
+and writes p50/p95/p99 latency and query counts as JSON.
+Usage: python manage.py benchmark_catalog [--sizes 1000 10000 100000] [--requests 50] [--cart-sizes 1 10 50] [--output benchmarks/catalog.json]
+Never touches the configured database or cache — compare the JSON across commits.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from store.benchmark import (
+    CART_SIZES, generate_catalog, isolated_state, run_benchmarks, run_checkout_benchmarks,
+)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+class Command(BaseCommand):
+    help = 'Time the catalog views and APIs over synthetic 1k/10k/100k product catalogs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                            help='Catalog sizes to generate (default 1000 10000 100000)')
+        parser.add_argument('--requests', type=int, default=50, help='Warm requests per endpoint')
+        parser.add_argument('--seed', type=int, default=0, help='Catalog generator seed')
+        parser.add_argument('--cart-sizes', type=int, nargs='*', default=list(CART_SIZES),
+                            help='Cart lengths to time place_order with (default 1 10 50; none to skip)')
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Only time this endpoint (repeatable)')
+        parser.add_argument('--output', default='benchmarks/catalog.json', help='JSON report path')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = {}
+            with isolated_state():
+                for size in options['sizes']:
+                    self.stdout.write(f'Generating {size} products…')
+                    generate_catalog(size, seed=options['seed'])
+                    results[str(size)] = run_benchmarks(options['requests'], options['endpoints'])
+                    if options['cart_sizes']:
+                        results[str(size)].update(
+                            run_checkout_benchmarks(options['requests'], options['cart_sizes']),
+                        )
+                    for name, stats in results[str(size)].items():
+                        self.stdout.write(
+                            f'  {name:<16} p50 {stats["p50_ms"]:>8.2f}  p95 {stats["p95_ms"]:>8.2f}  '
+                            f'p99 {stats["p99_ms"]:>8.2f} ms  cold {stats["cold_ms"]:>9.2f} ms  '
+                            f'queries {stats["cold_queries"]}/{stats["max_warm_queries"]}'
+                        )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'seed': options['seed'],
+                'cart_sizes': options['cart_sizes'],
+            },
+            'results': results,
+        }
+        output = Path(options['output'])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + '\n')
+        self.stdout.write(self.style.SUCCESS(f'Wrote {output}.'))
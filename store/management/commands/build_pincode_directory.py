@@ -0,0 +1,32 @@
+"""
+Build the offline pincode directory (store.pincodes) from India Post's
+all-India pincode CSV (data.gov.in, "All India Pincode Directory").
+Usage: python manage.py build_pincode_directory all_india_pincodes.csv [--output PATH] [--partial]
+The result is flagged complete, so unlisted pincodes are rejected; pass
+--partial for a file that only covers some pincodes.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from store import pincodes
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped pincode directory from an India Post CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='India Post pincode CSV')
+        parser.add_argument('--output', default=None, help='Directory file (default: PINCODE_DIRECTORY_PATH)')
+        parser.add_argument('--partial', action='store_true', help='Do not reject pincodes missing from the file')
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.PINCODE_DIRECTORY_PATH
+        try:
+            with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+                entries = pincodes.read_csv(lines)
+            count = pincodes.write_directory(output, entries, complete=not options['partial'])
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+        pincodes.clear()
+        kind = 'partial' if options['partial'] else 'complete'
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} pincodes to {output} ({kind}).'))
@@ -0,0 +1,41 @@
+"""
+Rebuild the "customers also liked" neighbours shown on product pages.
+Reads orders, wishlists and reviews, computes item-item cosine similarity
+with NumPy and stores the top-k neighbours per product.
+Usage: python manage.py build_recommendations [--top-k 8]
+Schedule it (cron / Render job) — nothing here runs on the request path.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from store.catalog_cache import bump_catalog_version
+from store.models import ProductRecommendation, ShowcaseProduct
+from store.recommendations import build_neighbours, collect_interactions
+
+
+class Command(BaseCommand):
+    help = 'Rebuild co-purchase product recommendations from orders, wishlists and reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=8, help='Neighbours stored per product')
+
+    def handle(self, *args, **options):
+        user_ids, product_ids, weights = collect_interactions()
+        self.stdout.write(f'  {len(weights)} interactions from {len(set(user_ids.tolist()))} customers')
+
+        neighbours = build_neighbours(user_ids, product_ids, weights, top_k=options['top_k'])
+        existing = set(ShowcaseProduct.objects.filter(pk__in=neighbours).values_list('pk', flat=True))
+
+        with transaction.atomic():
+            ProductRecommendation.objects.all().delete()
+            ProductRecommendation.objects.bulk_create([
+                ProductRecommendation(product_id=product_id, neighbour_ids=ids)
+                for product_id, ids in neighbours.items()
+                if product_id in existing
+            ], batch_size=500)
+
+        # Cached related-product lists are keyed on the catalog version
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored recommendations for {len(existing)} products.'
+        ))
@@ -0,0 +1,26 @@
+"""
+Write every PincodeAvailability row as CSV, in the format import_pincodes reads.
+Usage: python manage.py export_pincodes [--output pincodes.csv]
+"""
+
+from django.core.management.base import BaseCommand
+from store.pincode_csv import export_csv
+
+
+class Command(BaseCommand):
+    help = 'Export pincode availability to CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help='CSV file to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            for line in export_csv():
+                self.stdout.write(line, ending='')
+            return
+        count = -1    # header
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in export_csv():
+                output.write(line)
+                count += 1
+        self.stdout.write(self.style.SUCCESS(f'Exported {count} rows to {options["output"]}.'))
@@ -0,0 +1,43 @@
+"""
+Load a courier serviceability CSV into PincodeAvailability in bulk.
+Columns: product (slug, id or "all"), pincode, available, delivery_days, extra_charge.
+Usage: python manage.py import_pincodes couriers.csv [--dry-run]
+With --dry-run, prints the rows that would be created (+) or changed (~)
+and writes nothing.
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from store.pincode_csv import import_csv
+
+
+class Command(BaseCommand):
+    help = 'Create or update pincode availability from a CSV file, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to load ("-" for stdin)')
+        parser.add_argument('--dry-run', action='store_true', help='Show the changes without saving them')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        on_diff = self.stdout.write if dry_run else None
+        try:
+            if options['path'] == '-':
+                stats = import_csv(sys.stdin, dry_run, on_diff)
+            else:
+                with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+                    stats = import_csv(lines, dry_run, on_diff)
+        except (OSError, ValueError) as exc:
+            raise CommandError(exc)
+
+        for error in stats['errors']:
+            self.stderr.write(error)
+        summary = (
+            f'{stats["rows"]} lines: {stats["created"]} created, {stats["updated"]} updated, '
+            f'{stats["unchanged"]} unchanged, {stats["skipped"]} skipped'
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Dry run — nothing saved. {summary}.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Imported pincode availability. {summary}.'))
@@ -0,0 +1,18 @@
+"""
+Recompute every product's rating aggregates from its approved reviews.
+Run after bulk review imports or any queryset.update() on reviews.
+Usage: python manage.py rebuild_ratings
+"""
+
+from django.core.management.base import BaseCommand
+from store.catalog_cache import bump_catalog_version
+from store.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = 'Rebuild rating_sum, rating_count and the star histogram on every product'
+
+    def handle(self, *args, **options):
+        updated = rebuild_ratings()
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt ratings for {updated} products.'))
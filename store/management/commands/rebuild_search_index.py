@@ -0,0 +1,23 @@
+"""
+Refill the database search tables (SQLite FTS5) from the catalog rows and
+make every worker rebuild its in-memory index.
+Run after bulk imports, any queryset.update() on searchable models, or
+switching SEARCH_BACKEND to 'database' (the tables are not kept up to date
+while the in-memory index is in use).
+Usage: python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand
+from store.catalog_cache import bump_version
+from store.search.backends import get_backend
+from store.search.index import SEARCH_VERSION_KEY
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search backend tables and invalidate every worker\'s search index'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        backend.rebuild()
+        bump_version(SEARCH_VERSION_KEY)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search index ({type(backend).__name__}).'))
@@ -0,0 +1,18 @@
+"""
+Cancel pending online-payment orders whose stock reservation has expired and
+put their stock and coupon uses back on sale.
+Usage: python manage.py release_expired_reservations
+Checkouts already do this at most once a minute per worker; schedule the
+command (e.g. every few minutes from cron) so quiet shops recover stock too.
+"""
+
+from django.core.management.base import BaseCommand
+from store.stock import release_expired
+
+
+class Command(BaseCommand):
+    help = 'Release the stock of pending online orders whose reservation has expired'
+
+    def handle(self, *args, **options):
+        cancelled = release_expired()
+        self.stdout.write(self.style.SUCCESS(f'Cancelled {cancelled} expired orders.'))
@@ -0,0 +1,20 @@
+"""
+Precompute search results for the two-letter prefixes the typeahead sends
+first, so the opening keystrokes after a deploy or catalog change are
+cache hits.
+Usage: python manage.py warm_search_cache [--length 2]
+"""
+
+from django.core.management.base import BaseCommand
+from store.search import warm_prefixes
+
+
+class Command(BaseCommand):
+    help = 'Cache /api/search/ results for every short prefix of the indexed words'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--length', type=int, default=2, help='Prefix length to warm (default 2)')
+
+    def handle(self, *args, **options):
+        prefixes = warm_prefixes(options['length'])
+        self.stdout.write(self.style.SUCCESS(f'Warmed search results for {len(prefixes)} prefixes.'))
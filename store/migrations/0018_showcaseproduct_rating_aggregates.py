@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:06
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def backfill_ratings(apps, schema_editor):
+    ShowcaseProduct = apps.get_model('store', 'ShowcaseProduct')
+    Review = apps.get_model('store', 'Review')
+    rows = (
+        Review.objects.filter(is_approved=True)
+        .order_by().values('product_id').annotate(
+            total=Sum('rating'),
+            count=Count('id'),
+            **{f'stars_{n}': Count('id', filter=Q(rating=n)) for n in range(1, 6)},
+        )
+    )
+    for row in rows:
+        ShowcaseProduct.objects.filter(pk=row['product_id']).update(
+            rating_sum=row['total'],
+            rating_count=row['count'],
+            **{f'rating_count_{n}': row[f'stars_{n}'] for n in range(1, 6)},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_drop_leftover_showcaseproduct_slug_like_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count_1',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count_2',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count_3',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count_4',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_count_5',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
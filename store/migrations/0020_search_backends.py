@@ -0,0 +1,71 @@
+"""Full-text search structures for store.search.backends, per database vendor.
+
+PostgreSQL gets a stored tsvector column with a GIN index on each
+searchable table, and pg_trgm indexes for substring lookups. SQLite gets
+two FTS5 tables (words and trigrams) filled from the current rows;
+store.search.signals keeps them in step afterwards.
+"""
+
+from django.db import migrations
+
+# (kind, table) in store.search.documents.SOURCES order — the position is
+# packed into the FTS5 rowid (store.search.backends.fts_rowid)
+SEARCHABLE = (
+    ('featured', 'store_featuredcollection'),
+    ('product', 'store_showcaseproduct'),
+    ('collection', 'store_collectioncard'),
+)
+FTS_TABLES = (
+    ('store_search_words', 'unicode61 remove_diacritics 2'),
+    ('store_search_trigrams', 'trigram'),
+)
+
+
+def create_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for _kind, table in SEARCHABLE:
+            schema_editor.execute(
+                f"ALTER TABLE {table} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+                f"setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                f"setweight(to_tsvector('simple', coalesce(description, '')), 'B')) STORED"
+            )
+            schema_editor.execute(f'CREATE INDEX {table}_search_gin ON {table} USING GIN (search_vector)')
+            for column in ('name', 'description'):
+                schema_editor.execute(
+                    f'CREATE INDEX {table}_{column}_trgm ON {table} USING GIN (UPPER({column}) gin_trgm_ops)'
+                )
+    elif vendor == 'sqlite':
+        for fts_table, tokenizer in FTS_TABLES:
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts_table} USING fts5(name, description, tokenize='{tokenizer}')"
+            )
+            for number, (_kind, table) in enumerate(SEARCHABLE):
+                schema_editor.execute(
+                    f'INSERT INTO {fts_table} (rowid, name, description) '
+                    f'SELECT id * {len(SEARCHABLE)} + {number}, name, description FROM {table} WHERE is_active'
+                )
+
+
+def drop_search_structures(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for _kind, table in SEARCHABLE:
+            schema_editor.execute(f'ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector')
+            for column in ('name', 'description'):
+                schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm')
+    elif vendor == 'sqlite':
+        for fts_table, _tokenizer in FTS_TABLES:
+            schema_editor.execute(f'DROP TABLE IF EXISTS {fts_table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_productrecommendation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_structures, drop_search_structures),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:24
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.utils.text import slugify
+
+SIZES = ('XS', 'S', 'M', 'L', 'XL', 'XXL')   # ShowcaseProduct.SIZE_CHOICES order
+
+
+def backfill_facets(apps, schema_editor):
+    ShowcaseProduct = apps.get_model('store', 'ShowcaseProduct')
+    products = list(ShowcaseProduct.objects.only('available_sizes', 'fabric'))
+    for product in products:
+        sizes = {s.strip().upper() for s in product.available_sizes.split(',')}
+        product.size_mask = sum(1 << n for n, code in enumerate(SIZES) if code in sizes)
+        product.fabric_key = slugify(product.fabric)[:100]
+    ShowcaseProduct.objects.bulk_update(products, ['size_mask', 'fabric_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_search_backends'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='effective_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce('discounted_price', 'price'), output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='fabric_key',
+            field=models.SlugField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='is_in_stock',
+            field=models.GeneratedField(db_persist=True, expression=models.Q(('stock_quantity__gt', 0)), output_field=models.BooleanField()),
+        ),
+        migrations.AddField(
+            model_name='showcaseproduct',
+            name='size_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Bit per SIZE_CHOICES entry'),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['is_active', 'category', 'effective_price'], name='store_showc_is_acti_1729ed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='showcaseproduct',
+            index=models.Index(fields=['is_active', 'is_in_stock'], name='store_showc_is_acti_f33c15_idx'),
+        ),
+        migrations.RunPython(backfill_facets, migrations.RunPython.noop),
+    ]
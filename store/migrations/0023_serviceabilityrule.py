@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0022_searchquerystat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceabilityRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(help_text='Name for this range (e.g. Delhi NCR)', max_length=100)),
+                ('pincode_from', models.CharField(help_text='First pincode, or a prefix (e.g. 11 or 110001)', max_length=6)),
+                ('pincode_to', models.CharField(blank=True, default='', help_text='Last pincode or prefix (blank = same as first)', max_length=6)),
+                ('is_available', models.BooleanField(default=True, help_text='Whether products can be delivered in this range')),
+                ('delivery_days', models.PositiveIntegerField(default=5, help_text='Expected delivery days for this range')),
+                ('extra_charge', models.DecimalField(decimal_places=2, default=0, help_text='Extra shipping charge for this range (if any)', max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('product', models.ForeignKey(blank=True, help_text='Leave blank for a default that applies to every product', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='serviceability_rules', to='store.showcaseproduct')),
+            ],
+            options={
+                'verbose_name': 'Serviceability Rule',
+                'verbose_name_plural': 'Serviceability Rules',
+                'ordering': ['product', 'pincode_from'],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:58
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+from django.utils import timezone
+
+
+def reserve_pending_orders(apps, schema_editor):
+    """Pending online orders took their stock before reservations existed:
+    record it so a failed payment or expiry still gives it back."""
+    Order = apps.get_model('store', 'Order')
+    OrderItem = apps.get_model('store', 'OrderItem')
+    StockReservation = apps.get_model('store', 'StockReservation')
+    expires_at = timezone.now() + timedelta(minutes=getattr(settings, 'STOCK_RESERVATION_MINUTES', 30))
+    pending = Order.objects.filter(payment_method='razorpay', payment_status='pending').exclude(status='cancelled')
+    rows = (
+        OrderItem.objects.filter(order__in=pending, product__isnull=False)
+        .order_by().values('order_id', 'product_id').annotate(quantity=Sum('quantity'))
+    )
+    StockReservation.objects.bulk_create([
+        StockReservation(expires_at=expires_at, **row) for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0023_serviceabilityrule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='store.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservations', to='store.showcaseproduct')),
+            ],
+            options={
+                'verbose_name': 'Stock Reservation',
+                'verbose_name_plural': 'Stock Reservations',
+                'unique_together': {('order', 'product')},
+            },
+        ),
+        migrations.RunPython(reserve_pending_orders, migrations.RunPython.noop),
+    ]
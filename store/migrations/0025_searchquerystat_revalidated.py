@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0024_stockreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchquerystat',
+            name='revalidated',
+            field=models.PositiveIntegerField(default=0, help_text="Searches answered 304 from the browser's copy (included in searches)"),
+        ),
+    ]
@@ -0,0 +1,98 @@
+"""Index a product's category in the database search structures too.
+
+The in-memory index finds products by their category keywords
+(store.search.documents.keywords_for); the database backends now do the
+same. PostgreSQL's products search_vector gains the category and its
+label at description weight. SQLite's FTS5 tables gain a keywords column
+and are refilled from the current rows.
+"""
+
+from django.db import migrations
+
+# (kind, table) in store.search.documents.SOURCES order, as in 0020
+SEARCHABLE = (
+    ('featured', 'store_featuredcollection'),
+    ('product', 'store_showcaseproduct'),
+    ('collection', 'store_collectioncard'),
+)
+FTS_TABLES = (
+    ('store_search_words', 'unicode61 remove_diacritics 2'),
+    ('store_search_trigrams', 'trigram'),
+)
+PRODUCT_TABLE = 'store_showcaseproduct'
+# ShowcaseProduct.CATEGORY_CHOICES when this migration was written
+CATEGORY_LABELS = {
+    'bridal': 'Bridal',
+    'designer': 'Designer',
+    'festival': 'Festival',
+    'party': 'Party Wear',
+    'casual': 'Casual',
+}
+
+_NAME_AND_DESCRIPTION = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def _category_sql():
+    """SQL for keywords_for(): the category value and its label."""
+    labels = ' '.join(f"WHEN '{value}' THEN '{label}'" for value, label in CATEGORY_LABELS.items())
+    return f"coalesce(category, '') || ' ' || CASE category {labels} ELSE '' END"
+
+
+def _set_product_vector(schema_editor, expression):
+    schema_editor.execute(f'DROP INDEX IF EXISTS {PRODUCT_TABLE}_search_gin')
+    schema_editor.execute(f'ALTER TABLE {PRODUCT_TABLE} DROP COLUMN search_vector')
+    schema_editor.execute(
+        f'ALTER TABLE {PRODUCT_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED'
+    )
+    schema_editor.execute(
+        f'CREATE INDEX {PRODUCT_TABLE}_search_gin ON {PRODUCT_TABLE} USING GIN (search_vector)'
+    )
+
+
+def _create_fts_tables(schema_editor, columns):
+    for fts_table, tokenizer in FTS_TABLES:
+        schema_editor.execute(f'DROP TABLE IF EXISTS {fts_table}')
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {fts_table} USING fts5({', '.join(columns)}, tokenize='{tokenizer}')"
+        )
+        for number, (kind, table) in enumerate(SEARCHABLE):
+            values = ['name', 'description']
+            if 'keywords' in columns:
+                values.append(_category_sql() if kind == 'product' else "''")
+            schema_editor.execute(
+                f"INSERT INTO {fts_table} (rowid, {', '.join(columns)}) "
+                f"SELECT id * {len(SEARCHABLE)} + {number}, {', '.join(values)} FROM {table} WHERE is_active"
+            )
+
+
+def add_keywords(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _set_product_vector(
+            schema_editor,
+            f"{_NAME_AND_DESCRIPTION} || setweight(to_tsvector('simple', {_category_sql()}), 'B')",
+        )
+    elif vendor == 'sqlite':
+        _create_fts_tables(schema_editor, ('name', 'description', 'keywords'))
+
+
+def remove_keywords(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _set_product_vector(schema_editor, _NAME_AND_DESCRIPTION)
+    elif vendor == 'sqlite':
+        _create_fts_tables(schema_editor, ('name', 'description'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0025_searchquerystat_revalidated'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_keywords, remove_keywords),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.text import slugify
 
+from .singletons import bump_singletons_version
+
 
 class HeroSection(models.Model):
     """Hero background — supports both image and video."""
@@ -32,6 +36,7 @@ class HeroSection(models.Model):
         if self.is_active:
             HeroSection.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        transaction.on_commit(bump_singletons_version)
 
     @property
     def is_video(self):
@@ -120,10 +125,39 @@ class ShowcaseProduct(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Approved-review aggregates, kept in step by store.rating_signals.
+    # Rebuild with: python manage.py rebuild_ratings
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_1 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_2 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_3 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_4 = models.PositiveIntegerField(default=0, editable=False)
+    rating_count_5 = models.PositiveIntegerField(default=0, editable=False)
+
+    # Shop facets (store.facets). Sizes and fabric are normalised in save();
+    # price and stock are computed by the database, so F() updates keep them right.
+    size_mask = models.PositiveSmallIntegerField(default=0, editable=False, help_text='Bit per SIZE_CHOICES entry')
+    fabric_key = models.SlugField(max_length=100, blank=True, default='', editable=False)
+    effective_price = models.GeneratedField(
+        expression=Coalesce('discounted_price', 'price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+    )
+    is_in_stock = models.GeneratedField(
+        expression=Q(stock_quantity__gt=0),
+        output_field=models.BooleanField(),
+        db_persist=True,
+    )
+
     class Meta:
         verbose_name = 'Showcase Product'
         verbose_name_plural = 'Showcase Products'
         ordering = ['display_order', '-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'category', 'effective_price']),
+            models.Index(fields=['is_active', 'is_in_stock']),
+        ]
 
     def __str__(self):
         return self.name
@@ -141,8 +175,28 @@ class ShowcaseProduct(models.Model):
             self.discounted_price = round(self.price * (1 - self.discount_percent / 100), 2)
         elif self.discount_percent == 0:
             self.discounted_price = None
+        self.size_mask = self.sizes_to_mask(self.size_list)
+        self.fabric_key = slugify(self.fabric)[:100]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # Keep the facet columns in step with partial saves
+            update_fields = set(update_fields)
+            if 'available_sizes' in update_fields:
+                update_fields.add('size_mask')
+            if 'fabric' in update_fields:
+                update_fields.add('fabric_key')
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
 
+    @classmethod
+    def sizes_to_mask(cls, sizes):
+        """Bitmask of ``sizes``, one bit per SIZE_CHOICES entry."""
+        bits = {code: 1 << n for n, (code, _label) in enumerate(cls.SIZE_CHOICES)}
+        mask = 0
+        for size in sizes:
+            mask |= bits.get(size.upper(), 0)
+        return mask
+
     @property
     def size_list(self):
         """Return available sizes as a list."""
@@ -191,15 +245,19 @@ class ShowcaseProduct(models.Model):
 
     @property
     def average_rating(self):
-        """Average star rating from reviews (0 if none)."""
-        reviews = self.reviews.filter(is_approved=True)
-        if not reviews.exists():
+        """Average star rating from approved reviews (0 if none)."""
+        if not self.rating_count:
             return 0
-        return round(reviews.aggregate(avg=models.Avg('rating'))['avg'], 1)
+        return round(self.rating_sum / self.rating_count, 1)
 
     @property
     def review_count(self):
-        return self.reviews.filter(is_approved=True).count()
+        return self.rating_count
+
+    @property
+    def rating_histogram(self):
+        """Approved review counts per star, 5★ first: [(5, n), ..., (1, n)]."""
+        return [(star, getattr(self, f'rating_count_{star}')) for star in range(5, 0, -1)]
 
 
 class ProductImage(models.Model):
@@ -218,6 +276,21 @@ class ProductImage(models.Model):
         return f'{self.product.name} — {self.alt_text or "Image"}'
 
 
+class ProductRecommendation(models.Model):
+    """Top-k "customers also liked" neighbours for a product.
+    Written offline by ``python manage.py build_recommendations``."""
+    product = models.OneToOneField(ShowcaseProduct, on_delete=models.CASCADE, primary_key=True, related_name='recommendation')
+    neighbour_ids = models.JSONField(default=list, help_text='Product IDs, most similar first')
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Product Recommendation'
+        verbose_name_plural = 'Product Recommendations'
+
+    def __str__(self):
+        return f'{self.product_id} → {self.neighbour_ids}'
+
+
 class CollectionCard(models.Model):
     """Flip cards in the Our Collections section."""
     name = models.CharField(max_length=100)
@@ -256,6 +329,7 @@ class ParallaxSection(models.Model):
         if self.is_active:
             ParallaxSection.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        transaction.on_commit(bump_singletons_version)
 
 
 class ShopBanner(models.Model):
@@ -287,6 +361,7 @@ class ShopBanner(models.Model):
         if self.is_active:
             ShopBanner.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        transaction.on_commit(bump_singletons_version)
 
     @property
     def overlay_opacity_css(self):
@@ -336,6 +411,7 @@ class ContactInfo(models.Model):
         if self.is_active:
             ContactInfo.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        transaction.on_commit(bump_singletons_version)
 
     @property
     def whatsapp_url(self):
@@ -389,6 +465,7 @@ class AboutPage(models.Model):
         if self.is_active:
             AboutPage.objects.filter(is_active=True).exclude(pk=self.pk).update(is_active=False)
         super().save(*args, **kwargs)
+        transaction.on_commit(bump_singletons_version)
 
 class PincodeAvailability(models.Model):
     """Manage pincode-wise product availability for delivery."""
@@ -417,18 +494,12 @@ class PincodeAvailability(models.Model):
     @classmethod
     def is_product_available_in_pincode(cls, product_id, pincode):
         """
-        Check if a product is available for delivery in a specific pincode.
+        Check if a product is available for delivery in a specific pincode,
+        from these rows and the ServiceabilityRule ranges (see store.serviceability).
         Returns: (is_available, delivery_days, extra_charge) or (False, None, 0) if not found
         """
-        availability = cls.objects.filter(
-            product_id=product_id,
-            pincode=pincode,
-            is_available=True
-        ).first()
-        
-        if availability:
-            return (True, availability.delivery_days, availability.extra_charge)
-        return (False, None, 0)
+        from .serviceability import resolve
+        return resolve(product_id, pincode)
 
     @classmethod
     def get_pincodes_for_product(cls, product_id):
@@ -439,6 +510,55 @@ class PincodeAvailability(models.Model):
         ).values_list('pincode', flat=True)
 
 
+class ServiceabilityRule(models.Model):
+    """Delivery terms for a range of pincodes — a region default for every
+    product, or an override for one product.
+
+    Ranges are written as pincodes or prefixes: "11" to "11" covers
+    110000–119999. Rules and PincodeAvailability rows are compiled into
+    sorted ranges by store.serviceability; for a given product and pincode
+    its PincodeAvailability row wins, then its narrowest override, then the
+    narrowest default.
+    """
+    region = models.CharField(max_length=100, help_text='Name for this range (e.g. Delhi NCR)')
+    product = models.ForeignKey(
+        ShowcaseProduct, on_delete=models.CASCADE, null=True, blank=True, related_name='serviceability_rules',
+        help_text='Leave blank for a default that applies to every product',
+    )
+    pincode_from = models.CharField(max_length=6, help_text='First pincode, or a prefix (e.g. 11 or 110001)')
+    pincode_to = models.CharField(max_length=6, blank=True, default='', help_text='Last pincode or prefix (blank = same as first)')
+    is_available = models.BooleanField(default=True, help_text='Whether products can be delivered in this range')
+    delivery_days = models.PositiveIntegerField(default=5, help_text='Expected delivery days for this range')
+    extra_charge = models.DecimalField(max_digits=10, decimal_places=2, default=0, help_text='Extra shipping charge for this range (if any)')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Serviceability Rule'
+        verbose_name_plural = 'Serviceability Rules'
+        ordering = ['product', 'pincode_from']
+
+    def __str__(self):
+        scope = self.product.name if self.product_id else 'All products'
+        status = '✓' if self.is_available else '✗'
+        return f'{self.region} {status} {self.pincode_from}–{self.pincode_to or self.pincode_from} ({scope})'
+
+    @property
+    def pincode_range(self):
+        """(first, last) pincode covered, as integers."""
+        last = self.pincode_to or self.pincode_from
+        return int(self.pincode_from.ljust(6, '0')), int(last.ljust(6, '9'))
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        for field in ('pincode_from', 'pincode_to'):
+            value = getattr(self, field)
+            if value and not value.isdigit():
+                raise ValidationError({field: 'Use digits only: a pincode or its first few digits.'})
+        if self.pincode_from and self.pincode_range[0] > self.pincode_range[1]:
+            raise ValidationError({'pincode_to': 'The range ends before it starts.'})
+
+
 class UserProfile(models.Model):
     """Extended profile for users — links all login methods to one account."""
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
@@ -614,6 +734,24 @@ class OrderItem(models.Model):
         return f'₹{self.total:,.0f}'
 
 
+class StockReservation(models.Model):
+    """Stock taken for a pending online-payment order, held until the
+    payment succeeds, fails or the reservation expires (see store.stock)."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='reservations')
+    product = models.ForeignKey(ShowcaseProduct, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Stock Reservation'
+        verbose_name_plural = 'Stock Reservations'
+        unique_together = ('order', 'product')
+
+    def __str__(self):
+        return f'{self.quantity} × {self.product_id} for order {self.order_id}'
+
+
 class ReturnExchange(models.Model):
     """Return or exchange requests for orders."""
     TYPE_CHOICES = [
@@ -720,6 +858,28 @@ class Review(models.Model):
         return f'{self.user.username} — {self.product.name} ({self.rating}★)'
 
 
+class SearchQueryStat(models.Model):
+    """Daily search counts per normalised query, written in bulk by
+    store.search.analytics — never once per request."""
+    query = models.CharField(max_length=100)
+    day = models.DateField()
+    searches = models.PositiveIntegerField(default=0)
+    zero_results = models.PositiveIntegerField(default=0, help_text='Searches that returned nothing')
+    revalidated = models.PositiveIntegerField(
+        default=0, help_text='Searches answered 304 from the browser\'s copy (included in searches)',
+    )
+
+    class Meta:
+        verbose_name = 'Search Query'
+        verbose_name_plural = 'Search Queries'
+        unique_together = ('query', 'day')
+        ordering = ['-day', '-searches']
+        indexes = [models.Index(fields=['day'])]
+
+    def __str__(self):
+        return f'"{self.query}" on {self.day} ({self.searches}×, {self.zero_results} empty)'
+
+
 class Coupon(models.Model):
     """Discount coupon codes for checkout."""
     DISCOUNT_TYPE_CHOICES = [
@@ -0,0 +1,103 @@
+"""Keyset (cursor) pagination over the shop's product ordering.
+
+Products are ordered by (display_order, -created_at, id) — the model's
+Meta.ordering plus the primary key as a tiebreaker. A cursor encodes the
+sort key of the last product on a page, and the next page is fetched with
+a range condition on that key, so page N costs the same as page 1: no
+COUNT(*) and no OFFSET scan.
+"""
+
+import base64
+from datetime import datetime
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .catalog_cache import get_catalog_version
+from .models import ShowcaseProduct
+
+KEYSET_ORDERING = ('display_order', '-created_at', 'id')
+
+_COUNTS_TTL = 60 * 60 * 24
+
+# Home page showcase carousel: first page renders with the page, the rest
+# streams in from /api/showcase/ as the visitor scrolls
+SHOWCASE_PAGE_SIZE = 8
+_SHOWCASE_TTL = 60 * 60 * 24
+
+
+def encode_cursor(product):
+    raw = f'{product.display_order}|{product.created_at.isoformat()}|{product.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return (display_order, created_at, pk), or None for a bad cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        display_order, created_at, pk = raw.split('|')
+        return int(display_order), datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def cursor_key(cursor):
+    """Cache-key part for ``cursor``: its decoded position, or '' for the
+    first page — which is also what a cursor that does not decode gets, so
+    garbage values cannot each add a cache entry."""
+    key = decode_cursor(cursor) if cursor else None
+    if key is None:
+        return ''
+    display_order, created_at, pk = key
+    return f'{display_order}|{created_at.isoformat()}|{pk}'
+
+
+def keyset_page(queryset, cursor=None, per_page=12):
+    """Return (products, next_cursor) for the page after ``cursor``.
+    ``next_cursor`` is None on the last page."""
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    key = decode_cursor(cursor) if cursor else None
+    if key:
+        display_order, created_at, pk = key
+        queryset = queryset.filter(
+            Q(display_order__gt=display_order)
+            | Q(display_order=display_order, created_at__lt=created_at)
+            | Q(display_order=display_order, created_at=created_at, pk__gt=pk)
+        )
+    products = list(queryset[:per_page + 1])
+    if len(products) > per_page:
+        products = products[:per_page]
+        return products, encode_cursor(products[-1])
+    return products, None
+
+
+def get_category_counts():
+    """Active product totals per category plus 'all', cached per catalog
+    version — product writes bump the version, so counts never go stale."""
+    key = f'shop:counts:{get_catalog_version()}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = dict(
+            ShowcaseProduct.objects.filter(is_active=True)
+            .order_by().values_list('category').annotate(n=Count('id'))
+        )
+        counts['all'] = sum(counts.values())
+        cache.set(key, counts, _COUNTS_TTL)
+    return counts
+
+
+def get_showcase_page(cursor=None):
+    """(products, next_cursor) for one showcase page, cached per catalog
+    version and cursor — the first page under its own key."""
+    position = cursor_key(cursor)
+    cursor = cursor if position else None
+    key = f'home:showcase:{get_catalog_version()}:{position or "first"}'
+    page = cache.get(key)
+    if page is None:
+        products = ShowcaseProduct.objects.filter(is_active=True).only(
+            'name', 'slug', 'image', 'price', 'discount_percent', 'discounted_price',
+            'display_order', 'created_at',
+        )
+        page = keyset_page(products, cursor, SHOWCASE_PAGE_SIZE)
+        cache.set(key, page, _SHOWCASE_TTL)
+    return page
@@ -1,26 +1,19 @@
-"""Signals to rollback reserved stock/coupon for failed pending Razorpay orders."""
+"""Signals to release reserved stock/coupon for failed pending Razorpay orders."""
 
 from django.db.models.signals import pre_delete, pre_save
 from django.dispatch import receiver
 
-from .models import Coupon, Order
+from . import stock
+from .models import Order
 
 
 def _rollback_pending_online_order(order):
-    """Restore stock/coupon when a pending Razorpay order fails or is deleted."""
+    """Release stock/coupon when a pending Razorpay order fails or is deleted."""
     if not order or order.payment_method != 'razorpay' or order.payment_status != 'pending':
         return
 
-    for item in order.items.select_related('product'):
-        if item.product:
-            item.product.stock_quantity += item.quantity
-            item.product.save(update_fields=['stock_quantity'])
-
-    if order.coupon_code and order.discount_amount:
-        coupon = Coupon.objects.filter(code__iexact=order.coupon_code).first()
-        if coupon and coupon.used_count > 0:
-            coupon.used_count -= 1
-            coupon.save(update_fields=['used_count'])
+    stock.release([order])
+    stock.release_coupons([order])
 
 
 @receiver(pre_save, sender=Order)
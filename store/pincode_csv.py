@@ -0,0 +1,219 @@
+"""Streaming CSV import and export of PincodeAvailability rows.
+
+Courier serviceability lists have one line per (product, pincode):
+
+    product,pincode,available,delivery_days,extra_charge
+    royal-lehenga,110001,1,3,0
+    all,781001,1,9,250
+
+``product`` is a slug or id, or ``all`` for every product. The file is
+read line by line and applied in chunks of BATCH_SIZE rows: one query
+reads the existing rows of a chunk, then one multi-row upsert writes the
+new and changed ones together. Memory stays flat however long the file
+is, and a dry run reports the same diff without writing.
+The whole import is one transaction.
+"""
+
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import PincodeAvailability, ShowcaseProduct
+from .serviceability import bump_serviceability_version
+
+COLUMNS = ('product', 'pincode', 'available', 'delivery_days', 'extra_charge')
+BATCH_SIZE = 2000
+MAX_ERRORS = 20
+
+_TRUE = {'', '1', 'true', 'yes', 'y'}
+_FALSE = {'0', 'false', 'no', 'n'}
+_TERMS = ('is_available', 'delivery_days', 'extra_charge')
+
+
+def _terms(available, days, charge):
+    """(is_available, delivery_days, extra_charge) from one row's columns."""
+    available = (available or '').strip().lower()
+    if available not in _TRUE | _FALSE:
+        raise ValueError(f'available must be 1 or 0, not "{available}"')
+    days = (days or '').strip() or '5'
+    if not days.isdigit():
+        raise ValueError(f'delivery_days must be a whole number, not "{days}"')
+    try:
+        charge = Decimal((charge or '').strip() or '0').quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise ValueError(f'extra_charge must be an amount, not "{charge}"') from None
+    if charge < 0:
+        raise ValueError('extra_charge cannot be negative')
+    return available in _TRUE, int(days), charge
+
+
+def _describe(terms):
+    is_available, days, charge = terms
+    if not is_available:
+        return 'unavailable'
+    return f'{days} days' + (f' +₹{charge:.0f}' if charge else '')
+
+
+def _upsert(rows):
+    """Insert or update (product_id, pincode, is_available, delivery_days,
+    extra_charge) rows. On PostgreSQL and SQLite this is a multi-row
+    INSERT … ON CONFLICT DO UPDATE with the values adapted once — the
+    ORM's per-field preparation is most of the cost at a million rows."""
+    now = timezone.now()
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        PincodeAvailability.objects.bulk_create(
+            [PincodeAvailability(
+                product_id=product_id, pincode=pincode, is_available=is_available,
+                delivery_days=days, extra_charge=charge, created_at=now, updated_at=now,
+            ) for product_id, pincode, is_available, days, charge in rows],
+            batch_size=BATCH_SIZE, update_conflicts=True,
+            unique_fields=['product', 'pincode'], update_fields=[*_TERMS, 'updated_at'],
+        )
+        return
+    ops, quote = connection.ops, connection.ops.quote_name
+    columns = ('product_id', 'pincode', *_TERMS, 'created_at', 'updated_at')
+    stamp = ops.adapt_datetimefield_value(now)
+    charges = {}
+    values = []
+    for product_id, pincode, is_available, days, charge in rows:
+        if charge not in charges:
+            charges[charge] = ops.adapt_decimalfield_value(charge, 10, 2)
+        values.append((product_id, pincode, is_available, days, charges[charge], stamp, stamp))
+    per_statement = (connection.features.max_query_params or BATCH_SIZE * len(columns)) // len(columns)
+    updates = ', '.join(f'{quote(c)} = excluded.{quote(c)}' for c in (*_TERMS, 'updated_at'))
+    with connection.cursor() as cursor:
+        for start in range(0, len(values), per_statement):
+            batch = values[start:start + per_statement]
+            placeholders = ', '.join(['(' + ', '.join(['%s'] * len(columns)) + ')'] * len(batch))
+            cursor.execute(
+                f'INSERT INTO {quote(PincodeAvailability._meta.db_table)} '
+                f'({", ".join(quote(c) for c in columns)}) VALUES {placeholders} '
+                f'ON CONFLICT ({quote("product_id")}, {quote("pincode")}) DO UPDATE SET {updates}',
+                [value for row in batch for value in row],
+            )
+
+
+class _Importer:
+    def __init__(self, dry_run, on_diff):
+        self.dry_run = dry_run
+        self.on_diff = on_diff
+        self.slugs = dict(ShowcaseProduct.objects.values_list('pk', 'slug'))
+        self.ids = {slug: pk for pk, slug in self.slugs.items()}
+        self.pending = {}
+        # Courier files repeat a few products and terms: parse each once
+        self.products = {}
+        self.terms = {}
+        self.stats = {'rows': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0, 'errors': []}
+
+    def product_ids(self, value):
+        value = value.strip()
+        if value.lower() == 'all':
+            return list(self.slugs)
+        pk = int(value) if value.isdigit() else self.ids.get(value)
+        if pk not in self.slugs:
+            raise ValueError(f'unknown product "{value}"')
+        return [pk]
+
+    def add(self, line_number, product, pincode, *raw_terms):
+        self.stats['rows'] += 1
+        try:
+            pincode = pincode.strip()
+            if len(pincode) != 6 or not pincode.isdigit():
+                raise ValueError(f'pincode must be 6 digits, not "{pincode}"')
+            product_ids = self.products.get(product)
+            if product_ids is None:
+                product_ids = self.products[product] = self.product_ids(product)
+            terms = self.terms.get(raw_terms)
+            if terms is None:
+                terms = self.terms[raw_terms] = _terms(*raw_terms)
+        except ValueError as exc:
+            self.stats['skipped'] += 1
+            if len(self.stats['errors']) < MAX_ERRORS:
+                self.stats['errors'].append(f'line {line_number}: {exc}')
+            return
+        for product_id in product_ids:
+            self.pending[(product_id, pincode)] = terms    # a later line for the same pair wins
+        if len(self.pending) >= BATCH_SIZE:
+            self.apply()
+
+    def apply(self):
+        keys = list(self.pending)
+        for start in range(0, len(keys), BATCH_SIZE):
+            self.apply_chunk(keys[start:start + BATCH_SIZE])
+        self.pending = {}
+
+    def apply_chunk(self, keys):
+        existing = {
+            (product_id, pincode): terms
+            for product_id, pincode, *terms in PincodeAvailability.objects.filter(
+                product_id__in={product_id for product_id, _pincode in keys},
+                pincode__in={pincode for _product_id, pincode in keys},
+            ).values_list('product_id', 'pincode', *_TERMS).order_by()
+        }
+        writes = []
+        for key in keys:
+            terms = self.pending[key]
+            old = existing.get(key)
+            if old is None:
+                self.stats['created'] += 1
+                self.diff('+', key, _describe(terms))
+            elif tuple(old) != terms:
+                self.stats['updated'] += 1
+                self.diff('~', key, f'{_describe(old)} → {_describe(terms)}')
+            else:
+                self.stats['unchanged'] += 1
+                continue
+            writes.append((*key, *terms))
+        if writes and not self.dry_run:
+            _upsert(writes)
+
+    def diff(self, sign, key, change):
+        if self.on_diff is not None:
+            self.on_diff(f'{sign} {self.slugs[key[0]]} {key[1]}: {change}')
+
+
+def import_csv(lines, dry_run=False, on_diff=None):
+    """Apply a serviceability CSV (any iterable of text lines) to
+    PincodeAvailability. ``on_diff`` is called with one line per created
+    or changed row. Returns counts plus the first MAX_ERRORS bad lines;
+    raises ValueError if a column is missing."""
+    reader = csv.reader(lines)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f'Missing CSV columns: {", ".join(missing)}')
+    positions = [header.index(column) for column in COLUMNS]
+    width = max(positions) + 1
+    importer = _Importer(dry_run, on_diff)
+    with transaction.atomic():
+        for row in reader:
+            if not row:
+                continue
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            importer.add(reader.line_num, *(row[i] for i in positions))
+        importer.apply()
+        if not dry_run:
+            # Bulk writes send no signals
+            transaction.on_commit(bump_serviceability_version)
+    return importer.stats
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+    def write(self, value):
+        return value
+
+
+def export_csv(queryset=None):
+    """Yield PincodeAvailability rows as CSV lines, product by product,
+    in the format import_csv reads."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    rows = (PincodeAvailability.objects.all() if queryset is None else queryset).order_by(
+        'product_id', 'pincode',
+    ).values_list('product__slug', 'pincode', 'is_available', 'delivery_days', 'extra_charge')
+    for slug, pincode, is_available, days, charge in rows.iterator(chunk_size=BATCH_SIZE):
+        yield writer.writerow((slug, pincode, int(is_available), days, charge))
@@ -0,0 +1,186 @@
+"""Offline Indian pincode directory: pincode → district, state and zone.
+
+The directory is a binary file (settings.PINCODE_DIRECTORY_PATH) built by
+``manage.py build_pincode_directory`` from India Post's all-India pincode
+CSV. Workers memory-map it instead of loading it, so every worker shares
+one copy through the page cache, and a lookup is a binary search over the
+sorted pincode column — no database and no network.
+
+Layout (little-endian):
+
+    header   8s magic, I count, I flags, I table offset, I table length
+    pincodes count × uint32, sorted
+    places   count × uint16, index into the place table
+    table    UTF-8 JSON list of [district, state]
+
+A directory built from the complete India Post list is flagged COMPLETE;
+only then is a pincode missing from it rejected. Otherwise (the seed file
+in store/data) a pincode must only fall in a postal circle: its first two
+digits have to belong to one.
+"""
+
+import csv
+import json
+import mmap
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+
+MAGIC = b'PINDIR1\x00'
+COMPLETE = 1
+_HEADER = struct.Struct('<8sIIII')
+
+# The first digit of a pincode is its postal zone; 9 is the Army Postal Service
+ZONES = {
+    '1': 'North', '2': 'North', '3': 'West', '4': 'West',
+    '5': 'South', '6': 'South', '7': 'East', '8': 'East',
+}
+# First two digits in use by the postal circles
+CIRCLE_PREFIXES = frozenset(
+    f'{n:02d}' for n in (
+        *range(11, 29), *range(30, 35), *range(36, 54), *range(56, 65),
+        *range(67, 86),
+    )
+)
+
+PincodeInfo = namedtuple('PincodeInfo', 'pincode district state zone')
+
+
+class Directory:
+    """A memory-mapped directory file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, self.flags, offset, length = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a pincode directory')
+        view = memoryview(self._mmap)
+        start = _HEADER.size
+        self.pincodes = view[start:start + 4 * count].cast('I')
+        self.places = view[start + 4 * count:start + 6 * count].cast('H')
+        if sys.byteorder != 'little':
+            self.pincodes, self.places = array('I', self.pincodes), array('H', self.places)
+            self.pincodes.byteswap()
+            self.places.byteswap()
+        self.table = json.loads(bytes(view[offset:offset + length]).decode())
+
+    @property
+    def complete(self):
+        return bool(self.flags & COMPLETE)
+
+    def __len__(self):
+        return len(self.pincodes)
+
+    def get(self, pincode):
+        """(district, state) for ``pincode``, or None if not listed."""
+        number = int(pincode)
+        i = bisect_left(self.pincodes, number)
+        if i < len(self.pincodes) and self.pincodes[i] == number:
+            return tuple(self.table[self.places[i]])
+        return None
+
+
+def _name(value):
+    value = ' '.join(value.split())
+    return value.title() if value.isupper() else value
+
+
+def read_csv(lines):
+    """{pincode: (district, state)} from India Post's pincode CSV (one row per
+    post office; columns Pincode, District or Districtname, StateName). Where
+    a pincode's offices disagree, the most common district wins."""
+    reader = csv.DictReader(lines)
+    columns = {name.strip().lower(): name for name in reader.fieldnames or ()}
+    pincode_col = columns.get('pincode')
+    district_col = columns.get('district') or columns.get('districtname')
+    state_col = columns.get('statename') or columns.get('state')
+    if not (pincode_col and district_col and state_col):
+        raise ValueError('CSV needs Pincode, District and StateName columns')
+    places = defaultdict(Counter)
+    for row in reader:
+        pincode = (row[pincode_col] or '').strip()
+        if len(pincode) == 6 and pincode.isdigit():
+            places[pincode][(_name(row[district_col] or ''), _name(row[state_col] or ''))] += 1
+    return {pincode: counts.most_common(1)[0][0] for pincode, counts in places.items()}
+
+
+def write_directory(path, entries, complete=False):
+    """Write ``entries`` — {pincode: (district, state)} — as a directory file.
+    Returns the number of pincodes written."""
+    table, place_index = [], {}
+    pincodes, places = array('I'), array('H')
+    for pincode in sorted(entries, key=int):
+        place = tuple(entries[pincode])
+        if place not in place_index:
+            place_index[place] = len(table)
+            table.append(list(place))
+        pincodes.append(int(pincode))
+        places.append(place_index[place])
+    if sys.byteorder != 'little':
+        pincodes.byteswap()
+        places.byteswap()
+    blob = json.dumps(table, ensure_ascii=False, separators=(',', ':')).encode()
+    offset = _HEADER.size + 6 * len(pincodes)
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(pincodes), COMPLETE if complete else 0, offset, len(blob)))
+        f.write(pincodes.tobytes())
+        f.write(places.tobytes())
+        f.write(blob)
+    return len(pincodes)
+
+
+# ── Per-worker registry ──────────────────────────────────────────
+
+_lock = threading.Lock()
+_state = {'directory': None, 'loaded': False}
+
+
+def get_directory():
+    """This worker's mapped directory, or None if the file is missing."""
+    if not _state['loaded']:
+        with _lock:
+            if not _state['loaded']:
+                path = getattr(settings, 'PINCODE_DIRECTORY_PATH', None)
+                try:
+                    _state['directory'] = Directory(path) if path else None
+                except FileNotFoundError:
+                    _state['directory'] = None
+                _state['loaded'] = True
+    return _state['directory']
+
+
+def clear():
+    """Forget the mapped directory (used by tests)."""
+    with _lock:
+        _state.update(directory=None, loaded=False)
+
+
+# ── Lookups ──────────────────────────────────────────────────────
+
+def is_valid(pincode):
+    """True if ``pincode`` can exist: six digits in a postal circle and,
+    with a complete directory, listed in it."""
+    if not (isinstance(pincode, str) and len(pincode) == 6 and pincode.isdigit()):
+        return False
+    if pincode[:2] not in CIRCLE_PREFIXES:
+        return False
+    directory = get_directory()
+    if directory is not None and directory.complete:
+        return directory.get(pincode) is not None
+    return True
+
+
+def lookup(pincode):
+    """PincodeInfo for ``pincode``, or None if it is not valid. District and
+    state are blank for pincodes the directory does not list."""
+    if not is_valid(pincode):
+        return None
+    directory = get_directory()
+    district, state = (directory.get(pincode) if directory is not None else None) or ('', '')
+    return PincodeInfo(pincode, district, state, ZONES[pincode[0]])
@@ -0,0 +1,113 @@
+"""Product detail page data, loaded once and cached per slug + product version.
+
+A bundle holds everything the PDP shows for one product: the product row,
+its gallery, and the first page of approved reviews with the rating
+summary. Writes to the product or any of those child rows bump the
+product's version (store.catalog_signals), so a cached bundle is never
+served stale and a warm PDP costs no database queries. Pincode checks
+resolve against store.serviceability instead.
+"""
+
+from django.core.cache import cache
+
+from .catalog_cache import (
+    UNKNOWN_PRODUCT_TTL, get_catalog_version, get_product_version, keep_product_version,
+)
+from .models import (
+    Order, ProductImage, ProductRecommendation, Review, ShowcaseProduct,
+)
+
+_BUNDLE_TTL = 60 * 60 * 24
+REVIEWS_PER_PAGE = 20
+RELATED_PER_PAGE = 4
+
+
+def _bundle_key(slug, version):
+    return f'pdp:bundle:{slug}:{version}'
+
+
+def review_payload(product):
+    """Approved reviews plus rating summary, as returned by /api/reviews/."""
+    reviews = Review.objects.filter(
+        product=product, is_approved=True
+    ).select_related('user').order_by('-created_at')[:REVIEWS_PER_PAGE]
+
+    # Check which reviewers are verified purchasers
+    verified_users = set(Order.objects.filter(
+        items__product=product,
+        status='delivered',
+    ).values_list('user_id', flat=True))
+
+    return {
+        'reviews': [{
+            'id': r.pk,
+            'rating': r.rating,
+            'title': r.title,
+            'comment': r.comment,
+            'user': r.user.first_name or r.user.username,
+            'created_at': r.created_at.strftime('%b %d, %Y'),
+            'verified_purchase': r.user_id in verified_users,
+        } for r in reviews],
+        'average': product.average_rating,
+        'total': product.review_count,
+        'histogram': dict(product.rating_histogram),
+    }
+
+
+def build_product_bundle(slug):
+    """Run the PDP queries for ``slug``. Returns None for unknown or
+    inactive products (cached briefly too, so 404 probes stay cheap)."""
+    product = ShowcaseProduct.objects.filter(slug=slug, is_active=True).first()
+    if product is None:
+        return None
+    return {
+        'product': product,
+        'gallery_images': list(
+            ProductImage.objects.filter(product=product).only('image', 'alt_text', 'display_order')
+        ),
+        'reviews_data': review_payload(product),
+    }
+
+
+def get_product_bundle(slug):
+    """Return the cached bundle for ``slug`` (None if there is no such
+    active product), building it on a miss."""
+    key = _bundle_key(slug, get_product_version(slug))
+    bundle = cache.get(key, False)
+    if bundle is False:
+        bundle = build_product_bundle(slug)
+        if bundle is None:
+            cache.set(key, None, UNKNOWN_PRODUCT_TTL)
+        else:
+            keep_product_version(slug)
+            cache.set(key, bundle, _BUNDLE_TTL)
+    return bundle
+
+
+def get_related_products(product):
+    """Up to four related products: the stored co-purchase neighbours
+    (store.recommendations), topped up from the same category. Cached per
+    product and catalog version, so a warm PDP does one cache lookup."""
+    key = f'pdp:related:{product.pk}:{get_catalog_version()}'
+    related = cache.get(key)
+    if related is None:
+        related = _load_related_products(product)
+        cache.set(key, related, _BUNDLE_TTL)
+    return related
+
+
+def _load_related_products(product):
+    fields = ('name', 'slug', 'image', 'price', 'discount_percent', 'discounted_price', 'category')
+    active = ShowcaseProduct.objects.filter(is_active=True).only(*fields)
+
+    neighbour_ids = ProductRecommendation.objects.filter(pk=product.pk).values_list(
+        'neighbour_ids', flat=True,
+    ).first() or []
+    by_id = active.in_bulk(neighbour_ids[:RELATED_PER_PAGE * 2])
+    related = [by_id[pk] for pk in neighbour_ids if pk in by_id][:RELATED_PER_PAGE]
+
+    if len(related) < RELATED_PER_PAGE:
+        related += active.filter(category=product.category).exclude(
+            pk__in=[product.pk] + [p.pk for p in related],
+        )[:RELATED_PER_PAGE - len(related)]
+    return related
@@ -0,0 +1,53 @@
+"""Signals that keep ShowcaseProduct's rating aggregates and cached pages
+in step with Review."""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog_cache import bump_catalog_version
+from .catalog_signals import bump_product_version_for
+from .models import Review
+from .ratings import apply_rating_change
+
+
+def _contribution(product_id, rating, is_approved):
+    return (product_id, rating) if is_approved else None
+
+
+def _reviews_changed(before, after, product_id):
+    for changed_id in {product_id, before and before[0], after and after[0]} - {None}:
+        bump_product_version_for(changed_id)
+    # Grids and the home page show only rating_avg/rating_count, which an
+    # unapproved review or an edit that keeps the rating does not move
+    if before != after:
+        transaction.on_commit(bump_catalog_version)
+
+
+@receiver(pre_save, sender=Review, dispatch_uid='review_rating_before')
+def review_rating_before(sender, instance, **kwargs):
+    """Remember what the stored row contributed before this save."""
+    before = None
+    if instance.pk:
+        row = Review.objects.filter(pk=instance.pk).values_list(
+            'product_id', 'rating', 'is_approved',
+        ).first()
+        if row:
+            before = _contribution(*row)
+    instance._rating_before = before
+
+
+@receiver(post_save, sender=Review, dispatch_uid='review_rating_saved')
+def review_rating_saved(sender, instance, **kwargs):
+    before = getattr(instance, '_rating_before', None)
+    after = _contribution(instance.product_id, instance.rating, instance.is_approved)
+    apply_rating_change(before, after)
+    # Review text is rendered into the PDP too, so any save invalidates it
+    _reviews_changed(before, after, instance.product_id)
+
+
+@receiver(post_delete, sender=Review, dispatch_uid='review_rating_deleted')
+def review_rating_deleted(sender, instance, **kwargs):
+    before = _contribution(instance.product_id, instance.rating, instance.is_approved)
+    apply_rating_change(before, None)
+    _reviews_changed(before, None, instance.product_id)
@@ -0,0 +1,73 @@
+"""Denormalized review aggregates on ShowcaseProduct.
+
+Each product stores the sum and count of its approved ratings plus a
+per-star histogram, so listing pages show stars without touching the
+reviews table. Changes are applied as single UPDATE ... SET x = x + 1
+statements, which are atomic under concurrent review writes.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+
+from .models import Review, ShowcaseProduct
+
+STARS = range(1, 6)
+
+
+def _delta(rating, sign):
+    """Field updates that add (sign=1) or remove (sign=-1) one rating.
+    Greatest() keeps a drifted counter from going negative; the
+    rebuild_ratings command repairs any drift."""
+    return {
+        name: Greatest(F(name) + sign * step, 0)
+        for name, step in (('rating_count', 1), (f'rating_count_{rating}', 1), ('rating_sum', rating))
+    }
+
+
+def apply_rating_change(before, after):
+    """Move a review's contribution from ``before`` to ``after``.
+
+    Both are (product_id, rating) for an approved review, or None when the
+    review did not / does not count (new, unapproved or deleted).
+    """
+    if before == after:
+        return
+    with transaction.atomic():
+        if before and after and before[0] == after[0]:
+            # Same product, rating changed: move one histogram bucket
+            (product_id, old), (_, new) = before, after
+            ShowcaseProduct.objects.filter(pk=product_id).update(**{
+                f'rating_count_{old}': Greatest(F(f'rating_count_{old}') - 1, 0),
+                f'rating_count_{new}': F(f'rating_count_{new}') + 1,
+                'rating_sum': Greatest(F('rating_sum') - old + new, 0),
+            })
+            return
+        if before:
+            ShowcaseProduct.objects.filter(pk=before[0]).update(**_delta(before[1], -1))
+        if after:
+            ShowcaseProduct.objects.filter(pk=after[0]).update(**_delta(after[1], 1))
+
+
+def rebuild_ratings():
+    """Recompute every product's aggregates from the approved reviews.
+    Returns the number of products updated."""
+    stats = {
+        row['product_id']: row
+        for row in Review.objects.filter(is_approved=True)
+        .order_by().values('product_id').annotate(
+            total=Sum('rating'),
+            count=Count('id'),
+            **{f'stars_{n}': Count('id', filter=Q(rating=n)) for n in STARS},
+        )
+    }
+    fields = ['rating_sum', 'rating_count'] + [f'rating_count_{n}' for n in STARS]
+    products = list(ShowcaseProduct.objects.only(*fields))
+    for product in products:
+        row = stats.get(product.pk, {})
+        product.rating_sum = row.get('total') or 0
+        product.rating_count = row.get('count', 0)
+        for n in STARS:
+            setattr(product, f'rating_count_{n}', row.get(f'stars_{n}', 0))
+    ShowcaseProduct.objects.bulk_update(products, fields, batch_size=500)
+    return len(products)
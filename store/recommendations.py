@@ -0,0 +1,113 @@
+"""Item-item "customers also liked" recommendations from buyer behaviour.
+
+Interactions (orders, wishlists, good reviews) form a sparse user x product
+matrix. Products are compared by cosine similarity of their columns, which
+only needs the products that share a user — so the matrix is never built
+densely; co-occurring pairs are generated per user and summed in NumPy.
+
+Everything here runs offline (``manage.py build_recommendations``). The
+request path only reads the stored neighbour lists.
+"""
+
+import numpy as np
+
+from .models import OrderItem, Review, Wishlist
+
+# Interaction weights: a purchase says more than a wishlist heart
+ORDER_WEIGHT = 3.0
+WISHLIST_WEIGHT = 2.0
+# Reviews: 5★ = 1.5, 4★ = 1.0, 3★ = 0.5; 1–2★ are not a "liked" signal
+REVIEW_WEIGHTS = {5: 1.5, 4: 1.0, 3: 0.5}
+
+# A user's heaviest N products; bounds the pairs one basket can produce
+MAX_BASKET = 100
+# Pair buffer size before partial sums are folded together
+_REDUCE_EVERY = 5_000_000
+
+
+def collect_interactions():
+    """Return parallel arrays (user_ids, product_ids, weights)."""
+    users, products, weights = [], [], []
+
+    def add(rows, weight):
+        for user_id, product_id in rows:
+            users.append(user_id)
+            products.append(product_id)
+            weights.append(weight)
+
+    add(
+        OrderItem.objects.filter(product__isnull=False).exclude(order__status='cancelled')
+        .values_list('order__user_id', 'product_id').iterator(),
+        ORDER_WEIGHT,
+    )
+    add(Wishlist.objects.values_list('user_id', 'product_id').iterator(), WISHLIST_WEIGHT)
+    for rating, weight in REVIEW_WEIGHTS.items():
+        add(
+            Review.objects.filter(is_approved=True, rating=rating)
+            .values_list('user_id', 'product_id').iterator(),
+            weight,
+        )
+
+    return (
+        np.asarray(users, dtype=np.int64),
+        np.asarray(products, dtype=np.int64),
+        np.asarray(weights, dtype=np.float64),
+    )
+
+
+def _sum_by_key(keys, values):
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, np.bincount(inverse, weights=values)
+
+
+def build_neighbours(user_ids, product_ids, weights, top_k=8):
+    """Return {product_id: [neighbour_id, ...]} with at most ``top_k``
+    neighbours per product, most similar first."""
+    if len(product_ids) == 0:
+        return {}
+
+    items, item_idx = np.unique(product_ids, return_inverse=True)
+    _, user_idx = np.unique(user_ids, return_inverse=True)
+    n = len(items)
+
+    # Collapse repeat interactions into one weight per (user, product);
+    # keys sort user-major, so each user's products end up contiguous
+    keys, w = _sum_by_key(user_idx * n + item_idx, weights)
+    u, i = keys // n, keys % n
+    norms = np.sqrt(np.bincount(i, weights=w * w, minlength=n))
+
+    # Co-occurrence: sum of w_ui * w_uj over users who touched both i and j
+    pair_keys, pair_weights = [], []
+    buffered = 0
+    for basket in np.split(np.arange(len(u)), np.flatnonzero(np.diff(u)) + 1):
+        if len(basket) < 2:
+            continue
+        if len(basket) > MAX_BASKET:
+            basket = basket[np.argsort(-w[basket])[:MAX_BASKET]]
+        a, b = np.triu_indices(len(basket), k=1)
+        pair_keys.append(i[basket[a]] * n + i[basket[b]])
+        pair_weights.append(w[basket[a]] * w[basket[b]])
+        buffered += len(a)
+        if buffered > _REDUCE_EVERY:
+            reduced = _sum_by_key(np.concatenate(pair_keys), np.concatenate(pair_weights))
+            pair_keys, pair_weights = [reduced[0]], [reduced[1]]
+            buffered = len(reduced[0])
+    if not pair_keys:
+        return {}
+
+    pairs, co = _sum_by_key(np.concatenate(pair_keys), np.concatenate(pair_weights))
+    rows, cols = pairs // n, pairs % n
+    # Similarity is symmetric: emit both directions
+    rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+    scores = np.concatenate([co, co]) / (norms[rows] * norms[cols])
+
+    # Per row, best score first; keep the first top_k of each row
+    order = np.lexsort((-scores, rows))
+    rows, cols = rows[order], cols[order]
+    row_start = np.searchsorted(rows, rows, side='left')
+    keep = (np.arange(len(rows)) - row_start) < top_k
+
+    neighbours = {}
+    for row, col in zip(items[rows[keep]].tolist(), items[cols[keep]].tolist()):
+        neighbours.setdefault(row, []).append(col)
+    return neighbours
@@ -0,0 +1,65 @@
+"""Typeahead search over featured collections, products and collection cards.
+
+``search`` answers from this worker's in-memory index (store.search.index)
+by default. With ``SEARCH_BACKEND = 'database'`` it asks the full-text
+backend for the connection's vendor (store.search.backends) instead; if
+the index cannot be built it falls back to plain icontains queries. Both
+widen query words through the same synonym table and typo correction.
+
+``cached_search`` puts the shared cache in front: results are stored per
+normalised query and search version, so "Bridal", " bridal " and "brídal"
+share one entry and any searchable write retires them all.
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+from store.catalog_cache import get_version, single_flight
+
+from .backends import get_backend
+from .index import SEARCH_VERSION_KEY, get_index
+from .text import normalize
+
+logger = logging.getLogger(__name__)
+
+_RESULTS_TTL = 60 * 60
+
+
+def search(query):
+    """Result payloads for ``query``, as returned by /api/search/."""
+    if getattr(settings, 'SEARCH_BACKEND', 'memory') == 'memory':
+        try:
+            index = get_index()
+            return index.search(query) or index.search_substring(query)
+        except Exception:
+            logger.exception('Search index unavailable; querying the database')
+    return get_backend().search(query)
+
+
+def _results_key(query):
+    digest = hashlib.md5(query.encode()).hexdigest()
+    return f'search:results:{get_version(SEARCH_VERSION_KEY)}:{digest}'
+
+
+def cached_search(query):
+    """``search`` through the shared cache. Concurrent misses on the same
+    query compute it once (catalog_cache.single_flight)."""
+    query = normalize(query)
+    return single_flight(_results_key(query), lambda: search(query), _RESULTS_TTL)
+
+
+def peek_cached_search(query):
+    """The cached results for ``query``, or None on a miss — never searches."""
+    return cache.get(_results_key(normalize(query)))
+
+
+def warm_prefixes(length=2):
+    """Cache results for every ``length``-letter prefix of the indexed
+    words — what the typeahead sends first. Returns the prefixes warmed."""
+    prefixes = sorted(p for p in get_index().prefixes if len(p) == length)
+    for prefix in prefixes:
+        cached_search(prefix)
+    return prefixes
@@ -0,0 +1,146 @@
+"""Buffered search analytics: what customers search for, and what finds nothing.
+
+``record`` is all the request path pays — a dict increment under a lock.
+A daemon thread per worker process calls ``flush`` every
+``SEARCH_ANALYTICS_FLUSH_SECONDS``: it normalises the buffered queries,
+merges their counts and adds them to the day's SearchQueryStat rows in a
+few bulk statements. Counts are added with F() expressions, so workers
+flushing at the same time never overwrite each other. Analytics are
+best-effort: a flush that fails is logged and its counts dropped, and a
+worker that exits loses at most one interval of counts.
+
+A repeat search the browser revalidates is answered 304 without running
+the search (mysite.conditional); ``record`` counts it as ``revalidated``,
+with the cached result count when there is one and no zero-result flag
+when there is not.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from store.models import SearchQueryStat
+
+from .text import normalize
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 100    # SearchQueryStat.query
+MAX_BUFFERED = 5000       # distinct raw queries held between flushes
+_BATCH = 500
+
+_buffer = {}              # raw query -> [searches, zero-result searches, revalidated]
+_dropped = 0
+_lock = threading.Lock()
+_flusher_pid = None
+
+
+def record(query, result_count, revalidated=False):
+    """Count one search for ``query`` that returned ``result_count``
+    results (None: not known). ``revalidated`` marks a 304 answer."""
+    global _dropped
+    if _flusher_pid != os.getpid():
+        _start_flusher()
+    query = query[:MAX_QUERY_LENGTH]
+    with _lock:
+        counts = _buffer.get(query)
+        if counts is None:
+            if len(_buffer) >= MAX_BUFFERED:
+                _dropped += 1
+                return
+            counts = _buffer[query] = [0, 0, 0]
+        counts[0] += 1
+        if result_count == 0:
+            counts[1] += 1
+        if revalidated:
+            counts[2] += 1
+
+
+def drain():
+    """Take the buffered counts, merged per normalised query:
+    {query: (searches, zero_results, revalidated)}."""
+    global _buffer, _dropped
+    with _lock:
+        buffered, _buffer = _buffer, {}
+        dropped, _dropped = _dropped, 0
+    if dropped:
+        logger.warning('Search analytics buffer full: %d searches not counted', dropped)
+    merged = {}
+    for raw, counts in buffered.items():
+        query = normalize(raw)[:MAX_QUERY_LENGTH]
+        if not query:
+            continue
+        total = merged.get(query, (0, 0, 0))
+        merged[query] = tuple(a + b for a, b in zip(total, counts))
+    return merged
+
+
+def flush():
+    """Write the buffered counts to today's SearchQueryStat rows.
+    Returns the number of distinct queries written."""
+    counts = drain()
+    if not counts:
+        return 0
+    day = timezone.localdate()
+    queries = list(counts)
+    with transaction.atomic():
+        SearchQueryStat.objects.bulk_create(
+            (SearchQueryStat(query=query, day=day) for query in queries),
+            ignore_conflicts=True, batch_size=_BATCH,
+        )
+        rows = []
+        for start in range(0, len(queries), _BATCH):
+            rows += (
+                SearchQueryStat.objects.filter(day=day, query__in=queries[start:start + _BATCH])
+                .only('pk', 'query').order_by()
+            )
+        for row in rows:
+            searches, zero_results, revalidated = counts[row.query]
+            row.searches = F('searches') + searches
+            row.zero_results = F('zero_results') + zero_results
+            row.revalidated = F('revalidated') + revalidated
+        SearchQueryStat.objects.bulk_update(
+            rows, ['searches', 'zero_results', 'revalidated'], batch_size=_BATCH,
+        )
+    return len(counts)
+
+
+def clear():
+    """Discard the buffered counts (tests)."""
+    global _buffer, _dropped
+    with _lock:
+        _buffer, _dropped = {}, 0
+
+
+def _flush_quietly():
+    try:
+        flush()
+    except Exception:
+        logger.exception('Could not write search analytics')
+    finally:
+        connections.close_all()    # this thread's connections only
+
+
+def _run(interval):
+    while True:
+        time.sleep(interval)
+        _flush_quietly()
+
+
+def _start_flusher():
+    """Start this process's flush thread; again after a fork, since
+    threads do not survive one."""
+    global _flusher_pid
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    interval = getattr(settings, 'SEARCH_ANALYTICS_FLUSH_SECONDS', 60)
+    if interval > 0:
+        threading.Thread(target=_run, args=(interval,), name='search-analytics', daemon=True).start()
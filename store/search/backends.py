@@ -0,0 +1,222 @@
+"""Database search backends — full-text lookups instead of LIKE scans.
+
+With ``SEARCH_BACKEND = 'database'``, ``get_backend()`` picks one for the
+default connection's vendor:
+
+* PostgreSQL: a stored, weighted ``search_vector`` tsvector column with a
+  GIN index on each searchable table, plus pg_trgm GIN indexes that serve
+  substring lookups for partial words.
+* SQLite: two FTS5 tables, one tokenised into words and one into
+  trigrams, kept in step by store.search.signals.
+
+Both also index a product's category keywords, as the in-memory index
+does (migration 0026).
+* Anything else: the plain icontains queries.
+
+With the in-memory index configured nothing keeps the FTS5 tables current,
+so the fallback used when the index cannot be built gets the plain
+backend; run ``rebuild_search_index`` after switching to 'database'.
+
+Query words are widened through the synonym table before the lookup, and
+a query that finds nothing asks for rows sharing trigrams with its words,
+so spelling variants, transliterations and typos find what the in-memory
+index finds. All backends only find candidate rows; ranking happens in
+Python on the same ``Document`` scores the in-memory index uses, so
+PostgreSQL and SQLite return the same results in the same order.
+Migration 0020 creates the columns, tables and indexes.
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .documents import SOURCES, database_search, keywords_for
+from .fuzzy import MIN_FUZZY_LENGTH
+from .index import MAX_TERMS, SearchIndex, document_for
+from .synonyms import SYNONYMS
+from .text import normalize, tokenize
+
+CANDIDATE_LIMIT = 200   # per kind — far more than the typeahead shows
+
+SEARCHABLE_TABLES = {kind: model._meta.db_table for kind, model, _p, _l in SOURCES}
+_SOURCE_BY_KIND = {kind: (model, payload) for kind, model, payload, _l in SOURCES}
+_KIND_NUMBER = {kind: n for n, (kind, *_rest) in enumerate(SOURCES)}
+
+
+class DatabaseBackend:
+    """icontains on name and description — works everywhere, no index."""
+
+    def match_words(self, groups):
+        """{kind: ids} of rows containing, for every group, one of its
+        words (as a word prefix where the backend can tell), or None if
+        this backend cannot answer word queries."""
+        found = {}
+        for kind, model, _payload, _limit in SOURCES:
+            fields = ('name', 'description', 'category') if kind == 'product' else ('name', 'description')
+            rows = model.objects.filter(is_active=True)
+            for group in groups:
+                either = Q()
+                for word in group:
+                    for field in fields:
+                        either |= Q(**{f'{field}__icontains': word})
+                rows = rows.filter(either)
+            found[kind] = list(rows.values_list('pk', flat=True)[:CANDIDATE_LIMIT])
+        return found
+
+    def match_similar(self, terms):
+        """{kind: ids} of rows with words spelt like one of ``terms``, for
+        typo correction, or None if this backend cannot tell."""
+        return None
+
+    def match_substring(self, phrase):
+        """{kind: ids} of rows whose name or description contains ``phrase``."""
+        return None
+
+    def sync(self, kind, pk, name=None, description=None, keywords=''):
+        """Mirror one committed write into backend-maintained tables
+        (``name`` None removes the row). ``keywords`` are the row's
+        documents.keywords_for words."""
+
+    def rebuild(self):
+        """Refill backend-maintained tables from the source rows."""
+
+    def search(self, query):
+        terms = list(dict.fromkeys(tokenize(query)[:MAX_TERMS]))
+        if not terms:
+            return []
+        candidates = self.match_words([(term, *SYNONYMS.get(term, ())) for term in terms])
+        if candidates is None:
+            return database_search(query)
+        results = _ranked(candidates).search(query)
+        if not results:
+            similar = self.match_similar([term for term in terms if len(term) >= MIN_FUZZY_LENGTH])
+            if similar:
+                results = _ranked(similar).search(query)
+        if not results:
+            substring = self.match_substring(normalize(query))
+            if substring is None:
+                return database_search(query)
+            results = _ranked(substring).search_substring(query)
+        return results
+
+
+class PostgresBackend(DatabaseBackend):
+    def match_words(self, groups):
+        tsquery = ' & '.join(
+            '(' + ' | '.join(f'{word}:*' for word in group) + ')' for group in groups
+        )
+        return self._select(
+            'search_vector @@ to_tsquery(\'simple\', %s)', [tsquery],
+        )
+
+    def match_similar(self, terms):
+        if not terms:
+            return None
+        # pg_trgm word similarity, served by the UPPER(...) gin_trgm_ops indexes
+        where = ' OR '.join(
+            'UPPER(name) %%> UPPER(%s) OR UPPER(description) %%> UPPER(%s)' for _term in terms
+        )
+        return self._select(where, [word for term in terms for word in (term, term)])
+
+    def match_substring(self, phrase):
+        # Served by the UPPER(...) gin_trgm_ops indexes
+        pattern = '%' + _escape_like(phrase) + '%'
+        return self._select(
+            'UPPER(name) LIKE UPPER(%s) OR UPPER(description) LIKE UPPER(%s)', [pattern, pattern],
+        )
+
+    def _select(self, where, params):
+        found = {}
+        with connection.cursor() as cursor:
+            for kind, table in SEARCHABLE_TABLES.items():
+                cursor.execute(
+                    f'SELECT id FROM {table} WHERE is_active AND ({where}) LIMIT %s',
+                    params + [CANDIDATE_LIMIT],
+                )
+                found[kind] = [row[0] for row in cursor.fetchall()]
+        return found
+
+
+class SqliteBackend(DatabaseBackend):
+    WORDS_TABLE = 'store_search_words'
+    TRIGRAMS_TABLE = 'store_search_trigrams'
+
+    def match_words(self, groups):
+        return self._match(self.WORDS_TABLE, ' AND '.join(
+            '(' + ' OR '.join(f'"{word}"*' for word in group) + ')' for group in groups
+        ))
+
+    def match_similar(self, terms):
+        grams = {term[i:i + 3] for term in terms for i in range(len(term) - 2)}
+        if not grams:
+            return None
+        # Rows sharing the most trigrams with the query words rank first
+        return self._match(self.TRIGRAMS_TABLE, ' OR '.join(f'"{gram}"' for gram in sorted(grams)))
+
+    def match_substring(self, phrase):
+        if len(phrase) < 3:
+            # Shorter than a trigram: nothing for FTS5 to look up
+            return None
+        return self._match(self.TRIGRAMS_TABLE, '"%s"' % phrase.replace('"', '""'))
+
+    def _match(self, table, expression):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s',
+                [expression, CANDIDATE_LIMIT * len(SOURCES)],
+            )
+            rowids = [row[0] for row in cursor.fetchall()]
+        found = {kind: [] for kind in _KIND_NUMBER}
+        for rowid in rowids:
+            pk, number = divmod(rowid, len(SOURCES))
+            found[SOURCES[number][0]].append(pk)
+        return found
+
+    def sync(self, kind, pk, name=None, description=None, keywords=''):
+        rowid = fts_rowid(kind, pk)
+        with connection.cursor() as cursor:
+            for table in (self.WORDS_TABLE, self.TRIGRAMS_TABLE):
+                cursor.execute(f'DELETE FROM {table} WHERE rowid = %s', [rowid])
+                if name is not None:
+                    cursor.execute(
+                        f'INSERT INTO {table} (rowid, name, description, keywords) VALUES (%s, %s, %s, %s)',
+                        [rowid, name, description, keywords],
+                    )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            for table in (self.WORDS_TABLE, self.TRIGRAMS_TABLE):
+                cursor.execute(f'DELETE FROM {table}')
+        for kind, model, _payload, _limit in SOURCES:
+            for item in model.objects.filter(is_active=True).iterator():
+                self.sync(kind, item.pk, item.name, item.description, keywords_for(kind, item))
+
+
+def fts_rowid(kind, pk):
+    """FTS5 rowid for one source row: its id and kind packed together."""
+    return pk * len(SOURCES) + _KIND_NUMBER[kind]
+
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _ranked(candidates):
+    """A throwaway index over the candidate rows, for ranking."""
+    index = SearchIndex()
+    for kind, ids in candidates.items():
+        if not ids:
+            continue
+        model, payload = _SOURCE_BY_KIND[kind]
+        for item in model.objects.filter(pk__in=ids, is_active=True):
+            index.add(document_for(kind, item, payload))
+    return index
+
+
+_BACKENDS = {'postgresql': PostgresBackend, 'sqlite': SqliteBackend}
+
+
+def get_backend():
+    if getattr(settings, 'SEARCH_BACKEND', 'memory') != 'database':
+        return DatabaseBackend()
+    return _BACKENDS.get(connection.vendor, DatabaseBackend)()
@@ -0,0 +1,79 @@
+"""What gets searched: the three catalog models and their result payloads.
+
+Each source turns a model row into the JSON the typeahead in main.js
+renders. ``database_search`` is the original icontains query path, kept as
+the fallback when the in-memory index is unavailable or finds nothing.
+"""
+
+from django.db.models import Q
+
+from store.models import CollectionCard, FeaturedCollection, ShowcaseProduct
+
+MAX_RESULTS = 12
+
+
+def _featured_payload(item):
+    return {
+        'name': item.name,
+        'description': item.description,
+        'price': item.formatted_price,
+        'discounted_price': item.formatted_discounted_price if item.has_discount else '',
+        'discount': item.discount_percent if item.has_discount else 0,
+        'image': item.image.url if item.image else '',
+        'category': 'Featured Collection',
+        'section': '#collection',
+    }
+
+
+def _product_payload(item):
+    return {
+        'id': item.pk,
+        'name': item.name,
+        'price': item.formatted_price,
+        'discounted_price': item.formatted_discounted_price if item.has_discount else '',
+        'discount': item.discount_percent if item.has_discount else 0,
+        'image': item.image.url if item.image else '',
+        'category': item.get_category_display(),
+        'section': '#showcase',
+        'url': f'/shop/{item.slug}/',
+    }
+
+
+def _collection_payload(item):
+    return {
+        'name': item.name,
+        'description': item.description,
+        'image': item.image.url if item.image else '',
+        'category': 'Collection',
+        'section': '#collection',
+    }
+
+
+# (kind, model, payload builder, max results of this kind) in display order
+SOURCES = (
+    ('featured', FeaturedCollection, _featured_payload, 6),
+    ('product', ShowcaseProduct, _product_payload, 6),
+    ('collection', CollectionCard, _collection_payload, 4),
+)
+SOURCE_BY_MODEL = {model: (kind, payload) for kind, model, payload, _ in SOURCES}
+KIND_LIMITS = {kind: limit for kind, _, _, limit in SOURCES}
+
+
+def keywords_for(kind, item):
+    """Extra words a row is found by without showing them — a product's
+    category, so "bridal" or "shaadi" finds every bridal piece."""
+    if kind == 'product':
+        return f'{item.category} {item.get_category_display()}'
+    return ''
+
+
+def database_search(query):
+    """Search with leading-wildcard LIKE queries, one per model."""
+    results = []
+    for _kind, model, payload, limit in SOURCES:
+        for item in model.objects.filter(
+            Q(name__icontains=query) | Q(description__icontains=query),
+            is_active=True,
+        )[:limit]:
+            results.append(payload(item))
+    return results[:MAX_RESULTS]
@@ -0,0 +1,65 @@
+"""Typo tolerance: character trigrams and a bounded edit distance.
+
+A misspelt query word is compared only against the few vocabulary words
+that share its trigrams, and each comparison gives up as soon as the
+distance exceeds the bound, so a lookup costs a handful of short loops
+however large the catalog grows.
+"""
+
+MAX_CANDIDATES = 32     # vocabulary words checked per misspelt query word
+MIN_FUZZY_LENGTH = 4    # shorter words are too ambiguous to correct
+
+
+def trigrams(word):
+    """Trigrams of ``word`` padded at both ends ("^le", "leh", ..., "ga$")."""
+    padded = f'^{word}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(word):
+    return 1 if len(word) < 7 else 2
+
+
+def bounded_distance(a, b, bound):
+    """Edit distance between ``a`` and ``b`` counting adjacent swaps as one
+    edit, or ``bound + 1`` once it is certain to exceed ``bound``."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            )
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > bound:
+            return bound + 1
+        before, previous = previous, current
+    return min(previous[-1], bound + 1)
+
+
+def closest_words(term, grams_index):
+    """Vocabulary words within ``max_edits`` of ``term``, whole or as the
+    start of a longer word (a misspelt half-typed query).
+
+    ``grams_index`` maps trigram -> words containing it."""
+    if len(term) < MIN_FUZZY_LENGTH:
+        return []
+    shared = {}
+    for gram in trigrams(term):
+        for word in grams_index.get(gram, ()):
+            shared[word] = shared.get(word, 0) + 1
+    candidates = sorted((w for w, n in shared.items() if n >= 2), key=lambda w: -shared[w])
+    bound = max_edits(term)
+    found = []
+    for word in candidates[:MAX_CANDIDATES]:
+        distance = bounded_distance(term, word, bound)
+        if distance > bound and len(word) > len(term):
+            distance = bounded_distance(term, word[:len(term)], bound)
+        if distance <= bound:
+            found.append(word)
+    return found
@@ -0,0 +1,297 @@
+"""In-memory inverted index over the searchable catalog rows.
+
+Each worker builds the index once, on its first search, and afterwards
+keeps it current from model signals (store.search.signals). Writes made by
+another worker bump a shared version key; this worker notices within
+``_CHECK_INTERVAL`` and loads the index for the new version from the
+shared cache. Only the first worker to ask builds it from the database
+(catalog_cache.single_flight), so an edit costs one rebuild, not one
+per worker.
+A published index is never changed: a write is applied to a copy, which
+then replaces it, so searches running on other threads keep a consistent
+index.
+
+Every name and description word is a posting; a prefix table maps the
+first few characters of a word to the words that start with them, so a
+half-typed query costs a couple of dict lookups instead of a table scan.
+Query words that match nothing are widened through the synonym table
+(store.search.synonyms) and then corrected against the vocabulary's
+trigrams (store.search.fuzzy).
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from store.catalog_cache import bump_version, get_version, single_flight
+
+from .documents import KIND_LIMITS, MAX_RESULTS, SOURCES, keywords_for
+from .fuzzy import closest_words, trigrams
+from .synonyms import SYNONYMS
+from .text import normalize, tokenize
+
+SEARCH_VERSION_KEY = 'search:version'
+_CHECK_INTERVAL = 1.0   # seconds between reads of the shared version key
+_SHARED_TTL = 60 * 60   # seconds a built index stays in the shared cache
+_PREFIX_LENGTH = 6      # longer query words are matched by filtering
+
+# Field weights: a word in the name counts three times one in the description
+NAME, DESCRIPTION = 3, 1
+_PREFIX_FACTOR = 0.5    # a prefix match is worth half an exact word
+_SYNONYM_FACTOR = 0.8   # "lengha" finding "lehenga" ranks just below the real word
+_FUZZY_FACTOR = 0.4     # typo corrections rank below everything typed correctly
+MAX_TERMS = 8           # longer queries are cut, keeping lookups bounded
+_EXACT_NAME_BONUS = 100
+_NAME_PREFIX_BONUS = 10
+
+_KIND_RANK = {kind: rank for rank, (kind, *_rest) in enumerate(SOURCES)}
+
+
+class Document:
+    __slots__ = ('key', 'name', 'description', 'words', 'order', 'payload')
+
+    def __init__(self, kind, pk, name, description, display_order, payload, keywords=''):
+        self.key = (kind, pk)
+        self.name = normalize(name)
+        self.description = normalize(description)
+        self.words = {}
+        for word in tokenize(f'{keywords} {description}'):
+            self.words[word] = DESCRIPTION
+        for word in tokenize(name):
+            self.words[word] = NAME
+        # Ties keep the order the old query path returned: kind, then the
+        # models' display_order
+        self.order = (_KIND_RANK[kind], display_order, pk)
+        self.payload = payload
+
+
+class SearchIndex:
+    def __init__(self):
+        self.documents = {}
+        self.postings = defaultdict(dict)   # word -> {doc key: field weight}
+        self.prefixes = defaultdict(set)    # prefix -> words starting with it
+        self.grams = defaultdict(set)       # trigram -> words containing it
+        self._owned = None                  # entries a copy no longer shares; None: all
+
+    def copy(self):
+        """An index to apply writes to while this one stays in use. The
+        tables are copied; each posting or word set is copied the first
+        time the new index changes it, so this index never sees a change."""
+        index = SearchIndex()
+        index.documents = dict(self.documents)
+        index.postings = defaultdict(dict, self.postings)
+        index.prefixes = defaultdict(set, self.prefixes)
+        index.grams = defaultdict(set, self.grams)
+        index._owned = set()
+        return index
+
+    def __getstate__(self):
+        # A pickled index shares nothing with the one it was copied from
+        return {**self.__dict__, '_owned': None}
+
+    def _own(self, table, key):
+        """``table[key]`` for changing, copied first if it is still shared
+        with the index this one was copied from."""
+        if self._owned is not None and (id(table), key) not in self._owned:
+            self._owned.add((id(table), key))
+            if key in table:
+                table[key] = table[key].copy()
+        return table[key]
+
+    def add(self, doc):
+        self.remove(doc.key)
+        self.documents[doc.key] = doc
+        for word, weight in doc.words.items():
+            if word not in self.postings:
+                for n in range(1, min(len(word), _PREFIX_LENGTH) + 1):
+                    self._own(self.prefixes, word[:n]).add(word)
+                for gram in trigrams(word):
+                    self._own(self.grams, gram).add(word)
+            self._own(self.postings, word)[doc.key] = weight
+
+    def remove(self, key):
+        doc = self.documents.pop(key, None)
+        if doc is None:
+            return
+        for word in doc.words:
+            posting = self._own(self.postings, word)
+            posting.pop(key, None)
+            if not posting:
+                del self.postings[word]
+                for n in range(1, min(len(word), _PREFIX_LENGTH) + 1):
+                    self._own(self.prefixes, word[:n]).discard(word)
+                for gram in trigrams(word):
+                    self._own(self.grams, gram).discard(word)
+
+    def _prefixed(self, term, factor, found):
+        for word in self.prefixes.get(term[:_PREFIX_LENGTH], ()):
+            if word.startswith(term):
+                weight = factor if word == term else factor * _PREFIX_FACTOR
+                found[word] = max(found.get(word, 0), weight)
+
+    def _expand(self, term):
+        """{vocabulary word: factor} for one query word — the word itself
+        or as a prefix, plus its synonyms; typo corrections only if the
+        rest find nothing."""
+        found = {}
+        self._prefixed(term, 1, found)
+        for synonym in SYNONYMS.get(term, ()):
+            self._prefixed(synonym, _SYNONYM_FACTOR, found)
+        if not found:
+            for word in closest_words(term, self.grams):
+                found[word] = _FUZZY_FACTOR
+        return found
+
+    def _matches(self, term):
+        """{doc key: score} for one query word."""
+        scores = {}
+        for word, factor in self._expand(term).items():
+            for key, weight in self.postings[word].items():
+                scores[key] = max(scores.get(key, 0), weight * factor)
+        return scores
+
+    def search(self, query, limit=MAX_RESULTS):
+        """Result payloads for ``query``: every word must match, exact-name
+        matches first, then name hits, then description hits."""
+        terms = tokenize(query)[:MAX_TERMS]
+        if not terms:
+            return []
+        scores = None
+        for term in dict.fromkeys(terms):
+            matches = self._matches(term)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {key: score + matches[key] for key, score in scores.items() if key in matches}
+            if not scores:
+                return []
+
+        phrase = normalize(query)
+        ranked = []
+        for key, score in scores.items():
+            doc = self.documents[key]
+            if doc.name == phrase:
+                score += _EXACT_NAME_BONUS
+            elif doc.name.startswith(phrase):
+                score += _NAME_PREFIX_BONUS
+            ranked.append((-score, doc.order, doc))
+        return _top(ranked, limit)
+
+    def search_substring(self, query, limit=MAX_RESULTS):
+        """Result payloads for documents containing ``query`` anywhere,
+        the old icontains semantics — used when no word matches."""
+        phrase = normalize(query)
+        if not phrase:
+            return []
+        ranked = []
+        for doc in self.documents.values():
+            if doc.name == phrase:
+                tier = 0
+            elif phrase in doc.name:
+                tier = 1
+            elif phrase in doc.description:
+                tier = 2
+            else:
+                continue
+            ranked.append((tier, doc.order, doc))
+        return _top(ranked, limit)
+
+
+def _top(ranked, limit):
+    """Payloads of the best (sort key, order, doc) entries, within the
+    per-kind limits of the typeahead response."""
+    ranked.sort(key=lambda entry: entry[:2])
+    results, per_kind = [], defaultdict(int)
+    for _score, _order, doc in ranked:
+        kind = doc.key[0]
+        if per_kind[kind] < KIND_LIMITS[kind]:
+            per_kind[kind] += 1
+            results.append(doc.payload)
+            if len(results) == limit:
+                break
+    return results
+
+
+def document_for(kind, item, payload):
+    return Document(
+        kind, item.pk, item.name, item.description, item.display_order, payload(item),
+        keywords=keywords_for(kind, item),
+    )
+
+
+def build_index():
+    """Load every active searchable row into a fresh index."""
+    index = SearchIndex()
+    for kind, model, payload, _limit in SOURCES:
+        for item in model.objects.filter(is_active=True):
+            index.add(document_for(kind, item, payload))
+    return index
+
+
+def shared_index(version):
+    """The index for ``version``: built by the first worker to ask, loaded
+    from the shared cache by the others."""
+    return single_flight(f'search:index:{version}', build_index, _SHARED_TTL)
+
+
+# ── Per-worker registry ──────────────────────────────────────────
+
+_lock = threading.Lock()
+_state = {'version': None, 'checked_at': 0.0, 'index': None}
+
+
+def get_index():
+    """This worker's index, (re)loaded if missing or another worker has
+    changed the searchable rows since the last check."""
+    now = time.monotonic()
+    if _state['index'] is not None and now - _state['checked_at'] < _CHECK_INTERVAL:
+        return _state['index']
+    version = get_version(SEARCH_VERSION_KEY)
+    with _lock:
+        if _state['index'] is None or version != _state['version']:
+            _state['index'] = shared_index(version)
+            _state['version'] = version
+        _state['checked_at'] = now
+        return _state['index']
+
+
+def update_index(kind, item, payload):
+    """Apply one committed write to this worker's index and tell the
+    other workers to reload theirs."""
+    previous = get_version(SEARCH_VERSION_KEY)
+    version = bump_version(SEARCH_VERSION_KEY)
+    doc = document_for(kind, item, payload) if item.is_active else None
+    with _lock:
+        if not _apply_here(previous):
+            return
+        index = _state['index'].copy()
+        if doc is not None:
+            index.add(doc)
+        else:
+            index.remove((kind, item.pk))
+        _state.update(index=index, version=version, checked_at=time.monotonic())
+
+
+def remove_from_index(kind, pk):
+    previous = get_version(SEARCH_VERSION_KEY)
+    version = bump_version(SEARCH_VERSION_KEY)
+    with _lock:
+        if _apply_here(previous):
+            index = _state['index'].copy()
+            index.remove((kind, pk))
+            _state.update(index=index, version=version, checked_at=time.monotonic())
+
+
+def _apply_here(previous):
+    """Whether a write can be applied to this worker's index (call under
+    the lock). An index that missed another worker's writes is dropped
+    instead; the next search loads the shared one."""
+    if _state['index'] is not None and _state['version'] != previous:
+        _state.update(version=None, checked_at=0.0, index=None)
+    return _state['index'] is not None
+
+
+def clear():
+    """Drop this worker's index (used by tests)."""
+    with _lock:
+        _state.update(version=None, checked_at=0.0, index=None)
@@ -0,0 +1,41 @@
+"""Keep the search index and backend tables in step with committed writes.
+
+The backend tables are only written with ``SEARCH_BACKEND = 'database'``;
+otherwise ``get_backend()`` is the plain backend and ``sync`` does nothing.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .backends import get_backend
+from .documents import SOURCE_BY_MODEL, keywords_for
+from .index import remove_from_index, update_index
+
+
+def searchable_saved(sender, instance, **kwargs):
+    kind, payload = SOURCE_BY_MODEL[sender]
+
+    def apply():
+        if instance.is_active:
+            get_backend().sync(
+                kind, instance.pk, instance.name, instance.description, keywords_for(kind, instance),
+            )
+        else:
+            get_backend().sync(kind, instance.pk)
+        update_index(kind, instance, payload)
+    transaction.on_commit(apply)
+
+
+def searchable_deleted(sender, instance, **kwargs):
+    kind, _payload = SOURCE_BY_MODEL[sender]
+    pk = instance.pk
+
+    def apply():
+        get_backend().sync(kind, pk)
+        remove_from_index(kind, pk)
+    transaction.on_commit(apply)
+
+
+for _model in SOURCE_BY_MODEL:
+    post_save.connect(searchable_saved, sender=_model, dispatch_uid=f'search_save_{_model.__name__}')
+    post_delete.connect(searchable_deleted, sender=_model, dispatch_uid=f'search_delete_{_model.__name__}')
@@ -0,0 +1,45 @@
+"""Synonyms, spelling variants and Hindi transliterations for search.
+
+Each group lists words customers use for the same thing; a query word in
+a group also matches every other word of the group. Add new spellings to
+the group they belong to — every entry is a single lower-case ASCII word,
+as produced by store.search.text.tokenize.
+"""
+
+SYNONYM_GROUPS = (
+    # Garments
+    ('lehenga', 'lehnga', 'lengha', 'lahenga', 'lehanga', 'lahanga', 'lehngha',
+     'ghagra', 'ghaghra', 'chaniya', 'chaniyacholi'),
+    ('choli', 'cholis', 'blouse', 'blouses'),
+    ('saree', 'sari', 'sarees', 'saris', 'saaree'),
+    ('dupatta', 'duppatta', 'dupata', 'chunni', 'chunri', 'odhni', 'odhani'),
+    ('anarkali', 'anarkalli', 'anarkalee'),
+    ('sharara', 'gharara', 'shararas'),
+    ('kurta', 'kurti', 'kurtas', 'kurtis'),
+    ('gown', 'gowns'),
+    # Fabrics and work
+    ('zardozi', 'zardosi', 'zardoji', 'zari', 'zarri'),
+    ('banarasi', 'benarasi', 'banarsi', 'benarsi', 'banaras', 'benaras', 'varanasi'),
+    ('silk', 'resham', 'reshmi', 'silks'),
+    ('velvet', 'makhmal', 'makhmali'),
+    ('georgette', 'georgete', 'jorjet'),
+    ('chiffon', 'shifon'),
+    ('organza', 'organja'),
+    ('embroidery', 'embroidered', 'kadhai', 'kadai', 'kasidakari'),
+    ('mirror', 'sheesha', 'shisha', 'abhla'),
+    ('gota', 'gotta', 'gotapatti'),
+    ('chikankari', 'chikan', 'chikankaari'),
+    ('bandhani', 'bandhej', 'bandini', 'bandhni'),
+    ('phulkari', 'phulkaari'),
+    # Shop categories (ShowcaseProduct.CATEGORY_CHOICES)
+    ('bridal', 'bride', 'dulhan', 'wedding', 'shaadi', 'shadi', 'vivah'),
+    ('designer', 'couture'),
+    ('festival', 'festive', 'tyohar', 'utsav'),
+    ('party', 'partywear', 'sangeet', 'reception', 'cocktail'),
+    ('casual', 'everyday', 'daily'),
+)
+
+SYNONYMS = {}
+for _group in SYNONYM_GROUPS:
+    for _word in _group:
+        SYNONYMS[_word] = tuple(w for w in _group if w != _word)
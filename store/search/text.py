@@ -0,0 +1,18 @@
+"""Text normalisation shared by the search index and its callers."""
+
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Case-fold, strip accents and collapse whitespace."""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return ' '.join(text.casefold().split())
+
+
+def tokenize(text):
+    """Words of ``text`` after normalisation ("Zardozi-Work" -> zardozi, work)."""
+    return _TOKEN_RE.findall(normalize(text))
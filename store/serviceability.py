@@ -0,0 +1,260 @@
+"""Pincode serviceability compiled into sorted ranges, resolved in memory.
+
+Three sources decide whether a product ships to a pincode, most specific
+first: the product's PincodeAvailability row for that exact pincode, the
+product's ServiceabilityRule overrides, then the default rules that apply
+to every product. Within a source the narrowest range wins.
+
+``build_map`` flattens each source into disjoint ranges — two parallel
+sorted arrays of first/last pincodes plus an index into a short table of
+distinct (available, days, charge) outcomes — and merges neighbours with
+the same outcome, so a courier list of thousands of consecutive pincodes
+compresses to a handful of ranges. ``resolve`` is a binary search.
+
+The compiled map is shared through the cache under a version that writes
+to either model bump (store.catalog_signals); each worker keeps a copy
+and checks the version at most once a second, so after warm-up a lookup
+touches neither the database nor the cache.
+
+For the shop's "deliverable to my pincode" filter, ``deliverable`` answers
+for a whole set of products at once. Sets are bitmaps — Python ints with
+bit N set for product id N — so narrowing a category or facet result to
+one pincode is a single AND, and its count is a popcount.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+from .catalog_cache import bump_version, get_version, single_flight
+from .models import PincodeAvailability, ServiceabilityRule
+
+SERVICEABILITY_VERSION_KEY = 'serviceability:version'
+NOT_SERVICEABLE = (False, None, 0)
+
+_MAP_TTL = 60 * 60 * 24
+_CHECK_INTERVAL = 1.0   # seconds between reads of the shared version key
+_MAX_PINCODE_BITMAPS = 4096
+
+
+class RangeTable:
+    """Disjoint pincode ranges, each mapped to an outcome number."""
+
+    __slots__ = ('starts', 'ends', 'outcomes')
+
+    def __init__(self, starts, ends, outcomes):
+        self.starts = array('l', starts)
+        self.ends = array('l', ends)
+        self.outcomes = array('I', outcomes)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def lookup(self, pincode):
+        """Outcome number of the range holding ``pincode``, or None."""
+        i = bisect_right(self.starts, pincode) - 1
+        if i >= 0 and pincode <= self.ends[i]:
+            return self.outcomes[i]
+        return None
+
+
+def compile_ranges(ranges):
+    """A RangeTable from possibly overlapping (first, last, precedence,
+    outcome) ranges. Where ranges overlap, the lowest precedence wins."""
+    if not ranges:
+        return RangeTable((), (), ())
+    points = sorted({first for first, _l, _p, _o in ranges} | {last + 1 for _f, last, _p, _o in ranges})
+    owners = [None] * (len(points) - 1)    # segment i is [points[i], points[i + 1])
+    # Paint the weakest ranges first so stronger ones overwrite them
+    for first, last, _precedence, outcome in sorted(ranges, key=lambda r: r[2], reverse=True):
+        for i in range(bisect_left(points, first), bisect_left(points, last + 1)):
+            owners[i] = outcome
+
+    starts, ends, outcomes = [], [], []
+    for i, outcome in enumerate(owners):
+        if outcome is None:
+            continue
+        if outcomes and outcomes[-1] == outcome and ends[-1] == points[i] - 1:
+            ends[-1] = points[i + 1] - 1
+        else:
+            starts.append(points[i])
+            ends.append(points[i + 1] - 1)
+            outcomes.append(outcome)
+    return RangeTable(starts, ends, outcomes)
+
+
+class ServiceabilityMap:
+    """Compiled serviceability for every product."""
+
+    __slots__ = ('outcomes', 'defaults', 'products')
+
+    def __init__(self, outcomes, defaults, products):
+        self.outcomes = outcomes      # [(is_available, delivery_days, extra_charge)]
+        self.defaults = defaults      # RangeTable for every product
+        self.products = products      # {product_id: RangeTable}
+
+    @property
+    def configured(self):
+        """False until any rule or PincodeAvailability row exists."""
+        return bool(len(self.defaults) or self.products)
+
+    def resolve(self, product_id, pincode):
+        """(is_available, delivery_days, extra_charge) for one product."""
+        if not (isinstance(pincode, str) and len(pincode) == 6 and pincode.isdigit()):
+            return NOT_SERVICEABLE
+        number = int(pincode)
+        table = self.products.get(int(product_id))
+        outcome = table.lookup(number) if table is not None else None
+        if outcome is None:
+            outcome = self.defaults.lookup(number)
+        if outcome is None or not self.outcomes[outcome][0]:
+            return NOT_SERVICEABLE
+        return self.outcomes[outcome]
+
+    def exceptions(self, pincode):
+        """(default, bitmap) for ``pincode``: whether the default rules
+        deliver there, and the products whose own rows or rules say
+        otherwise."""
+        if not (isinstance(pincode, str) and len(pincode) == 6 and pincode.isdigit()):
+            return False, 0
+        number = int(pincode)
+        outcome = self.defaults.lookup(number)
+        default = outcome is not None and self.outcomes[outcome][0]
+        flipped = bytearray(max(self.products, default=0) // 8 + 1)
+        for product_id, table in self.products.items():
+            outcome = table.lookup(number)
+            if outcome is not None and self.outcomes[outcome][0] != default:
+                flipped[product_id >> 3] |= 1 << (product_id & 7)
+        return default, int.from_bytes(flipped, 'little')
+
+
+def build_map():
+    """Compile every rule and PincodeAvailability row into a ServiceabilityMap."""
+    outcomes, numbers = [], {}
+
+    def outcome_for(is_available, days, charge):
+        key = (is_available, days, charge) if is_available else NOT_SERVICEABLE
+        if key not in numbers:
+            numbers[key] = len(outcomes)
+            outcomes.append(key)
+        return numbers[key]
+
+    defaults, by_product = [], {}
+    for rule in ServiceabilityRule.objects.all().iterator():
+        first, last = rule.pincode_range
+        entry = (first, last, last - first, outcome_for(rule.is_available, rule.delivery_days, rule.extra_charge))
+        if rule.product_id is None:
+            defaults.append(entry)
+        else:
+            by_product.setdefault(rule.product_id, []).append(entry)
+
+    rows = PincodeAvailability.objects.values_list(
+        'product_id', 'pincode', 'is_available', 'delivery_days', 'extra_charge',
+    ).order_by()
+    for product_id, pincode, is_available, days, charge in rows.iterator(chunk_size=5000):
+        pincode = pincode.strip()
+        if len(pincode) == 6 and pincode.isdigit():
+            number = int(pincode)
+            # Precedence -1: an exact row beats any rule
+            by_product.setdefault(product_id, []).append(
+                (number, number, -1, outcome_for(is_available, days, charge))
+            )
+
+    return ServiceabilityMap(
+        outcomes,
+        compile_ranges(defaults),
+        {product_id: compile_ranges(ranges) for product_id, ranges in by_product.items()},
+    )
+
+
+# ── Per-worker registry ──────────────────────────────────────────
+
+_lock = threading.Lock()
+_state = {'version': None, 'checked_at': 0.0, 'map': None, 'pincodes': {}}
+
+
+def get_map():
+    """This worker's compiled map, reloaded when the shared version moves.
+    One worker compiles each version; the rest read it from the cache."""
+    now = time.monotonic()
+    if _state['map'] is not None and now - _state['checked_at'] < _CHECK_INTERVAL:
+        return _state['map']
+    version = get_version(SERVICEABILITY_VERSION_KEY)
+    with _lock:
+        if _state['map'] is None or version != _state['version']:
+            _state['map'] = single_flight(f'serviceability:map:{version}', build_map, _MAP_TTL)
+            _state['version'] = version
+            _state['pincodes'] = {}
+        _state['checked_at'] = now
+        return _state['map']
+
+
+def clean_pincode(value):
+    """``value`` stripped if it is a 6-digit pincode, else None."""
+    value = (value or '').strip()
+    return value if len(value) == 6 and value.isdigit() else None
+
+
+def resolve(product_id, pincode):
+    """(is_available, delivery_days, extra_charge) for ``product_id`` in
+    ``pincode``; (False, None, 0) if it is not serviceable."""
+    return get_map().resolve(product_id, pincode)
+
+
+def resolve_cart(product_ids, pincode):
+    """Serviceability of a whole cart in ``pincode`` from one map lookup:
+    {'configured', 'items': {product_id: (is_available, delivery_days,
+    extra_charge)}, 'unavailable': [product_id], 'delivery_days': slowest
+    item or None, 'extra_charge': summed over the distinct products}."""
+    service_map = get_map()
+    items = {int(pk): service_map.resolve(pk, pincode) for pk in product_ids}
+    available = [terms for terms in items.values() if terms[0]]
+    return {
+        'configured': service_map.configured,
+        'items': items,
+        'unavailable': [pk for pk, terms in items.items() if not terms[0]],
+        'delivery_days': max((days for _ok, days, _charge in available), default=None),
+        'extra_charge': sum((charge for _ok, _days, charge in available), Decimal('0')),
+    }
+
+
+def bitmap_of(product_ids):
+    """Bitmap with the bit of every id in ``product_ids`` set."""
+    product_ids = list(product_ids)
+    bits = bytearray(max(product_ids, default=0) // 8 + 1)
+    for product_id in product_ids:
+        bits[product_id >> 3] |= 1 << (product_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def deliverable(bitmap, pincode):
+    """The products of ``bitmap`` that ship to ``pincode``. Until any
+    serviceability data exists every product does (see resolve_cart)."""
+    service_map = get_map()
+    if not service_map.configured:
+        return bitmap
+    pincodes = _state['pincodes']
+    terms = pincodes.get(pincode)
+    if terms is None:
+        terms = service_map.exceptions(pincode)
+        if len(pincodes) >= _MAX_PINCODE_BITMAPS:
+            pincodes.clear()
+        pincodes[pincode] = terms
+    default, flipped = terms
+    return bitmap & ~flipped if default else bitmap & flipped
+
+
+def bump_serviceability_version():
+    """Make every worker reload the compiled map on its next lookup."""
+    version = bump_version(SERVICEABILITY_VERSION_KEY)
+    with _lock:
+        _state.update(map=None, version=None, pincodes={})
+    return version
+
+
+def clear():
+    """Drop this worker's map (used by tests)."""
+    with _lock:
+        _state.update(version=None, checked_at=0.0, map=None, pincodes={})
@@ -0,0 +1,59 @@
+"""In-process registry of the active site-chrome singletons.
+
+ContactInfo, HeroSection, ParallaxSection, ShopBanner and AboutPage each
+have at most one active row. Every worker keeps those rows in memory and
+reloads them only when the shared version key changes — the models' save()
+overrides bump it, once the write commits, whenever the active row may have
+changed.
+"""
+
+import threading
+import time
+from django.core.cache import cache
+
+SINGLETONS_VERSION_KEY = 'singletons:version'
+_CHECK_INTERVAL = 1.0   # seconds between reads of the shared version key
+
+_MISSING = object()
+_lock = threading.Lock()
+_state = {'version': None, 'checked_at': 0.0, 'instances': {}}
+
+
+def bump_singletons_version():
+    """Tell every worker to reload its singletons on the next read."""
+    version = time.time_ns() // 1000
+    cache.set(SINGLETONS_VERSION_KEY, version, None)
+    with _lock:
+        # This worker sees its own write immediately
+        _state.update(version=version, checked_at=time.monotonic(), instances={})
+    return version
+
+
+def _current_instances():
+    """Return this worker's instance map, dropping it if another worker
+    bumped the shared version since the last check."""
+    now = time.monotonic()
+    if now - _state['checked_at'] < _CHECK_INTERVAL:
+        return _state['instances']
+    version = cache.get(SINGLETONS_VERSION_KEY)
+    with _lock:
+        if version is None or version != _state['version']:
+            _state.update(version=version, instances={})
+        _state['checked_at'] = now
+        return _state['instances']
+
+
+def get_active(model):
+    """Return the active instance of a singleton model (or None)."""
+    instances = _current_instances()
+    instance = instances.get(model, _MISSING)
+    if instance is _MISSING:
+        instance = model.objects.filter(is_active=True).first()
+        instances[model] = instance
+    return instance
+
+
+def clear():
+    """Forget every loaded instance in this worker (used by tests)."""
+    with _lock:
+        _state.update(version=None, checked_at=0.0, instances={})
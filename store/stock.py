@@ -0,0 +1,185 @@
+"""Race-free stock for checkout: conditional decrements and reservations.
+
+Stock is never read, changed in Python and written back. ``take`` is one
+conditional UPDATE for the whole cart,
+
+    UPDATE … SET stock_quantity = stock_quantity - CASE id WHEN … END
+     WHERE id IN (…) AND stock_quantity >= CASE id WHEN … END
+
+and succeeds only if every product matched. The database re-checks the
+condition against the latest committed row, so two buyers of the last
+lehenga cannot both get it, and only the rows being bought are locked —
+checkouts of other products never wait.
+
+Online-payment orders ``reserve`` instead: the stock is taken the same way
+and a StockReservation per product records it, with an expiry. Payment
+success ``commit``s (drops the records, the stock stays sold); failure,
+cancellation, deletion or expiry ``release``s — one UPDATE gives back the
+stock of every reservation released together, and the records go with it,
+so releasing twice gives nothing back twice.
+
+Stock changes skip model signals. The catalog version is bumped only
+when a product sells out or comes back, which is all cached pages show.
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .catalog_cache import bump_catalog_version
+from .models import Coupon, Order, ShowcaseProduct, StockReservation
+
+_EXPIRY_CHECK_INTERVAL = 60.0   # seconds between expiry sweeps per worker
+
+
+class OutOfStock(Exception):
+    """Some products have less stock than asked for. ``shortages`` maps
+    their ids to the quantity still available."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(f'Insufficient stock for products {sorted(shortages)}')
+
+
+def reservation_ttl():
+    return timedelta(minutes=getattr(settings, 'STOCK_RESERVATION_MINUTES', 30))
+
+
+def _per_product(quantities):
+    """CASE expression giving each product's quantity."""
+    return Case(
+        *(When(pk=pk, then=Value(qty)) for pk, qty in quantities.items()),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def _sold_out_changed():
+    transaction.on_commit(bump_catalog_version)
+
+
+def take(quantities):
+    """Decrement stock by {product_id: quantity} in one statement, or raise
+    OutOfStock and change nothing."""
+    quantities = {pk: qty for pk, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    with transaction.atomic():
+        amount = _per_product(quantities)
+        updated = ShowcaseProduct.objects.filter(
+            pk__in=quantities, stock_quantity__gte=amount,
+        ).update(stock_quantity=F('stock_quantity') - amount)
+        if updated != len(quantities):
+            available = dict(
+                ShowcaseProduct.objects.filter(pk__in=quantities).values_list('pk', 'stock_quantity')
+            )
+            # Leaving the block with the exception undoes the rows that did match
+            raise OutOfStock({
+                pk: available.get(pk, 0) for pk, qty in quantities.items() if available.get(pk, 0) < qty
+            })
+        if ShowcaseProduct.objects.filter(pk__in=quantities, stock_quantity=0).exists():
+            _sold_out_changed()
+
+
+def put_back(quantities):
+    """Increment stock by {product_id: quantity} in one statement."""
+    quantities = {pk: qty for pk, qty in quantities.items() if qty > 0}
+    if not quantities:
+        return
+    if ShowcaseProduct.objects.filter(pk__in=quantities, stock_quantity=0).exists():
+        _sold_out_changed()
+    ShowcaseProduct.objects.filter(pk__in=quantities).update(
+        stock_quantity=F('stock_quantity') + _per_product(quantities),
+    )
+
+
+def reserve(order, quantities):
+    """Take stock for a pending online-payment order and record it until
+    the payment is settled. Raises OutOfStock."""
+    with transaction.atomic():
+        take(quantities)
+        expires_at = timezone.now() + reservation_ttl()
+        StockReservation.objects.bulk_create([
+            StockReservation(order=order, product_id=pk, quantity=qty, expires_at=expires_at)
+            for pk, qty in quantities.items() if qty > 0
+        ])
+
+
+def commit(order):
+    """The order is paid: its reserved stock is sold."""
+    StockReservation.objects.filter(order=order).delete()
+
+
+def release(orders):
+    """Give back the reserved stock of ``orders`` — three statements
+    however many orders and lines. Returns the number of reservations
+    released; already released orders give back nothing."""
+    with transaction.atomic():
+        reservations = StockReservation.objects.select_for_update().filter(order__in=orders)
+        rows = list(reservations.values_list('pk', 'product_id', 'quantity'))
+        if not rows:
+            return 0
+        quantities = Counter()
+        for _pk, product_id, quantity in rows:
+            quantities[product_id] += quantity
+        put_back(quantities)
+        StockReservation.objects.filter(pk__in=[pk for pk, _p, _q in rows]).delete()
+    return len(rows)
+
+
+def release_coupons(orders):
+    """Give back the coupon use of each order that applied one."""
+    codes = Counter(order.coupon_code.upper() for order in orders if order.coupon_code and order.discount_amount)
+    for code, uses in codes.items():
+        Coupon.objects.filter(code__iexact=code).update(
+            used_count=Greatest(F('used_count') - uses, Value(0)),
+        )
+
+
+def release_expired(now=None):
+    """Cancel pending online orders whose reservations have expired and give
+    back their stock and coupons. Returns the number of orders cancelled."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = StockReservation.objects.filter(
+            expires_at__lte=now, order__payment_status='pending',
+        ).values('order_id')
+        orders = list(Order.objects.select_for_update().filter(pk__in=expired, payment_status='pending'))
+        if not orders:
+            return 0
+        release(orders)
+        release_coupons(orders)
+        Order.objects.filter(pk__in=[order.pk for order in orders]).update(
+            payment_status='failed', status='cancelled', cancelled_at=now,
+            notes='Payment not completed before the stock reservation expired.',
+        )
+    return len(orders)
+
+
+# ── Per-worker expiry sweep ──────────────────────────────────────
+
+_lock = threading.Lock()
+_state = {'swept_at': 0.0}
+
+
+def release_expired_now_and_then():
+    """release_expired at most once a minute per worker, so checkouts
+    recover abandoned stock without a scheduler."""
+    now = time.monotonic()
+    with _lock:
+        if now - _state['swept_at'] < _EXPIRY_CHECK_INTERVAL:
+            return
+        _state['swept_at'] = now
+    release_expired()
+
+
+def clear():
+    """Forget the last sweep (used by tests)."""
+    with _lock:
+        _state['swept_at'] = 0.0
@@ -0,0 +1,29 @@
+"""Template tags for hole-punched fragments in cached catalog pages."""
+
+from django import template
+
+from mysite.middleware import fragment_marker, render_fragment
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def user_fragment(context, name, **kwargs):
+    """Render a per-visitor fragment, or a placeholder for it when the
+    page is being captured by PageCacheMiddleware."""
+    request = context.get('request')
+    holes = getattr(request, '_page_cache_holes', None)
+    if holes is not None:
+        marker = fragment_marker(name, kwargs)
+        holes[marker] = (name, kwargs)
+        return marker
+    if request is None:
+        return render_fragment(name, request, kwargs, user=context.get('user'))
+    return render_fragment(name, request, kwargs)
+
+
+@register.filter
+def wishlisted(user, product_id):
+    """Whether ``user`` has ``product_id`` in their wishlist (one EXISTS)."""
+    from store.models import Wishlist
+    return Wishlist.objects.filter(user=user, product_id=product_id).exists()
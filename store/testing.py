@@ -0,0 +1,18 @@
+"""Settings shared by the store test modules.
+
+Tests run against a per-process cache and plain file storage under a
+temporary media root, so a test run never writes into the project's
+cache/ and media/ directories:
+
+    @override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+"""
+
+import os
+import tempfile
+
+TEST_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+TEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+TEST_MEDIA_ROOT = os.path.join(tempfile.gettempdir(), 'house-of-ambava-test-media')
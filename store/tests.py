@@ -8,9 +8,13 @@ from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from store.models import Coupon, Order, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
 
 
-@override_settings(RAZORPAY_KEY_ID='rzp_test_key', RAZORPAY_KEY_SECRET='rzp_test_secret')
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    RAZORPAY_KEY_ID='rzp_test_key', RAZORPAY_KEY_SECRET='rzp_test_secret',
+)
 class PlaceOrderRazorpayFailureTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='buyer', password='pass1234', email='buyer@example.com')
@@ -74,3 +78,42 @@ class PlaceOrderRazorpayFailureTests(TestCase):
         self.coupon.refresh_from_db()
         self.assertEqual(self.product.stock_quantity, 5)
         self.assertEqual(self.coupon.used_count, 0)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class PlaceOrderProductResolutionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='pass1234', email='buyer@example.com')
+        self.client.force_login(self.user)
+        self.products = [
+            ShowcaseProduct.objects.create(
+                name=f'Lehenga {n}', category='bridal', price=Decimal('3000.00'), stock_quantity=5,
+                image=SimpleUploadedFile(f'lehenga{n}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+            for n in range(4)
+        ]
+
+    def test_lines_resolve_by_id_in_one_query_with_a_name_fallback(self):
+        from mysite.views.checkout import _resolve_products
+
+        lines = [{'product_id': p.pk, 'name': 'stale name'} for p in self.products]
+        with self.assertNumQueries(1):
+            self.assertEqual(_resolve_products(lines), self.products)
+        lines += [{'name': 'Lehenga 1'}, {'product_id': 999999, 'name': 'Lehenga 2'}, {'name': 'Missing'}]
+        with self.assertNumQueries(2):
+            resolved = _resolve_products(lines)
+        self.assertEqual(resolved[4:], [self.products[1], self.products[2], None])
+
+    def test_renamed_product_still_resolves_by_id(self):
+        ShowcaseProduct.objects.filter(pk=self.products[0].pk).update(name='Lehenga Royale')
+        response = self.client.post(reverse('place_order'), data=json.dumps({
+            'items': [{'product_id': self.products[0].pk, 'name': 'Lehenga 0', 'quantity': 1, 'size': 'M'}],
+            'shipping': {
+                'full_name': 'Test Buyer', 'phone': '9999999999', 'address_line1': '123 Test Street',
+                'city': 'Mumbai', 'state': 'Maharashtra', 'pincode': '400001',
+            },
+            'email': 'buyer@example.com',
+            'payment_method': 'cod',
+        }), content_type='application/json')
+        self.assertTrue(response.json()['ok'])
+        self.assertEqual(Order.objects.get().items.get().product_name, 'Lehenga Royale')
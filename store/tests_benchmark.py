@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from store import serviceability
+from store.benchmark import (
+    generate_catalog, isolated_state, percentile, run_benchmarks, run_checkout_benchmarks,
+)
+from store.models import OrderItem, PincodeAvailability, ProductImage, Review, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+class PercentileTests(SimpleTestCase):
+    def test_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_catalog_is_deterministic_and_complete(self):
+        generate_catalog(40, seed=3)
+        first = list(ShowcaseProduct.objects.order_by('slug').values_list('name', 'price', 'size_mask'))
+        generate_catalog(40, seed=3)
+        self.assertEqual(
+            list(ShowcaseProduct.objects.order_by('slug').values_list('name', 'price', 'size_mask')), first,
+        )
+        self.assertEqual(len(first), 40)
+        self.assertTrue(ProductImage.objects.exists())
+        self.assertEqual(PincodeAvailability.objects.count(), 120)
+        self.assertEqual(
+            sum(ShowcaseProduct.objects.values_list('rating_count', flat=True)), Review.objects.count(),
+        )
+
+    def test_every_endpoint_reports_latency_and_queries(self):
+        generate_catalog(30)
+        results = run_benchmarks(requests=3)
+        self.assertEqual(set(results), {
+            'home', 'shop', 'shop_fragment', 'shop_facets', 'product_detail', 'search_api', 'showcase_api',
+        })
+        for stats in results.values():
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+            self.assertGreaterEqual(stats['cold_queries'], stats['max_warm_queries'])
+
+    def test_isolated_state_leaves_the_configured_cache_alone(self):
+        cache.set('live-page', 'cached')
+        with isolated_state():
+            generate_catalog(20)
+            run_benchmarks(requests=1, endpoints=['home', 'search_api'])
+        self.assertEqual(cache.get('live-page'), 'cached')
+
+    def test_place_order_queries_do_not_grow_with_the_cart(self):
+        serviceability.clear()
+        generate_catalog(30)
+        results = run_checkout_benchmarks(requests=2, cart_sizes=(1, 5, 25))
+        self.assertEqual(len({stats['max_warm_queries'] for stats in results.values()}), 1)
+        self.assertEqual(OrderItem.objects.count(), 3 * (1 + 5 + 25))
+        # bulk_create skips OrderItem.save(): totals come from the view
+        self.assertFalse(OrderItem.objects.exclude(total=F('price') * F('quantity')).exists())
+
+    def test_next_size_replaces_the_orders_of_the_last(self):
+        serviceability.clear()
+        for size in (20, 30):
+            generate_catalog(size)
+            run_checkout_benchmarks(requests=2, cart_sizes=(1, 2))
+            connection.check_constraints()    # SQLite defers foreign keys to the commit
+        self.assertEqual(OrderItem.objects.count(), 3 * (1 + 2))
+        self.assertEqual(set(OrderItem.objects.values_list('product__slug', flat=True)), {'bench-0', 'bench-1'})
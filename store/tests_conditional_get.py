@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store import singletons
+from store.models import Review, ShowcaseProduct, Wishlist
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga',
+            category='bridal',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        self.user = User.objects.create_user(username='priya', password='pass1234')
+
+    def test_unchanged_page_is_304_without_queries(self):
+        response = self.client.get(reverse('shop'))
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('shop'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_write_changes_page_etag(self):
+        etag = self.client.get(reverse('shop'))['ETag']
+        self.product.price = Decimal('11000.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        response = self.client.get(reverse('shop'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_signed_in_pages_carry_no_validators(self):
+        self.client.force_login(self.user)
+        self.assertNotIn('ETag', self.client.get(reverse('shop')))
+
+    def test_review_list_follows_product_version(self):
+        url = reverse('review_list')
+        params = {'product_id': self.product.pk}
+        etag = self.client.get(url, params)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(product=self.product, user=self.user, rating=5)
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_wishlist_etag_changes_on_toggle(self):
+        self.client.force_login(self.user)
+        etag = self.client.get(reverse('wishlist_list'))['ETag']
+        self.assertEqual(
+            self.client.get(reverse('wishlist_list'), HTTP_IF_NONE_MATCH=etag).status_code, 304,
+        )
+        Wishlist.objects.create(user=self.user, product=self.product)
+        response = self.client.get(reverse('wishlist_list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['product_ids'], [self.product.pk])
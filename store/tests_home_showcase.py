@@ -0,0 +1,50 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store import singletons
+from store.models import ShowcaseProduct
+from store.pagination import SHOWCASE_PAGE_SIZE, get_showcase_page
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class HomeShowcaseTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        for i in range(SHOWCASE_PAGE_SIZE + 3):
+            ShowcaseProduct.objects.create(
+                name=f'Saree {i}',
+                category='casual',
+                price=Decimal('3000.00'),
+                image=SimpleUploadedFile(f's{i}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+
+    def test_home_renders_bounded_first_page(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(len(response.context['showcase_products']), SHOWCASE_PAGE_SIZE)
+        self.assertIsNotNone(response.context['showcase_next_cursor'])
+        self.assertContains(response, 'class="showcase-item"', count=SHOWCASE_PAGE_SIZE)
+        self.assertContains(response, 'id="showcaseSentinel"')
+
+    def test_first_page_cached_and_invalidated(self):
+        get_showcase_page()
+        with self.assertNumQueries(0):
+            products, _ = get_showcase_page()
+        self.assertEqual(len(products), SHOWCASE_PAGE_SIZE)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShowcaseProduct.objects.first().delete()
+        _, next_cursor = get_showcase_page()
+        self.assertEqual(len(get_showcase_page(next_cursor)[0]), 2)
+
+    def test_api_streams_remaining_cards(self):
+        _, cursor = get_showcase_page()
+        data = self.client.get(reverse('showcase_api'), {'cursor': cursor}).json()
+        self.assertTrue(data['ok'])
+        self.assertEqual(data['html'].count('class="showcase-item"'), 3)
+        self.assertIsNone(data['next_cursor'])
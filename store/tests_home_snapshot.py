@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store.catalog_cache import get_catalog_version
+from store.models import FeaturedCollection, ShowcaseProduct, StatItem
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class HomeSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga',
+            category='bridal',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        FeaturedCollection.objects.create(
+            name='Royal Lehenga',
+            description='Featured bridal piece',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('featured.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+
+    def test_warm_home_page_runs_no_queries(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Featured bridal piece')
+        self.assertContains(response, reverse('product_detail', args=[self.product.slug]))
+
+    def test_catalog_write_invalidates_snapshot(self):
+        self.client.get(reverse('home'))
+        version = get_catalog_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StatItem.objects.create(number='10K+', label='Happy Brides')
+            self.assertEqual(get_catalog_version(), version)    # not before the commit
+
+        self.assertNotEqual(get_catalog_version(), version)
+        self.assertContains(self.client.get(reverse('home')), 'Happy Brides')
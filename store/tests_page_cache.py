@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from mysite.middleware import normalized_url
+from store import singletons
+from store.models import ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga',
+            category='bridal',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        self.user = User.objects.create_user(username='priya', password='pass1234', first_name='Priya')
+
+    def test_anonymous_hit_skips_orm(self):
+        self.client.get(reverse('shop'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('shop'))
+        self.assertContains(response, 'Royal Lehenga')
+        self.assertContains(response, reverse('customer_login'))
+        self.assertNotContains(response, '<!--user-fragment')
+
+    def test_signed_in_visitor_gets_own_fragments_from_cached_page(self):
+        url = reverse('product_detail', args=[self.product.slug])
+        self.client.get(url)  # cached by an anonymous visitor
+
+        self.client.force_login(self.user)
+        response = self.client.get(url)
+        self.assertContains(response, 'profile-dropdown-name">Priya')
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertContains(response, f'name="product_id" value="{self.product.pk}"')
+
+    def test_catalog_write_invalidates_cached_pages(self):
+        self.client.get(reverse('shop'))
+        self.product.name = 'Renamed Lehenga'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        self.assertContains(self.client.get(reverse('shop')), 'Renamed Lehenga')
+
+    def test_query_string_is_normalized(self):
+        factory = RequestFactory()
+        a = factory.get('/shop/', {'page': '2', 'category': 'bridal', 'utm_source': 'ig'})
+        b = factory.get('/shop/', {'category': 'bridal', 'page': '2', 'fbclid': 'x'})
+        self.assertEqual(normalized_url(a), normalized_url(b))
+
+    def test_unknown_params_do_not_add_cache_entries(self):
+        factory = RequestFactory()
+        urls = {
+            normalized_url(factory.get('/shop/', params))
+            for params in ({}, {'nonce': '1'}, {'nonce': '2', 'x': 'y'}, {'cursor': 'garbage'}, {'cursor': ''})
+        }
+        self.assertEqual(urls, {'/shop/'})
+        self.assertEqual(
+            normalized_url(factory.get('/', {'size': ['M', 'S'], 'in_stock': '1', 'junk': '1'})),
+            '/?in_stock=1&size=M&size=S',
+        )
@@ -0,0 +1,115 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from store import pincode_csv, serviceability
+from store.models import PincodeAvailability, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+HEADER = 'product,pincode,available,delivery_days,extra_charge\n'
+
+
+def _image(name):
+    return SimpleUploadedFile(name, b'filecontent', content_type='image/jpeg')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class PincodeCsvTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        serviceability.clear()
+        self.lehenga = ShowcaseProduct.objects.create(
+            name='Royal Lehenga', category='bridal', price=Decimal('12000.00'), image=_image('a.jpg'),
+        )
+        self.saree = ShowcaseProduct.objects.create(
+            name='Silk Saree', category='festival', price=Decimal('8000.00'), image=_image('b.jpg'),
+        )
+        PincodeAvailability.objects.create(product=self.lehenga, pincode='110001', delivery_days=5)
+        PincodeAvailability.objects.create(product=self.lehenga, pincode='110002', delivery_days=4)
+
+    def terms(self, product, pincode):
+        return PincodeAvailability.objects.values_list(
+            'is_available', 'delivery_days', 'extra_charge',
+        ).get(product=product, pincode=pincode)
+
+    def test_import_creates_updates_and_reports_bad_lines(self):
+        csv_text = HEADER + (
+            f'{self.lehenga.slug},110001,1,3,0\n'        # changed
+            f'{self.lehenga.slug},110002,1,4,0\n'        # unchanged
+            'all,781001,1,9,250\n'                       # one row per product
+            f'{self.saree.pk},400001,0,,\n'
+            'no-such-product,400001,1,3,0\n'
+            f'{self.saree.slug},4000,1,3,0\n'
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = pincode_csv.import_csv(StringIO(csv_text))
+        self.assertEqual(
+            {k: stats[k] for k in ('rows', 'created', 'updated', 'unchanged', 'skipped')},
+            {'rows': 6, 'created': 3, 'updated': 1, 'unchanged': 1, 'skipped': 2},
+        )
+        self.assertEqual(stats['errors'][0], 'line 6: unknown product "no-such-product"')
+        self.assertEqual(self.terms(self.lehenga, '110001'), (True, 3, Decimal('0')))
+        self.assertEqual(self.terms(self.saree, '781001'), (True, 9, Decimal('250.00')))
+        self.assertEqual(self.terms(self.saree, '400001'), (False, 5, Decimal('0')))
+        # The compiled serviceability map picked up the bulk writes
+        self.assertEqual(serviceability.resolve(self.saree.pk, '781001'), (True, 9, Decimal('250.00')))
+
+    def test_dry_run_lists_changes_and_writes_nothing(self):
+        diff = []
+        stats = pincode_csv.import_csv(
+            StringIO(HEADER + f'{self.lehenga.slug},110001,1,3,0\n{self.saree.slug},110001,1,2,99\n'),
+            dry_run=True, on_diff=diff.append,
+        )
+        self.assertEqual((stats['created'], stats['updated']), (1, 1))
+        self.assertEqual(diff, [
+            f'~ {self.lehenga.slug} 110001: 5 days → 3 days',
+            f'+ {self.saree.slug} 110001: 2 days +₹99',
+        ])
+        self.assertEqual(self.terms(self.lehenga, '110001'), (True, 5, Decimal('0')))
+        self.assertFalse(PincodeAvailability.objects.filter(product=self.saree).exists())
+
+    def test_queries_grow_per_batch_not_per_line(self):
+        lines = ''.join(f'all,{pincode},1,4,0\n' for pincode in range(500001, 502001))
+        with CaptureQueriesContext(connection) as captured:
+            stats = pincode_csv.import_csv(StringIO(HEADER + lines))
+        self.assertEqual(stats['created'], 4000)
+        statements = [q['sql'].split(' ', 1)[0] for q in captured]
+        self.assertEqual(statements.count('SELECT'), 3)    # the products, then one read per 2000 pairs
+        # Multi-row INSERTs (SQLite caps the rows per statement at 999 parameters)
+        self.assertLess(statements.count('INSERT'), 4000 // 100)
+
+    def test_missing_column_is_an_error(self):
+        with self.assertRaisesMessage(ValueError, 'Missing CSV columns: extra_charge'):
+            pincode_csv.import_csv(StringIO('product,pincode,available,delivery_days\n'))
+
+    def test_export_round_trips_through_the_command(self):
+        out = StringIO()
+        call_command('export_pincodes', stdout=out)
+        self.assertEqual(out.getvalue().splitlines(), [
+            HEADER.strip(),
+            f'{self.lehenga.slug},110001,1,5,0.00',
+            f'{self.lehenga.slug},110002,1,4,0.00',
+        ])
+        stats = pincode_csv.import_csv(StringIO(out.getvalue()))
+        self.assertEqual((stats['unchanged'], stats['created'], stats['updated']), (2, 0, 0))
+
+    def test_admin_import_and_export(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        upload = SimpleUploadedFile('couriers.csv', (HEADER + f'{self.saree.slug},110001,1,2,0\n').encode())
+        response = self.client.post(reverse('admin:store_pincodeavailability_import'), {'csv_file': upload})
+        self.assertEqual(response.context['stats']['created'], 1)
+        self.assertTrue(PincodeAvailability.objects.filter(product=self.saree, pincode='110001').exists())
+
+        response = self.client.post(reverse('admin:store_pincodeavailability_changelist'), {
+            'action': 'export_csv',
+            '_selected_action': list(PincodeAvailability.objects.filter(product=self.saree).values_list('pk', flat=True)),
+        })
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines()[1], f'{self.saree.slug},110001,1,2,0.00')
@@ -0,0 +1,90 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from store import pincodes
+from store.models import Address, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+INDIA_POST_CSV = (
+    'CircleName,RegionName,DivisionName,OfficeName,Pincode,OfficeType,Delivery,District,StateName\n'
+    'Delhi Circle,Delhi,New Delhi GPO,Connaught Place SO,110001,SO,Delivery,NEW DELHI,DELHI\n'
+    'Delhi Circle,Delhi,New Delhi GPO,Parliament House SO,110001,SO,Delivery,CENTRAL DELHI,DELHI\n'
+    'Delhi Circle,Delhi,New Delhi GPO,Sansad Marg HO,110001,HO,Delivery,NEW DELHI,DELHI\n'
+    'Assam Circle,Guwahati,Guwahati,Guwahati GPO,781001,HO,Delivery,KAMRUP METRO,ASSAM\n'
+)
+
+
+class PincodeDirectoryTests(SimpleTestCase):
+    def setUp(self):
+        pincodes.clear()
+        self.addCleanup(pincodes.clear)
+
+    def test_seed_directory_fills_known_pincodes_and_checks_circles(self):
+        self.assertEqual(pincodes.lookup('110001'), ('110001', 'New Delhi', 'Delhi', 'North'))
+        self.assertEqual(pincodes.lookup('781001'), ('781001', '', '', 'East'))    # not in the seed
+        self.assertFalse(pincodes.is_valid('012345'))
+        self.assertFalse(pincodes.is_valid('990001'))    # Army Postal Service
+        self.assertFalse(pincodes.is_valid('11000'))
+
+    def test_complete_directory_rejects_unlisted_pincodes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path, path = os.path.join(tmp, 'india_post.csv'), os.path.join(tmp, 'pincodes.bin')
+            with open(csv_path, 'w') as f:
+                f.write(INDIA_POST_CSV)
+            out = StringIO()
+            call_command('build_pincode_directory', csv_path, output=path, stdout=out)
+            self.assertIn('Wrote 2 pincodes', out.getvalue())
+
+            with override_settings(PINCODE_DIRECTORY_PATH=path):
+                pincodes.clear()
+                self.assertEqual(pincodes.lookup('781001'), ('781001', 'Kamrup Metro', 'Assam', 'East'))
+                self.assertEqual(pincodes.lookup('110001').district, 'New Delhi')    # most offices
+                self.assertFalse(pincodes.is_valid('110002'))
+                pincodes.clear()
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class PincodeValidationTests(TestCase):
+    def setUp(self):
+        pincodes.clear()
+        self.user = User.objects.create_user(username='buyer', password='pass1234')
+
+    def test_unknown_pincode_is_rejected_without_queries(self):
+        product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga', category='bridal', price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('check_pincode_availability'), {
+                'product_id': product.pk, 'pincode': '012345',
+            })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['message'], 'This pincode does not exist')
+
+    def test_lookup_api(self):
+        data = self.client.get(reverse('pincode_lookup'), {'pincode': '560001'}).json()
+        self.assertEqual((data['district'], data['state'], data['zone']), ('Bengaluru', 'Karnataka', 'South'))
+        self.assertEqual(self.client.get(reverse('pincode_lookup'), {'pincode': '000000'}).status_code, 404)
+
+    def test_address_save_fills_city_and_state(self):
+        self.client.force_login(self.user)
+        data = self.client.post(reverse('address_save'), {
+            'full_name': 'Test Buyer', 'address_line1': '1 Marine Drive', 'pincode': '400001',
+        }).json()
+        self.assertTrue(data['ok'])
+        address = Address.objects.get(user=self.user)
+        self.assertEqual((address.city, address.state), ('Mumbai', 'Maharashtra'))
+
+        data = self.client.post(reverse('address_save'), {
+            'full_name': 'Test Buyer', 'address_line1': '1 Marine Drive', 'city': 'Mumbai',
+            'state': 'Maharashtra', 'pincode': '000001',
+        }).json()
+        self.assertEqual(data['errors'], {'pincode': 'This pincode does not exist.'})
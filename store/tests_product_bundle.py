@@ -0,0 +1,107 @@
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store import serviceability, singletons
+from store.models import (
+    Order, OrderItem, PincodeAvailability, ProductImage, Review, ShowcaseProduct, Wishlist,
+)
+from store.catalog_cache import UNKNOWN_PRODUCT_TTL
+from store.product_bundle import get_product_bundle
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ProductBundleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        serviceability.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga',
+            category='bridal',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        self.user = User.objects.create_user(username='priya', password='pass1234')
+
+    def test_warm_bundle_runs_no_queries(self):
+        get_product_bundle(self.product.slug)
+        with self.assertNumQueries(0):
+            bundle = get_product_bundle(self.product.slug)
+        self.assertEqual(bundle['product'], self.product)
+
+    def test_unknown_slug_is_404(self):
+        self.assertIsNone(get_product_bundle('no-such-lehenga'))
+        response = self.client.get(reverse('product_detail', args=['no-such-lehenga']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_slug_keys_expire(self):
+        get_product_bundle('no-such-lehenga')
+        get_product_bundle(self.product.slug)
+        later = time.time() + UNKNOWN_PRODUCT_TTL + 1
+        with patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertIsNone(cache.get('product:version:no-such-lehenga'))
+            self.assertIsNotNone(cache.get(f'product:version:{self.product.slug}'))
+            with self.assertNumQueries(0):
+                get_product_bundle(self.product.slug)
+
+    def test_child_writes_invalidate_bundle(self):
+        get_product_bundle(self.product.slug)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductImage.objects.create(
+                product=self.product,
+                image=SimpleUploadedFile('back.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+        self.assertEqual(len(get_product_bundle(self.product.slug)['gallery_images']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(product=self.product, user=self.user, rating=4, comment='Lovely work')
+        reviews = get_product_bundle(self.product.slug)['reviews_data']
+        self.assertEqual((reviews['total'], reviews['reviews'][0]['comment']), (1, 'Lovely work'))
+
+    def test_delivery_updates_verified_purchase_badge(self):
+        Review.objects.create(product=self.product, user=self.user, rating=5)
+        order = Order.objects.create(user=self.user, status='shipped')
+        OrderItem.objects.create(order=order, product=self.product, product_name=self.product.name, price=12000)
+        verified = lambda: get_product_bundle(self.product.slug)['reviews_data']['reviews'][0]['verified_purchase']
+        self.assertFalse(verified())
+        url = reverse('product_detail', args=[self.product.slug])
+        self.assertContains(self.client.get(url), '"verified_purchase": false')
+
+        order.status = 'delivered'
+        with self.captureOnCommitCallbacks(execute=True):
+            order.save()
+        self.assertTrue(verified())
+        self.assertContains(self.client.get(url), '"verified_purchase": true')    # page cache too
+
+    def test_rename_drops_old_slug(self):
+        old_slug = self.product.slug
+        get_product_bundle(old_slug)
+        self.product.slug = 'royal-lehenga-2026'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+        self.assertIsNone(get_product_bundle(old_slug))
+
+    def test_pincode_check_answers_from_bundle(self):
+        PincodeAvailability.objects.create(product=self.product, pincode='110001', delivery_days=3)
+        get_product_bundle(self.product.slug)
+        serviceability.get_map()
+        params = {'product_id': self.product.pk, 'slug': self.product.slug, 'pincode': '110001'}
+        with self.assertNumQueries(0):
+            data = self.client.get(reverse('check_pincode_availability'), params).json()
+        self.assertTrue(data['available'])
+
+    def test_wishlist_state_is_rendered_per_visitor(self):
+        Wishlist.objects.create(user=self.user, product=self.product)
+        url = reverse('product_detail', args=[self.product.slug])
+        self.assertContains(self.client.get(url), 'pdp-wishlist-btn"')
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(url), 'pdp-wishlist-btn is-active')
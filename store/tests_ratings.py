@@ -0,0 +1,83 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from store.catalog_cache import get_catalog_version
+from store.models import Review, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class RatingAggregateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga',
+            category='bridal',
+            price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        self.users = [User.objects.create_user(username=f'buyer{i}', password='pass1234') for i in range(3)]
+
+    def review(self, user, rating, **kwargs):
+        return Review.objects.create(product=self.product, user=user, rating=rating, **kwargs)
+
+    def assertAggregates(self, total, count, histogram):
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.rating_sum, self.product.rating_count), (total, count))
+        self.assertEqual(dict(self.product.rating_histogram), histogram)
+
+    def test_create_change_and_delete(self):
+        first = self.review(self.users[0], 5)
+        self.review(self.users[1], 4)
+        self.assertAggregates(9, 2, {5: 1, 4: 1, 3: 0, 2: 0, 1: 0})
+        self.assertEqual(self.product.average_rating, 4.5)
+
+        first.rating = 2
+        first.save()
+        self.assertAggregates(6, 2, {5: 0, 4: 1, 3: 0, 2: 1, 1: 0})
+
+        first.delete()
+        self.assertAggregates(4, 1, {5: 0, 4: 1, 3: 0, 2: 0, 1: 0})
+
+    def test_only_approved_reviews_count(self):
+        review = self.review(self.users[0], 3, is_approved=False)
+        self.assertAggregates(0, 0, {5: 0, 4: 0, 3: 0, 2: 0, 1: 0})
+        self.assertEqual(self.product.average_rating, 0)
+
+        review.is_approved = True
+        review.save()
+        self.assertAggregates(3, 1, {5: 0, 4: 0, 3: 1, 2: 0, 1: 0})
+
+        review.is_approved = False
+        review.save()
+        self.assertAggregates(0, 0, {5: 0, 4: 0, 3: 0, 2: 0, 1: 0})
+
+    def test_only_aggregate_changes_bump_the_catalog(self):
+        version = get_catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            review = self.review(self.users[0], 4, is_approved=False)
+        self.assertEqual(get_catalog_version(), version)
+
+        review.is_approved = True
+        with self.captureOnCommitCallbacks(execute=True):
+            review.save()
+        self.assertNotEqual(get_catalog_version(), version)
+
+    def test_rating_properties_need_no_queries(self):
+        self.review(self.users[0], 4)
+        product = ShowcaseProduct.objects.get(pk=self.product.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual((product.average_rating, product.review_count), (4.0, 1))
+
+    def test_rebuild_command_repairs_drift(self):
+        self.review(self.users[0], 5)
+        self.review(self.users[1], 1)
+        Review.objects.filter(rating=1).update(is_approved=False)  # bypasses signals
+        call_command('rebuild_ratings', stdout=StringIO())
+        self.assertAggregates(5, 1, {5: 1, 4: 0, 3: 0, 2: 0, 1: 0})
@@ -8,9 +8,13 @@ from django.test import TestCase, override_settings
 from django.urls import reverse
 
 from store.models import Coupon, Order, ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
 
 
-@override_settings(RAZORPAY_KEY_ID='rzp_test_key', RAZORPAY_KEY_SECRET='rzp_test_secret')
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    RAZORPAY_KEY_ID='rzp_test_key', RAZORPAY_KEY_SECRET='rzp_test_secret',
+)
 class PlaceOrderRazorpayFailureTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(username='buyer', password='pass1234', email='buyer@example.com')
@@ -0,0 +1,63 @@
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from store.models import Order, OrderItem, ProductRecommendation, ShowcaseProduct, Wishlist
+from store.product_bundle import get_related_products
+from store.recommendations import build_neighbours
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+class BuildNeighboursTests(SimpleTestCase):
+    def test_co_purchased_products_rank_first(self):
+        # Users 1–3 buy 10 with 20; user 4 buys 10 with 30
+        users = np.array([1, 1, 2, 2, 3, 3, 4, 4])
+        products = np.array([10, 20, 10, 20, 10, 20, 10, 30])
+        neighbours = build_neighbours(users, products, np.ones(8), top_k=2)
+        self.assertEqual(neighbours[10], [20, 30])
+        self.assertEqual(neighbours[30], [10])
+
+    def test_top_k_limits_each_list(self):
+        users = np.array([1] * 5)
+        products = np.array([1, 2, 3, 4, 5])
+        neighbours = build_neighbours(users, products, np.ones(5), top_k=2)
+        self.assertTrue(all(len(ids) == 2 for ids in neighbours.values()))
+
+    def test_no_interactions(self):
+        self.assertEqual(build_neighbours(np.array([]), np.array([]), np.array([])), {})
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class RecommendationCommandTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.lehenga, self.dupatta, self.other = [
+            ShowcaseProduct.objects.create(
+                name=name, category=category, price=Decimal('5000.00'),
+                image=SimpleUploadedFile(f'{name}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+            for name, category in (('Lehenga', 'bridal'), ('Dupatta', 'casual'), ('Choli', 'bridal'))
+        ]
+
+    def test_command_stores_neighbours_read_by_product_page(self):
+        for i in range(2):
+            user = User.objects.create_user(username=f'buyer{i}', password='pass1234')
+            order = Order.objects.create(user=user, status='delivered')
+            OrderItem.objects.create(order=order, product=self.lehenga, product_name='Lehenga', price=5000)
+            Wishlist.objects.create(user=user, product=self.dupatta)
+
+        call_command('build_recommendations', stdout=StringIO())
+
+        self.assertEqual(
+            ProductRecommendation.objects.get(product=self.lehenga).neighbour_ids, [self.dupatta.pk],
+        )
+        # Neighbour from another category first, then same-category top-up
+        self.assertEqual(get_related_products(self.lehenga), [self.dupatta, self.other])
+        with self.assertNumQueries(0):
+            get_related_products(self.lehenga)
@@ -0,0 +1,377 @@
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from store import search
+from store.catalog_cache import bump_version, single_flight
+from store.models import CollectionCard, FeaturedCollection, SearchQueryStat, ShowcaseProduct
+from store.search import analytics
+from store.search.backends import DatabaseBackend, PostgresBackend, SqliteBackend, get_backend
+from store.search.fuzzy import bounded_distance, closest_words, trigrams
+from store.search import index as search_index
+from store.search.index import SEARCH_VERSION_KEY, build_index, clear
+from store.search.synonyms import SYNONYMS
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+def _image(name):
+    return SimpleUploadedFile(name, b'filecontent', content_type='image/jpeg')
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        self.described = ShowcaseProduct.objects.create(
+            name='Ivory Anarkali', category='designer', price=Decimal('9000.00'),
+            description='A bridal look in soft silk', image=_image('a.jpg'),
+        )
+        self.exact = ShowcaseProduct.objects.create(
+            name='Bridal', category='bridal', price=Decimal('20000.00'), image=_image('b.jpg'),
+        )
+        self.named = ShowcaseProduct.objects.create(
+            name='Red Bridal Lehenga', category='bridal', price=Decimal('15000.00'), image=_image('c.jpg'),
+        )
+        FeaturedCollection.objects.create(
+            name='Festive Edit', description='Lehenga sets', price=Decimal('8000.00'), image=_image('d.jpg'),
+        )
+        CollectionCard.objects.create(name='Heritage', description='Banarasi weaves', image=_image('e.jpg'))
+
+    def names(self, query):
+        return [r['name'] for r in build_index().search(query)]
+
+    def test_exact_name_then_name_then_description(self):
+        self.assertEqual(self.names('bridal'), ['Bridal', 'Red Bridal Lehenga', 'Ivory Anarkali'])
+
+    def test_prefixes_and_every_word_must_match(self):
+        self.assertEqual(self.names('brid leh'), ['Red Bridal Lehenga'])
+        self.assertEqual(self.names('LEHENGA'), ['Red Bridal Lehenga', 'Festive Edit'])
+        self.assertEqual(self.names('banar'), ['Heritage'])
+        self.assertEqual(self.names('bridal velvet'), [])
+
+    def test_payload_matches_old_response(self):
+        result = build_index().search('red bridal')[0]
+        self.assertEqual(result['url'], f'/shop/{self.named.slug}/')
+        self.assertEqual(result['category'], 'Bridal')
+        self.assertEqual(result['section'], '#showcase')
+
+    def test_index_follows_committed_writes_without_queries(self):
+        self.assertEqual(len(search.search('bridal')), 3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact.is_active = False
+            self.exact.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.described.delete()
+        with self.assertNumQueries(0):
+            results = search.search('bridal')
+        self.assertEqual([r['name'] for r in results], ['Red Bridal Lehenga'])
+
+    def test_workers_share_one_build_per_version(self):
+        self.assertEqual(len(search.search('bridal')), 3)
+        clear()    # another worker: loads the built index
+        with self.assertNumQueries(0):
+            self.assertEqual(len(search.search('bridal')), 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact.name = 'Crimson Bridal'
+            self.exact.save()
+        clear()
+        search.search('crimson')    # the first worker to ask builds it
+        clear()
+        with self.assertNumQueries(0):
+            self.assertEqual([r['name'] for r in search.search('crimson')], ['Crimson Bridal'])
+
+    def test_index_behind_other_workers_is_not_patched(self):
+        search.search('bridal')
+        ShowcaseProduct.objects.filter(pk=self.named.pk).update(name='Emerald Lehenga')
+        bump_version(SEARCH_VERSION_KEY)    # written by another worker
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact.name = 'Crimson Bridal'
+            self.exact.save()
+        self.assertEqual([r['name'] for r in search.search('emerald')], ['Emerald Lehenga'])
+        self.assertEqual([r['name'] for r in search.search('crimson')], ['Crimson Bridal'])
+
+    def test_writes_replace_the_index_instead_of_changing_it(self):
+        before = search_index.get_index()
+        bridal = before.search('bridal')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exact.name = 'Crimson Bridal'
+            self.exact.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.described.delete()
+        after = search_index.get_index()
+        self.assertIsNot(after, before)
+        self.assertEqual(before.search('bridal'), bridal)    # searches already running see no change
+        self.assertEqual(before.search('crimson'), [])
+        self.assertEqual([r['name'] for r in after.search('crimson')], ['Crimson Bridal'])
+        self.assertEqual(len(after.search('bridal')), 2)
+
+    def test_word_misses_fall_back_to_substrings(self):
+        # Mid-word text is not a word prefix; icontains semantics still find it
+        self.assertEqual([r['name'] for r in search.search('arkal')], ['Ivory Anarkali'])
+
+    def test_api_uses_search(self):
+        response = self.client.get(reverse('search_api'), {'q': 'heritage'})
+        self.assertEqual([r['name'] for r in response.json()['results']], ['Heritage'])
+
+
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    SEARCH_BACKEND='database',
+)
+class DatabaseBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bridal = ShowcaseProduct.objects.create(
+                name='Red Bridal Lehenga', category='bridal', price=Decimal('15000.00'),
+                description='Zardozi work on velvet', image=_image('a.jpg'),
+            )
+            ShowcaseProduct.objects.create(
+                name='Ivory Anarkali', category='designer', price=Decimal('9000.00'),
+                description='A bridal look in soft silk', image=_image('b.jpg'),
+            )
+            CollectionCard.objects.create(name='Heritage', description='Banarasi weaves', image=_image('c.jpg'))
+
+    def names(self, query):
+        return [r['name'] for r in search.search(query)]
+
+    def test_ranking_matches_memory_index(self):
+        for query in ('bridal', 'brid', 'zardozi velvet', 'banar', 'arkal', 'designer', 'dulhan red', 'nothing here'):
+            self.assertEqual(self.names(query), [r['name'] for r in build_index().search(query)
+                                                  or build_index().search_substring(query)], query)
+
+    def test_fts_tables_follow_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bridal.name = 'Crimson Lehenga'
+            self.bridal.save()
+        self.assertEqual(self.names('crimson'), ['Crimson Lehenga'])
+        self.assertEqual(self.names('red'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bridal.delete()
+        self.assertEqual(self.names('lehenga'), [])
+
+    def test_synonyms_and_typos_match_memory_index(self):
+        for query in ('lengha', 'dulhan', 'benarasi', 'lehemga', 'red lehnga', 'zardzoi velvet'):
+            self.assertEqual(self.names(query), [r['name'] for r in build_index().search(query)], query)
+        self.assertEqual(self.names('lehemga'), ['Red Bridal Lehenga'])
+
+    def test_plain_backend_expands_queries_too(self):
+        with override_settings(SEARCH_BACKEND='memory'):
+            backend = get_backend()
+            self.assertIs(type(backend), DatabaseBackend)
+            self.assertEqual([r['name'] for r in backend.search('lengha')], ['Red Bridal Lehenga'])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL full-text backend')
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    SEARCH_BACKEND='database',
+)
+class PostgresBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.party = ShowcaseProduct.objects.create(
+                name='Ivory Anarkali', category='party', price=Decimal('9000.00'),
+                description='Zardozi work on velvet', image=_image('a.jpg'),
+            )
+            CollectionCard.objects.create(name='Heritage', description='Banarasi weaves', image=_image('b.jpg'))
+
+    def test_backend_is_postgres(self):
+        self.assertIs(type(get_backend()), PostgresBackend)
+
+    def test_search_vector_holds_category_keywords(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT search_vector::text FROM store_showcaseproduct WHERE id = %s', [self.party.pk])
+            vector = cursor.fetchone()[0]
+        for word in ('party', 'wear', 'anarkali', 'zardozi'):
+            self.assertIn(f"'{word}'", vector)
+
+    def test_results_match_memory_index(self):
+        for query in ('party wear', 'anark', 'zardosi', 'lehemga', 'velvt', 'arkal', 'benarasi', 'nothing'):
+            expected = build_index().search(query) or build_index().search_substring(query)
+            self.assertEqual(search.search(query), expected, query)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class MemoryBackendSyncTests(TestCase):
+    def test_fts_tables_are_not_written(self):
+        with mock.patch.object(SqliteBackend, 'sync') as sync, self.captureOnCommitCallbacks(execute=True):
+            ShowcaseProduct.objects.create(
+                name='Red Bridal Lehenga', category='bridal', price=Decimal('15000.00'), image=_image('a.jpg'),
+            )
+        sync.assert_not_called()
+
+
+class FuzzyMatchingTests(SimpleTestCase):
+    def test_bounded_distance(self):
+        self.assertEqual(bounded_distance('lehnga', 'lehenga', 2), 1)
+        self.assertEqual(bounded_distance('zardzoi', 'zardozi', 1), 1)   # swapped letters
+        self.assertEqual(bounded_distance('velvet', 'banarasi', 2), 3)
+
+    def test_closest_words_uses_trigrams(self):
+        grams = {}
+        for word in ('lehenga', 'velvet', 'banarasi'):
+            for gram in trigrams(word):
+                grams.setdefault(gram, set()).add(word)
+        self.assertEqual(closest_words('lehemga', grams), ['lehenga'])
+        self.assertEqual(closest_words('banaras', grams), ['banarasi'])
+        self.assertEqual(closest_words('silk', grams), [])
+
+    def test_every_category_has_synonyms(self):
+        for key, _label in ShowcaseProduct.CATEGORY_CHOICES:
+            self.assertIn(key, SYNONYMS)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class TolerantSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        ShowcaseProduct.objects.create(
+            name='Red Lehenga Choli', category='bridal', price=Decimal('15000.00'),
+            description='Zardozi work on banarasi silk', image=_image('a.jpg'),
+        )
+        ShowcaseProduct.objects.create(
+            name='Mint Kurta Set', category='casual', price=Decimal('3000.00'), image=_image('b.jpg'),
+        )
+
+    def names(self, query):
+        return [r['name'] for r in search.search(query)]
+
+    def test_spelling_variants_and_transliterations(self):
+        for query in ('lehnga', 'lengha', 'chaniya choli', 'zardosi', 'benarasi', 'shaadi'):
+            self.assertEqual(self.names(query), ['Red Lehenga Choli'], query)
+
+    def test_typos_are_corrected(self):
+        self.assertEqual(self.names('lehemga'), ['Red Lehenga Choli'])
+        self.assertEqual(self.names('kurtta'), ['Mint Kurta Set'])
+
+    def test_category_synonyms_and_unknown_words(self):
+        self.assertEqual(self.names('everyday'), ['Mint Kurta Set'])
+        self.assertEqual(self.names('qwerty'), [])
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class SearchCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Bridal Lehenga', category='bridal', price=Decimal('15000.00'), image=_image('a.jpg'),
+        )
+
+    def test_normalised_queries_share_one_entry(self):
+        search.cached_search('Bridal')
+        with mock.patch('store.search.search') as uncached:
+            for query in ('bridal', '  BRIDAL ', 'brídal'):
+                self.assertEqual(search.cached_search(query)[0]['name'], 'Bridal Lehenga')
+        uncached.assert_not_called()
+
+    def test_searchable_write_retires_cached_results(self):
+        self.assertEqual(len(search.cached_search('lehenga')), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertEqual(search.cached_search('lehenga'), [])
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'result'
+
+        threads = [
+            threading.Thread(target=single_flight, args=('single:flight', compute, 60)) for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.get('single:flight'), 'result')
+
+    def test_warm_command_caches_two_letter_prefixes(self):
+        call_command('warm_search_cache', stdout=StringIO())
+        with mock.patch('store.search.search') as uncached:
+            search.cached_search('le')
+            search.cached_search('br')
+        uncached.assert_not_called()
+
+
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    SEARCH_ANALYTICS_FLUSH_SECONDS=0,
+)
+class SearchAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear()
+        analytics.clear()
+        ShowcaseProduct.objects.create(
+            name='Bridal Lehenga', category='bridal', price=Decimal('15000.00'), image=_image('a.jpg'),
+        )
+
+    def test_flush_merges_normalised_queries_in_bulk(self):
+        for query, found in (('Bridal', 1), ('  BRIDAL', 1), ('brídal', 1), ('xyzzy', 0)):
+            analytics.record(query, found)
+        # savepoint, insert missing rows, read their ids, one UPDATE, release
+        with self.assertNumQueries(5):
+            self.assertEqual(analytics.flush(), 2)
+        analytics.record('xyzzy', 0)
+        analytics.flush()
+        stats = {s.query: (s.searches, s.zero_results) for s in SearchQueryStat.objects.all()}
+        self.assertEqual(stats, {'bridal': (3, 0), 'xyzzy': (2, 2)})
+        self.assertEqual(analytics.flush(), 0)
+
+    def test_search_api_only_buffers(self):
+        url = reverse('search_api')
+        self.client.get(url, {'q': 'lehenga'})    # builds the index, fills the cache
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'lehenga'})
+            self.client.get(url, {'q': 'qwerty'})
+        analytics.flush()
+        self.assertEqual(SearchQueryStat.objects.get(query='lehenga').searches, 2)
+        self.assertEqual(SearchQueryStat.objects.get(query='qwerty').zero_results, 1)
+
+    def test_revalidated_searches_are_counted(self):
+        url = reverse('search_api')
+        etag = self.client.get(url, {'q': 'lehenga'})['ETag']
+        self.assertEqual(self.client.get(url, {'q': 'lehenga'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        etag = self.client.get(url, {'q': 'qwerty'})['ETag']
+        bump_version(SEARCH_VERSION_KEY)    # its results are no longer cached
+        with mock.patch('mysite.views.api.cached_search') as searched:
+            response = self.client.get(url, {'q': 'qwerty'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        searched.assert_not_called()
+
+        analytics.flush()
+        stats = {s.query: (s.searches, s.zero_results, s.revalidated) for s in SearchQueryStat.objects.all()}
+        self.assertEqual(stats, {'lehenga': (2, 0, 1), 'qwerty': (2, 1, 1)})
+
+    def test_admin_report(self):
+        for _ in range(3):
+            analytics.record('lehenga', 1)
+        analytics.record('jorjet gown', 0)
+        analytics.flush()
+        self.client.force_login(User.objects.create_superuser('admin', 'a@example.com', 'pw'))
+        response = self.client.get(reverse('admin:store_searchquerystat_changelist'))
+        self.assertEqual([r['query'] for r in response.context['top_queries']], ['lehenga', 'jorjet gown'])
+        self.assertEqual([r['query'] for r in response.context['zero_result_queries']], ['jorjet gown'])
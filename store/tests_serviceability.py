@@ -0,0 +1,163 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from store import serviceability
+from store.models import Order, PincodeAvailability, ServiceabilityRule, ShowcaseProduct
+from store.search.index import clear as clear_search_index
+from store.serviceability import bitmap_of, compile_ranges, deliverable
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+class CompileRangesTests(SimpleTestCase):
+    def test_narrowest_range_wins_and_neighbours_merge(self):
+        table = compile_ranges([
+            (110000, 119999, 9999, 0),
+            (110100, 110199, 99, 1),
+            *((pin, pin, -1, 2) for pin in range(110150, 110160)),
+        ])
+        self.assertEqual(len(table), 5)
+        self.assertEqual(table.lookup(110050), 0)
+        self.assertEqual(table.lookup(110120), 1)
+        self.assertEqual(table.lookup(110155), 2)
+        self.assertEqual(table.lookup(110190), 1)
+        self.assertIsNone(table.lookup(120000))
+
+    def test_consecutive_pincodes_compress(self):
+        table = compile_ranges([(pin, pin, -1, 0) for pin in range(400001, 401001)])
+        self.assertEqual(len(table), 1)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ServiceabilityTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        serviceability.clear()
+        self.product = ShowcaseProduct.objects.create(
+            name='Royal Lehenga', category='bridal', price=Decimal('12000.00'),
+            image=SimpleUploadedFile('lehenga.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        self.other = ShowcaseProduct.objects.create(
+            name='Silk Saree', category='festival', price=Decimal('8000.00'),
+            image=SimpleUploadedFile('saree.jpg', b'filecontent', content_type='image/jpeg'),
+        )
+        ServiceabilityRule.objects.create(region='Delhi NCR', pincode_from='11', delivery_days=3)
+        ServiceabilityRule.objects.create(
+            region='North East', pincode_from='78', pincode_to='79', delivery_days=9, extra_charge=Decimal('250.00'),
+        )
+        ServiceabilityRule.objects.create(
+            region='Bridal Delhi', product=self.product, pincode_from='1100', delivery_days=2,
+        )
+        PincodeAvailability.objects.create(product=self.product, pincode='110005', is_available=False)
+
+    def available(self, product, pincode):
+        return PincodeAvailability.is_product_available_in_pincode(product.pk, pincode)
+
+    def test_rules_and_rows_in_order_of_precedence(self):
+        self.assertEqual(self.available(self.other, '110005'), (True, 3, Decimal('0')))
+        self.assertEqual(self.available(self.product, '110004'), (True, 2, Decimal('0')))
+        self.assertEqual(self.available(self.product, '110005'), (False, None, 0))
+        self.assertEqual(self.available(self.product, '119999'), (True, 3, Decimal('0')))
+        self.assertEqual(self.available(self.product, '791001'), (True, 9, Decimal('250.00')))
+        self.assertEqual(self.available(self.product, '400001'), (False, None, 0))
+
+    def test_pincode_check_runs_no_queries_once_warm(self):
+        url = reverse('check_pincode_availability')
+        params = {'product_id': self.other.pk, 'pincode': '781001'}
+        self.client.get(url, params)
+        with self.assertNumQueries(1):    # the product lookup; serviceability is in memory
+            data = self.client.get(url, params).json()
+        self.assertEqual((data['available'], data['delivery_days'], data['extra_charge']), (True, 9, 250.0))
+
+    def test_committed_writes_recompile(self):
+        self.assertFalse(self.available(self.other, '400001')[0])
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = ServiceabilityRule.objects.create(region='Mumbai', pincode_from='400', delivery_days=4)
+        self.assertEqual(self.available(self.other, '400001'), (True, 4, Decimal('0')))
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.delete()
+        self.assertFalse(self.available(self.other, '400001')[0])
+
+    def test_cart_check_is_one_lookup(self):
+        url = reverse('check_cart_pincode')
+        params = {'pincode': '781001', 'product_id': [self.product.pk, self.other.pk, self.other.pk]}
+        self.client.get(url, params)
+        with self.assertNumQueries(0):
+            data = self.client.get(url, params).json()
+        self.assertEqual(
+            (data['available'], data['delivery_days'], data['extra_charge']), (True, 9, 500.0),
+        )
+        data = self.client.get(url, {'pincode': '110005', 'product_id': [self.product.pk, self.other.pk]}).json()
+        self.assertEqual((data['available'], data['unavailable']), (False, [self.product.pk]))
+        self.assertEqual(self.client.get(url, {'pincode': '1100'}).status_code, 400)
+
+    def test_place_order_checks_the_whole_cart(self):
+        self.client.force_login(User.objects.create_user(username='buyer', password='pass1234'))
+
+        def place(pincode):
+            return self.client.post(reverse('place_order'), data=json.dumps({
+                'items': [{'name': self.product.name, 'quantity': 1}, {'name': self.other.name, 'quantity': 1}],
+                'shipping': {
+                    'full_name': 'Test Buyer', 'phone': '9999999999', 'address_line1': '1 Test Street',
+                    'city': 'Guwahati', 'state': 'Assam', 'pincode': pincode,
+                },
+                'email': 'buyer@example.com', 'payment_method': 'cod',
+            }), content_type='application/json').json()
+
+        data = place('110005')
+        self.assertFalse(data['ok'])
+        self.assertIn(self.product.name, data['error'])
+        self.assertTrue(place('781001')['ok'])
+        self.assertEqual(Order.objects.get().shipping_charge, Decimal('500.00'))
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class DeliverableFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        serviceability.clear()
+        clear_search_index()
+        self.lehenga, self.saree, self.kurta = (
+            ShowcaseProduct.objects.create(
+                name=name, category='bridal', price=12000,
+                image=SimpleUploadedFile(f'{name}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+            for name in ('Silk Lehenga', 'Silk Saree', 'Silk Kurta')
+        )
+        ServiceabilityRule.objects.create(region='Delhi NCR', pincode_from='11', delivery_days=3)
+        ServiceabilityRule.objects.create(region='Kurta Mumbai', product=self.kurta, pincode_from='4', delivery_days=5)
+        PincodeAvailability.objects.create(product=self.saree, pincode='110001', is_available=False)
+
+    def test_pincode_bitmaps(self):
+        every = bitmap_of([self.lehenga.pk, self.saree.pk, self.kurta.pk])
+        self.assertEqual(deliverable(every, '110001'), bitmap_of([self.lehenga.pk, self.kurta.pk]))
+        self.assertEqual(deliverable(every, '400001'), bitmap_of([self.kurta.pk]))
+        self.assertEqual(deliverable(every, '600001'), 0)
+
+    def test_shop_filter_adds_no_queries_once_warm(self):
+        params = {'category': 'bridal', 'deliver_to': '110001'}
+        get = lambda: self.client.get(reverse('shop'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+        data = get()
+        self.assertEqual(data['count'], 2)
+        self.assertIn('Silk Kurta', data['html'])
+        self.assertNotIn('Silk Saree', data['html'])
+        with self.assertNumQueries(1):    # the page's products; the rest is cached or in memory
+            get()
+
+        response = self.client.get(reverse('shop'), {'deliver_to': '400001'})
+        self.assertEqual(response.context['total_count'], 1)
+        self.assertEqual([p.name for p in response.context['products']], ['Silk Kurta'])
+
+    def test_search_keeps_deliverable_products(self):
+        names = lambda data: sorted(r['name'] for r in data['results'])
+        url = reverse('search_api')
+        self.assertEqual(len(names(self.client.get(url, {'q': 'silk'}).json())), 3)
+        self.assertEqual(
+            names(self.client.get(url, {'q': 'silk', 'deliver_to': '110001'}).json()),
+            ['Silk Kurta', 'Silk Lehenga'],
+        )
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store import singletons
+from store.facets import get_facet_counts, parse_filters
+from store.models import ShowcaseProduct
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ShopFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        rows = (
+            ('Silk Lehenga', 'bridal', '30000.00', 0, 'S,M,L', 'Pure Silk', 5),
+            ('Velvet Lehenga', 'bridal', '20000.00', 50, 'M', 'Velvet', 0),
+            ('Georgette Saree', 'party', '8000.00', 0, 'M,XL', 'Georgette', 3),
+            ('Cotton Kurta', 'casual', '3000.00', 0, 'xs, s', 'pure silk', 10),
+        )
+        for name, category, price, discount, sizes, fabric, stock in rows:
+            ShowcaseProduct.objects.create(
+                # int price: save() scales it by a float discount factor
+                name=name, category=category, price=int(Decimal(price)), discount_percent=discount,
+                available_sizes=sizes, fabric=fabric, stock_quantity=stock,
+                image=SimpleUploadedFile(f'{name}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+
+    def filters(self, query=''):
+        return parse_filters(QueryDict(query))
+
+    def test_facet_columns_are_normalised(self):
+        kurta = ShowcaseProduct.objects.get(name='Cotton Kurta')
+        self.assertEqual(kurta.size_mask, 0b11)    # XS, S
+        self.assertEqual(kurta.fabric_key, 'pure-silk')
+        velvet = ShowcaseProduct.objects.get(name='Velvet Lehenga')
+        self.assertEqual(velvet.effective_price, Decimal('10000.00'))
+        self.assertFalse(velvet.is_in_stock)
+
+        ShowcaseProduct.objects.filter(pk=velvet.pk).update(stock_quantity=2)
+        self.assertTrue(ShowcaseProduct.objects.get(pk=velvet.pk).is_in_stock)
+
+    def test_counts_exclude_their_own_filter(self):
+        counts = get_facet_counts('all', self.filters('size=M&in_stock=1'))
+        self.assertEqual(counts['total'], 2)             # silk lehenga, saree
+        self.assertEqual(dict(counts['size'])['XS'], 1)  # sizes ignore the size filter
+        self.assertEqual(counts['in_stock'], 2)
+        self.assertEqual(counts['fabric'], [('georgette', 'Georgette', 1), ('pure-silk', 'Pure Silk', 1)])
+        self.assertEqual(
+            [n for _key, _label, n in counts['price']], [0, 1, 0, 1],
+        )
+
+    def test_unknown_filter_values_are_dropped(self):
+        filters = self.filters('size=M&size=XXXL&fabric=tweed&price=free')
+        self.assertEqual(filters, {'size': ('M',), 'fabric': (), 'price': (), 'in_stock': False})
+
+    def test_fragment_filters_grid_and_caches_counts(self):
+        params = {'category': 'bridal', 'price': '10000-25000'}
+        get = lambda: self.client.get(reverse('shop'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+        data = get()
+        self.assertEqual(data['count'], 1)
+        self.assertIn('Velvet Lehenga', data['html'])
+        self.assertNotIn('Silk Lehenga', data['html'])
+        self.assertEqual(data['facets']['total'], 1)
+        with self.assertNumQueries(0):
+            get()
+
+        silk = ShowcaseProduct.objects.get(name='Silk Lehenga')
+        silk.price = Decimal('15000.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            silk.save()
+        self.assertEqual(get()['count'], 2)
+
+    def test_full_page_renders_facets(self):
+        response = self.client.get(reverse('shop'), {'fabric': 'velvet'})
+        self.assertEqual(response.context['total_count'], 1)
+        self.assertContains(response, 'name="fabric" value="velvet" checked')
@@ -0,0 +1,89 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from store import singletons
+from store.models import ShowcaseProduct
+from store.pagination import decode_cursor, get_category_counts, keyset_page
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class ShopPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+        for i in range(15):
+            ShowcaseProduct.objects.create(
+                name=f'Lehenga {i}',
+                category='bridal' if i % 3 else 'party',
+                price=Decimal('5000.00'),
+                display_order=i // 4,
+                image=SimpleUploadedFile(f'l{i}.jpg', b'filecontent', content_type='image/jpeg'),
+            )
+
+    def test_cursor_pages_cover_catalog_in_model_order(self):
+        queryset = ShowcaseProduct.objects.filter(is_active=True)
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(queryset, cursor, per_page=4)
+            seen += [p.pk for p in page]
+            if cursor is None:
+                break
+        expected = list(queryset.order_by('display_order', '-created_at', 'id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_bad_cursor_starts_from_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page, _ = keyset_page(ShowcaseProduct.objects.all(), 'not-a-cursor', per_page=4)
+        self.assertEqual(len(page), 4)
+
+    def test_category_counts_cached_and_invalidated(self):
+        self.assertEqual(get_category_counts(), {'bridal': 10, 'party': 5, 'all': 15})
+        with self.assertNumQueries(0):
+            get_category_counts()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShowcaseProduct.objects.filter(category='party').first().delete()
+        self.assertEqual(get_category_counts()['party'], 4)
+
+    def get_fragment(self, **params):
+        return self.client.get(reverse('shop'), params, HTTP_X_REQUESTED_WITH='XMLHttpRequest').json()
+
+    def test_xhr_returns_cards_and_next_cursor(self):
+        data = self.get_fragment(category='bridal')
+        self.assertTrue(data['ok'])
+        self.assertEqual(data['count'], 10)
+        self.assertEqual(data['html'].count('class="product-card"'), 10)
+        self.assertIsNone(data['next_cursor'])
+
+        data = self.get_fragment()
+        self.assertEqual(data['html'].count('class="product-card"'), 12)
+        rest = self.get_fragment(cursor=data['next_cursor'])
+        self.assertEqual(rest['html'].count('class="product-card"'), 3)
+        self.assertNotIn('shop-empty-state', rest['html'])
+
+    def test_fragment_is_cached_per_category_and_cursor(self):
+        self.get_fragment(category='party')
+        with self.assertNumQueries(0):
+            data = self.get_fragment(category='party')
+        self.assertEqual(data['count'], 5)
+        self.assertNotIn('<html', data['html'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ShowcaseProduct.objects.filter(category='party').first().delete()
+        self.assertEqual(self.get_fragment(category='party')['count'], 4)
+
+    def test_bad_cursors_share_the_first_page_entry(self):
+        first = self.get_fragment(category='party')
+        with self.assertNumQueries(0):
+            for garbage in ('%%%', 'not-a-cursor', 'x' * 40):
+                self.assertEqual(self.get_fragment(category='party', cursor=garbage)['html'], first['html'])
+
+    def test_legacy_page_links_still_resolve(self):
+        response = self.client.get(reverse('shop'), {'page': 2})
+        self.assertEqual(len(response.context['products']), 3)
+        self.assertIsNone(response.context['next_cursor'])
@@ -0,0 +1,49 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from store import singletons
+from store.models import ContactInfo, ShopBanner
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class SingletonRegistryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        singletons.clear()
+
+    def test_active_instance_is_loaded_once(self):
+        contact = ContactInfo.objects.create(phone='+91 98765 43210')
+        self.assertEqual(singletons.get_active(ContactInfo), contact)
+        with self.assertNumQueries(0):
+            self.assertEqual(singletons.get_active(ContactInfo), contact)
+
+    def test_missing_singleton_is_cached_as_none(self):
+        self.assertIsNone(singletons.get_active(ShopBanner))
+        with self.assertNumQueries(0):
+            self.assertIsNone(singletons.get_active(ShopBanner))
+
+    def test_save_and_delete_reload_the_registry(self):
+        old = ContactInfo.objects.create(phone='111')
+        self.assertEqual(singletons.get_active(ContactInfo), old)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new = ContactInfo.objects.create(phone='222')
+            # Not before the commit: a reload now would see the old row
+            self.assertEqual(singletons.get_active(ContactInfo), old)
+        self.assertEqual(singletons.get_active(ContactInfo), new)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            new.delete()
+        self.assertIsNone(singletons.get_active(ContactInfo))
+
+    def test_version_bump_from_another_worker_is_picked_up(self):
+        contact = ContactInfo.objects.create(phone='111')
+        singletons.get_active(ContactInfo)
+        ContactInfo.objects.filter(pk=contact.pk).update(phone='333')
+
+        # Simulate another worker's save: shared key changes, local check is due
+        cache.set(singletons.SINGLETONS_VERSION_KEY, 'other-worker', None)
+        singletons._state['checked_at'] = 0.0
+
+        self.assertEqual(singletons.get_active(ContactInfo).phone, '333')
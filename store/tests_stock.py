@@ -0,0 +1,175 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from store import serviceability, stock
+from store.models import Coupon, Order, ShowcaseProduct, StockReservation
+from store.testing import TEST_CACHES, TEST_MEDIA_ROOT, TEST_STORAGES
+
+
+def _product(name, stock_quantity):
+    return ShowcaseProduct.objects.create(
+        name=name, category='bridal', price=12000, stock_quantity=stock_quantity, is_active=True,
+        image=SimpleUploadedFile(f'{name}.jpg', b'filecontent', content_type='image/jpeg'),
+    )
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class StockTakeTests(TestCase):
+    def setUp(self):
+        self.lehenga = _product('Royal Lehenga', 1)
+        self.saree = _product('Silk Saree', 5)
+
+    def test_take_is_one_statement_and_all_or_nothing(self):
+        with self.assertNumQueries(4):    # savepoint, UPDATE, sold-out check, release
+            stock.take({self.lehenga.pk: 1, self.saree.pk: 2})
+        self.lehenga.refresh_from_db()
+        self.saree.refresh_from_db()
+        self.assertEqual((self.lehenga.stock_quantity, self.saree.stock_quantity), (0, 3))
+
+        with self.assertRaises(stock.OutOfStock) as cm:
+            stock.take({self.saree.pk: 1, self.lehenga.pk: 1})
+        self.assertEqual(cm.exception.shortages, {self.lehenga.pk: 0})
+        self.saree.refresh_from_db()
+        self.assertEqual(self.saree.stock_quantity, 3)    # the matched row was undone
+
+    def test_stale_read_cannot_oversell(self):
+        # Both buyers read one lehenga in stock before either checks out
+        seen = ShowcaseProduct.objects.get(pk=self.lehenga.pk)
+        stock.take({self.lehenga.pk: 1})
+        self.assertEqual(seen.stock_quantity, 1)
+        with self.assertRaises(stock.OutOfStock):
+            stock.take({seen.pk: 1})
+        self.lehenga.refresh_from_db()
+        self.assertEqual(self.lehenga.stock_quantity, 0)
+
+
+@override_settings(CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT)
+class StockReservationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', password='pass1234')
+        self.lehenga = _product('Royal Lehenga', 3)
+        self.saree = _product('Silk Saree', 5)
+        self.coupon = Coupon.objects.create(
+            code='WELCOME10', discount_type='percent', discount_value=Decimal('10.00'), used_count=2,
+        )
+
+    def _order(self, **kwargs):
+        fields = {'payment_method': 'razorpay', 'coupon_code': 'WELCOME10', 'discount_amount': 100}
+        fields.update(kwargs)
+        return Order.objects.create(user=self.user, **fields)
+
+    def test_release_is_batched_and_idempotent(self):
+        orders = [self._order(), self._order()]
+        for order in orders:
+            stock.reserve(order, {self.lehenga.pk: 1, self.saree.pk: 2})
+        self.lehenga.refresh_from_db()
+        self.assertEqual(self.lehenga.stock_quantity, 1)
+
+        # savepoint, SELECT, sold-out check, UPDATE, DELETE, release
+        with self.assertNumQueries(6):
+            self.assertEqual(stock.release(orders), 4)
+        self.assertEqual(stock.release(orders), 0)
+        self.lehenga.refresh_from_db()
+        self.saree.refresh_from_db()
+        self.assertEqual((self.lehenga.stock_quantity, self.saree.stock_quantity), (3, 5))
+
+    def test_failed_payment_releases_once(self):
+        order = self._order()
+        stock.reserve(order, {self.lehenga.pk: 2})
+        order.payment_status = 'failed'
+        order.status = 'cancelled'
+        order.save()
+        order.delete()
+        self.lehenga.refresh_from_db()
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.lehenga.stock_quantity, 3)
+        self.assertEqual(self.coupon.used_count, 1)
+
+    def test_expired_reservations_are_released_and_orders_cancelled(self):
+        expired, live = self._order(), self._order()
+        stock.reserve(expired, {self.lehenga.pk: 2})
+        stock.reserve(live, {self.saree.pk: 1})
+        StockReservation.objects.filter(order=expired).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('release_expired_reservations', stdout=out)
+        self.assertIn('Cancelled 1 expired orders', out.getvalue())
+
+        expired.refresh_from_db()
+        self.assertEqual((expired.payment_status, expired.status), ('failed', 'cancelled'))
+        self.assertEqual(Order.objects.get(pk=live.pk).payment_status, 'pending')
+        self.lehenga.refresh_from_db()
+        self.saree.refresh_from_db()
+        self.coupon.refresh_from_db()
+        self.assertEqual((self.lehenga.stock_quantity, self.saree.stock_quantity), (3, 4))
+        self.assertEqual(self.coupon.used_count, 1)
+
+
+@override_settings(
+    CACHES=TEST_CACHES, STORAGES=TEST_STORAGES, MEDIA_ROOT=TEST_MEDIA_ROOT,
+    RAZORPAY_KEY_ID='rzp_test_key', RAZORPAY_KEY_SECRET='rzp_test_secret',
+)
+class CheckoutReservationTests(TestCase):
+    def setUp(self):
+        serviceability.clear()
+        stock.clear()
+        self.user = User.objects.create_user(username='buyer', password='pass1234', email='buyer@example.com')
+        self.client.force_login(self.user)
+        self.product = _product('Royal Lehenga', 2)
+
+    def _place(self, quantity, payment_method='razorpay'):
+        payload = {
+            'items': [{'product_id': self.product.pk, 'name': self.product.name, 'quantity': quantity}],
+            'shipping': {
+                'full_name': 'Test Buyer', 'phone': '9999999999', 'address_line1': '123 Test Street',
+                'city': 'Mumbai', 'state': 'Maharashtra', 'pincode': '400001',
+            },
+            'email': 'buyer@example.com',
+            'payment_method': payment_method,
+        }
+        with patch('razorpay.Client') as mock_client:
+            mock_client.return_value.order.create.return_value = {'id': 'order_test_123'}
+            return self.client.post(reverse('place_order'), data=json.dumps(payload), content_type='application/json')
+
+    def _verify(self, order):
+        with patch('razorpay.Client'):
+            return self.client.post(reverse('verify_razorpay_payment'), data=json.dumps({
+                'razorpay_order_id': 'order_test_123', 'razorpay_payment_id': 'pay_1',
+                'razorpay_signature': 'sig', 'order_number': order.order_number,
+            }), content_type='application/json')
+
+    def test_online_order_reserves_until_paid(self):
+        order = Order.objects.get(order_number=self._place(2).json()['order_number'])
+        reservation = order.reservations.get()
+        self.assertEqual(reservation.quantity, 2)
+
+        response = self._place(1, payment_method='cod')
+        self.assertEqual(response.json()['error'], 'Insufficient stock: Royal Lehenga (only 0 left)')
+
+        self.assertTrue(self._verify(order).json()['ok'])
+        self.assertFalse(StockReservation.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 0)
+
+    def test_payment_after_expiry_takes_stock_again_or_flags_refund(self):
+        order = Order.objects.get(order_number=self._place(2).json()['order_number'])
+        StockReservation.objects.update(expires_at=timezone.now() - timedelta(minutes=1))
+        stock.release_expired()
+        self._place(1, payment_method='cod')    # stock went back on sale and sold
+
+        response = self._verify(order)
+        self.assertFalse(response.json()['ok'])
+        order.refresh_from_db()
+        self.assertEqual(order.payment_status, 'failed')
+        self.assertIn('refund due', order.notes)
+        self.assertEqual(order.razorpay_payment_id, 'pay_1')
@@ -7,7 +7,7 @@ from mysite.views import (
     # Legal
     privacy_policy, terms_conditions, refund_policy, shipping_policy,
     # API
-    search_api, check_pincode_availability,
+    search_api, showcase_api, check_pincode_availability, check_cart_pincode, pincode_lookup,
     # Features
     contact_submit, wishlist_toggle, wishlist_list,
     review_submit, review_list, coupon_apply, coupon_remove,
@@ -35,7 +35,10 @@ shop_urlpatterns = [
 # ── API endpoints ──
 api_urlpatterns = [
     path('search/', search_api, name='search_api'),
+    path('showcase/', showcase_api, name='showcase_api'),
     path('check-pincode/', check_pincode_availability, name='check_pincode_availability'),
+    path('check-pincode/cart/', check_cart_pincode, name='check_cart_pincode'),
+    path('pincode/', pincode_lookup, name='pincode_lookup'),
     path('contact/', contact_submit, name='contact_submit'),
     path('wishlist/toggle/', wishlist_toggle, name='wishlist_toggle'),
     path('wishlist/', wishlist_list, name='wishlist_list'),